@@ -0,0 +1,48 @@
+"""Time each export format of save_dataframe against the openpyxl writer.
+
+Run from the repository root with ``python -m benchmarks.export_formats``.
+"""
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.filehandling import save_dataframe
+from src.rollup import Rollup
+
+PATH = "benchmark_export"
+
+
+def openpyxl_export(dataframe: pd.DataFrame, sheets: dict[str, pd.DataFrame]) -> float:
+    """The previous implementation, kept as the baseline."""
+    begin = time.perf_counter()
+    with pd.ExcelWriter(f"Reports/{PATH}/openpyxl.xlsx", engine="openpyxl") as writer:
+        dataframe.to_excel(writer)
+        for sheet_name, sheet in sheets.items():
+            sheet.to_excel(writer, sheet_name=sheet_name)
+    return time.perf_counter() - begin
+
+
+def main():
+    rng = np.random.default_rng(0)
+    for n_days in [365, 3650, 36500]:
+        report = pd.DataFrame(
+            rng.uniform(0, 20000, (n_days, 3)).round(2),
+            index=pd.date_range("1950-01-01", periods=n_days, freq="D", name="Date"),
+            columns=["Credit card payment", "Card terminal", "Cash payment"],
+        )
+        sheets = Rollup(report).as_dict()
+
+        timings = save_dataframe(report, PATH, sheets, ["xlsx", "parquet", "csv"])
+        timings["openpyxl"] = openpyxl_export(report, sheets)
+        print(
+            f"{n_days:>6} days  "
+            + "  ".join(f"{name} {seconds:.3f} s" for name, seconds in timings.items())
+        )
+
+    shutil.rmtree(f"Reports/{PATH}")
+
+
+if __name__ == "__main__":
+    main()
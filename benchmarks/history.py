@@ -0,0 +1,53 @@
+"""Time reading ranges from the history file against a CSV of daily sums.
+
+Run from the repository root with ``python -m benchmarks.history``.
+"""
+import os
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from src.history import HISTORY_EPOCH, DailyHistory
+
+
+def main():
+    rng = np.random.default_rng(0)
+    folder = tempfile.mkdtemp()
+    n_days = 25 * 365
+    sales = rng.integers(0, 2_000_000, (n_days, 3))
+
+    history = DailyHistory(f"{folder}/history.bin")
+    history.write(HISTORY_EPOCH, sales)
+
+    csv_path = f"{folder}/history.csv"
+    pd.DataFrame(
+        sales / 100,
+        index=pd.date_range(HISTORY_EPOCH, periods=n_days, freq="D", name="Date"),
+    ).to_csv(csv_path)
+
+    for years in [1, 5, 25]:
+        start = date(2025 - years, 1, 1)
+        end = date(2024, 12, 31)
+
+        begin = time.perf_counter()
+        history.report(start, end)
+        mapped = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        pd.read_csv(csv_path, index_col=0, parse_dates=True).loc[
+            str(start) : str(end)
+        ]
+        parsed = time.perf_counter() - begin
+
+        print(f"{years:>3} years  history {mapped:.4f} s  csv {parsed:.4f} s")
+
+    os.remove(history.path)
+    os.remove(csv_path)
+    os.rmdir(folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compare fetching several shops one after another and concurrently.
+
+Run from the repository root with ``python -m benchmarks.multi_shop``.
+"""
+import tempfile
+import time
+from contextlib import ExitStack
+
+from benchmarks.stub_service import StubService
+from src.async_soap import fetch_all
+from src.soap import DanDomainSOAPHandler
+
+# Latency per day of the range for each stub shop.
+SHOP_DAY_LATENCIES = [0.002, 0.004, 0.008]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory, ExitStack() as stack:
+        configs = []
+        for shop, day_latency in enumerate(SHOP_DAY_LATENCIES):
+            service = stack.enter_context(
+                StubService(orders_per_day=5, call_latency=0.05, day_latency=day_latency)
+            )
+            configs.append(
+                {
+                    "Username": f"shop{shop}",
+                    "Password": "password",
+                    "Wsdl_url": service.wsdl_url,
+                    "Wsdl_cache_path": f"{directory}/wsdl_cache.sqlite",
+                }
+            )
+        jobs = [(config, ("2023-01-01", "2023-12-31")) for config in configs]
+
+        slowest = 0
+        begin = time.perf_counter()
+        for config, date_range in jobs:
+            shop_begin = time.perf_counter()
+            DanDomainSOAPHandler(config).make_soap_request(*date_range)
+            slowest = max(slowest, time.perf_counter() - shop_begin)
+        print(f"one shop at a time  {time.perf_counter() - begin:.2f} s")
+        print(f"slowest single shop {slowest:.2f} s")
+
+        begin = time.perf_counter()
+        results = fetch_all(jobs)
+        print(f"all shops at once   {time.perf_counter() - begin:.2f} s")
+        print(f"orders per shop     {[len(result) for result in results]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Report memory use per million orders of the order representations.
+
+Run from the repository root with ``python -m benchmarks.order_table_memory``.
+"""
+import numpy as np
+import pandas as pd
+
+from src.constants import PAYMENT_METHODS
+from src.order_table import make_order_table
+
+N_ORDERS = 1_000_000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(
+        rng.integers(0, 365 * 24 * 3600, N_ORDERS), unit="s"
+    )
+    amounts = rng.uniform(20, 2000, N_ORDERS).round(2)
+    payments = rng.choice(PAYMENT_METHODS, N_ORDERS).tolist()
+
+    flat = pd.DataFrame(
+        {
+            "Date": dates,
+            "Incl. vat": amounts,
+            "PaymentMethod": pd.Series(payments, dtype=object),
+        }
+    )
+    compact = make_order_table(dates, amounts, payments)
+
+    for name, table in [("flat frame", flat), ("order table", compact)]:
+        usage = table.memory_usage(index=False, deep=True)
+        per_column = ", ".join(
+            f"{column} {size / 1e6:.1f}" for column, size in usage.items()
+        )
+        print(f"{name:<12} {usage.sum() / 1e6:6.1f} MB  ({per_column})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare peak memory of a single order call and a paged fetch.
+
+Run from the repository root with ``python -m benchmarks.paged_fetch``.
+"""
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks.stub_service import stub_process
+from src.soap import DanDomainSOAPHandler
+
+ORDERS_PER_DAY = 100
+
+
+def measure(fetch) -> tuple[float, float]:
+    """Measure time and peak traced memory of a fetch.
+
+    Args:
+        fetch: Function fetching and converting the orders.
+
+    Returns:
+        tuple[float, float]: Seconds and peak memory in MB.
+    """
+    tracemalloc.start()
+    begin = time.perf_counter()
+    fetch()
+    elapsed = time.perf_counter() - begin
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory, stub_process(
+        orders_per_day=ORDERS_PER_DAY
+    ) as wsdl_url:
+        handler = DanDomainSOAPHandler(
+            {
+                "Username": "user",
+                "Password": "password",
+                "Wsdl_url": wsdl_url,
+                "Wsdl_cache_path": f"{directory}/wsdl_cache.sqlite",
+            }
+        )
+        for n_days in [30, 90, 180]:
+            end = (date(2023, 1, 1) + timedelta(days=n_days - 1)).isoformat()
+            single = measure(
+                lambda: handler.orders_to_dataframe(
+                    handler.get_orders("2023-01-01", f"{end} 23:59:59")
+                )
+            )
+            paged = measure(
+                lambda: handler.fetch_orders_paged("2023-01-01", end, page_size=1000)
+            )
+            print(
+                f"{n_days * ORDERS_PER_DAY:>6} orders  "
+                f"single call {single[0]:.2f} s {single[1]:7.1f} MB  "
+                f"paged {paged[0]:.2f} s {paged[1]:6.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Time daily plots with every point labeled against capped labels.
+
+Run from the repository root with ``python -m benchmarks.plot_annotations``.
+"""
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.plotting import plot_bar_chart, plot_by_day
+
+
+def make_daily_report(n_days: int) -> pd.DataFrame:
+    """Create a daily report with random sales.
+
+    Args:
+        n_days (int): Number of days.
+
+    Returns:
+        pd.DataFrame: Daily report, as returned by clean_data.
+    """
+    rng = np.random.default_rng(0)
+    report = pd.DataFrame(
+        rng.uniform(0, 5000, (n_days, 3)).round(2),
+        index=pd.date_range("2023-01-01", periods=n_days, freq="D", name="Date"),
+        columns=["Credit card payment", "Card terminal", "Cash payment"],
+    )
+    report["Total"] = report.sum(axis=1)
+    return report
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        os.makedirs("Reports/benchmark")
+        for n_days in [30, 180, 365, 730]:
+            report = make_daily_report(n_days)
+            for name, options in [
+                ("every point", {"label_spacing": 0}),
+                ("capped", {}),
+                ("top 10", {"label_top": 10}),
+            ]:
+                begin = time.perf_counter()
+                plot_by_day(report, "benchmark", **options)
+                plot_bar_chart(report, "benchmark", **options)
+                elapsed = time.perf_counter() - begin
+                print(f"{n_days:>4} days  {name:<12} {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
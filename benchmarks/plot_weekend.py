@@ -0,0 +1,62 @@
+"""Time weekend shading as the report range grows.
+
+Run from the repository root with ``python -m benchmarks.plot_weekend``.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from matplotlib.axes import Axes
+
+from src.plotting import new_figure, plot_weekend
+
+
+def span_per_weekend(ax: Axes, dataframe: pd.DataFrame) -> None:
+    """The previous implementation, kept as the baseline."""
+    saturdays = [date for date in dataframe.index if date.weekday() == 5]
+
+    for saturday in saturdays:
+        ax.axvspan(
+            saturday - np.timedelta64(12, "h"),
+            saturday + np.timedelta64(36, "h"),
+            color="gray",
+            alpha=0.4,
+        )
+
+
+def time_shading(shade, dataframe: pd.DataFrame, repeats: int = 5) -> float:
+    """Time shading and drawing the weekends of a range.
+
+    Args:
+        shade: Function shading the weekends on an axes.
+        dataframe (pd.DataFrame): Data with a daily date index.
+        repeats (int, optional): Number of runs to take the best of. Defaults to 5.
+
+    Returns:
+        float: Best time in seconds.
+    """
+    timings = []
+    for _ in range(repeats):
+        fig, ax = new_figure()
+        begin = time.perf_counter()
+        shade(ax, dataframe)
+        fig.canvas.draw()
+        timings.append(time.perf_counter() - begin)
+    return min(timings)
+
+
+def main():
+    for n_days in [30, 365, 3650, 36500]:
+        dataframe = pd.DataFrame(
+            index=pd.date_range("1950-01-01", periods=n_days, freq="D", name="Date")
+        )
+        per_span = time_shading(span_per_weekend, dataframe)
+        collection = time_shading(plot_weekend, dataframe)
+        print(
+            f"{n_days:>6} days  one span per weekend {per_span:.3f} s  "
+            f"single collection {collection:.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
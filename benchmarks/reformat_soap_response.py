@@ -0,0 +1,52 @@
+"""Compare the per-row and columnar conversion of SOAP orders.
+
+Run from the repository root with ``python -m benchmarks.reformat_soap_response``.
+"""
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.synthetic import make_soap_orders
+from src.soap import DanDomainSOAPHandler
+
+
+def per_row_reformat(responce: list[dict]) -> list[pd.DataFrame]:
+    """The previous implementation, kept as the baseline."""
+    flat_data = [
+        {
+            "Date": datetime.strptime(entry["DateDelivered"], "%Y-%m-%d %H:%M:%S"),
+            "Incl. vat": entry["Total"] * (1 + entry["Vat"]),
+            "PaymentMethod": entry["Payment"]["Title"],
+        }
+        for entry in responce
+    ]
+    response_df = pd.DataFrame(flat_data)
+
+    credit_card_df = response_df[response_df["PaymentMethod"] == "Kreditkortbetaling"]
+    card_terminal_df = response_df[response_df["PaymentMethod"] == "Kortterminal"]
+    cash_df = response_df[response_df["PaymentMethod"] == "Kontant betaling"]
+
+    return [card_terminal_df, credit_card_df, cash_df]
+
+
+def main():
+    for n_orders in [10_000, 100_000, 1_000_000]:
+        orders = make_soap_orders(n_orders)
+
+        begin = time.perf_counter()
+        per_row_reformat(orders)
+        per_row = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        DanDomainSOAPHandler.reformat_soap_response(orders)
+        columnar = time.perf_counter() - begin
+
+        print(
+            f"{n_orders:>9} orders  per-row {per_row:.3f} s  "
+            f"columnar {columnar:.3f} s  speedup {per_row / columnar:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
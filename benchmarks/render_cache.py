@@ -0,0 +1,45 @@
+"""Time regenerating a report folder with and without the render cache.
+
+Run from the repository root with ``python -m benchmarks.render_cache``.
+"""
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic import make_report
+from src.filehandling import save_dataframe
+from src.plotting import get_all_plots
+from src.render_cache import RenderCache
+from src.rollup import Rollup
+
+PATH = "benchmark_render_cache"
+
+
+def regenerate(report, cache: RenderCache | None) -> float:
+    """Export and plot a report, as report.py does, and time it."""
+    begin = time.perf_counter()
+    rollup = Rollup(report)
+    save_dataframe(report, PATH, rollup.as_dict(), ["xlsx", "csv"], cache)
+    get_all_plots(report, PATH, rollup=rollup, cache=cache)
+    return time.perf_counter() - begin
+
+
+def main():
+    folder = tempfile.mkdtemp()
+    for n_days in [31, 365, 3650]:
+        report = make_report(n_days)
+        cache = RenderCache(f"{folder}/{n_days}")
+        uncached = regenerate(report, None)
+        cold = regenerate(report, cache)
+        warm = regenerate(report, cache)
+        print(
+            f"{n_days:>5} days  uncached {uncached:.2f} s  cold {cold:.2f} s  "
+            f"warm {warm:.3f} s"
+        )
+
+    shutil.rmtree(folder)
+    shutil.rmtree(f"Reports/{PATH}")
+
+
+if __name__ == "__main__":
+    main()
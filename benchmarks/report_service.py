@@ -0,0 +1,68 @@
+"""Time cold and repeated requests to the report service.
+
+Both the report service and a stub SOAP service run locally, so this runs
+offline. Run from the repository root with
+``python -m benchmarks.report_service``.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from urllib.request import urlopen
+
+from benchmarks.stub_service import StubService
+from src.report_service import ReportService
+
+REQUESTS = [
+    "report?start=2024-01-01&end=2024-03-31",
+    "plot/daily.png?start=2024-01-01&end=2024-03-31",
+    "plot/weekly.png?start=2024-01-01&end=2024-03-31",
+    "report?start=2024-04-01&end=2024-04-30&format=csv",
+    "plot/daily.png?start=2024-03-01&end=2024-03-31",
+    "daily?start=2024-02-01&end=2024-03-15",
+]
+
+
+def timed_get(url: str) -> tuple[float, int]:
+    begin = time.perf_counter()
+    with urlopen(url) as response:
+        size = len(response.read())
+    return time.perf_counter() - begin, size
+
+
+def main():
+    cwd = os.getcwd()
+    folder = tempfile.mkdtemp()
+    os.chdir(folder)
+    try:
+        with StubService(orders_per_day=200, call_latency=0.05) as stub:
+            config = {
+                "Wsdl_url": stub.wsdl_url,
+                "Username": "benchmark",
+                "Password": "benchmark",
+                "Use_cache": False,
+                "Wsdl_cache_path": f"{folder}/wsdl_cache.sqlite",
+            }
+            begin = time.perf_counter()
+            service = ReportService(config, ("127.0.0.1", 0))
+            print(f"start up {time.perf_counter() - begin:.3f} s")
+            threading.Thread(target=service.serve_forever, daemon=True).start()
+
+            for request in REQUESTS:
+                cold, size = timed_get(f"{service.url}{request}")
+                warm, _ = timed_get(f"{service.url}{request}")
+                print(
+                    f"{request:<52} {size:>7} bytes  "
+                    f"first {cold * 1000:8.1f} ms  repeat {warm * 1000:6.1f} ms"
+                )
+
+            service.shutdown()
+            service.server_close()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compare repeated scanning and single-pass splitting of export sections.
+
+Run from the repository root with ``python -m benchmarks.seperate_data``.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.clean_csv import segment_data
+
+COLUMNS = [
+    "Item",
+    "Date",
+    "Time",
+    "Item number",
+    "Amount",
+    "Ex. vat",
+    "Vat",
+    "Incl. vat",
+    "Currency",
+    "Employe",
+]
+
+
+def make_cleaned_export(n_sections: int, rows_per_section: int) -> pd.DataFrame:
+    """Create a cleaned export with the given number of sections.
+
+    Args:
+        n_sections (int): Number of payment method sections.
+        rows_per_section (int): Orders in each section.
+
+    Returns:
+        pd.DataFrame: Cleaned export, as returned by clean_file.
+    """
+    rng = np.random.default_rng(0)
+    order = ["Item", "01-12-2023", "12:00", "1", "1", "0", "0", "0", "DKK", ""]
+    rows = []
+    for section in range(n_sections):
+        if section:
+            rows.append([f"Method {section - 1}", *[""] * 9])
+        amounts = rng.uniform(10, 500, rows_per_section).round(2).astype(str)
+        rows.extend([*order[:7], amount, *order[8:]] for amount in amounts)
+        rows.append(["Subtotal", *[""] * 9])
+        rows.append(["", *[""] * 9])
+    rows[-2] = ["Total", *[""] * 9]
+
+    dataframe = pd.DataFrame(rows[:-1], columns=COLUMNS, dtype=object)
+    dataframe.index += 13
+    return dataframe
+
+
+def repeated_scan(dataframe: pd.DataFrame, categories: list[str]) -> list[pd.DataFrame]:
+    """The previous algorithm, kept as the baseline."""
+    seperated_df = {}
+    for category in categories:
+        index = dataframe[dataframe[dataframe.columns[0]] == category].index[0]
+        seperated_df[category] = dataframe.loc[: index - 3].assign(
+            **{"Incl. vat": lambda df: pd.to_numeric(df["Incl. vat"])}
+        )
+        dataframe = dataframe.loc[index + 1 :]
+
+    seperated_df["final"] = dataframe.iloc[:-1].assign(
+        **{"Incl. vat": lambda df: pd.to_numeric(df["Incl. vat"])}
+    )
+
+    return list(seperated_df.values())
+
+
+def main():
+    for n_sections in [10, 100, 1000]:
+        dataframe = make_cleaned_export(n_sections, 100)
+        categories = [f"Method {i}" for i in range(n_sections - 1)]
+
+        begin = time.perf_counter()
+        repeated_scan(dataframe, categories)
+        repeated = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        segment_data(dataframe, categories)
+        single_pass = time.perf_counter() - begin
+
+        print(
+            f"{n_sections:>5} sections {len(dataframe):>7} rows  "
+            f"repeated scan {repeated:.3f} s  single pass {single_pass:.3f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Compare single-call and windowed order fetching against a local stub.
+
+Run from the repository root with ``python -m benchmarks.soap_fetch``.
+"""
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.stub_service import StubService
+from src.soap import DanDomainSOAPHandler
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory, StubService(
+        orders_per_day=20, call_latency=0.05, day_latency=0.01
+    ) as service:
+        handler = DanDomainSOAPHandler(
+            {
+                "Username": "user",
+                "Password": "password",
+                "Wsdl_url": service.wsdl_url,
+                "Wsdl_cache_path": f"{directory}/wsdl_cache.sqlite",
+                "Fetch_workers": 16,
+            }
+        )
+        start = datetime(2023, 1, 1)
+        for n_days in [30, 365, 730]:
+            end = (start + timedelta(days=n_days - 1)).strftime("%Y-%m-%d")
+            for slice_size, max_workers in [(None, 1), ("week", 4), ("week", 16)]:
+                begin = time.perf_counter()
+                handler.make_soap_request(
+                    "2023-01-01", end, slice_size=slice_size, max_workers=max_workers
+                )
+                elapsed = time.perf_counter() - begin
+                print(
+                    f"{n_days:>4} days  slice={str(slice_size):<5} "
+                    f"workers={max_workers:<3} {elapsed:.2f} s"
+                )
+
+
+if __name__ == "__main__":
+    main()
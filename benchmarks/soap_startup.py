@@ -0,0 +1,49 @@
+"""Measure handler start up and per-request overhead against a local stub.
+
+Run from the repository root with ``python -m benchmarks.soap_startup``.
+"""
+import tempfile
+import time
+
+from benchmarks.stub_service import StubService
+from src.soap import DanDomainSOAPHandler, get_handler
+
+N_REQUESTS = 20
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory, StubService(
+        orders_per_day=1, call_latency=0.02
+    ) as service:
+        config = {
+            "Username": "user",
+            "Password": "password",
+            "Wsdl_url": service.wsdl_url,
+            "Wsdl_cache_path": f"{directory}/wsdl_cache.sqlite",
+        }
+
+        begin = time.perf_counter()
+        DanDomainSOAPHandler(config)
+        print(f"cold start, empty WSDL cache  {time.perf_counter() - begin:.3f} s")
+
+        begin = time.perf_counter()
+        DanDomainSOAPHandler(config)
+        print(f"start, cached WSDL            {time.perf_counter() - begin:.3f} s")
+
+        begin = time.perf_counter()
+        for _ in range(N_REQUESTS):
+            DanDomainSOAPHandler(config).fetch_orders("2024-01-01", "2024-01-01")
+        elapsed = (time.perf_counter() - begin) / N_REQUESTS
+        print(f"request with new handler      {elapsed:.3f} s")
+
+        begin = time.perf_counter()
+        for _ in range(N_REQUESTS):
+            get_handler(config).fetch_orders("2024-01-01", "2024-01-01")
+        elapsed = (time.perf_counter() - begin) / N_REQUESTS
+        print(f"request with reused handler   {elapsed:.3f} s")
+
+        print(f"calls made: {service.calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""Local stand-in for the DanDomain SOAP service.
+
+Serves a minimal WSDL with the operations used by DanDomainSOAPHandler and
+answers them with synthetic orders, so the SOAP code can be measured offline.
+"""
+import multiprocessing
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from xml.sax.saxutils import escape
+
+from src.constants import PAYMENT_METHODS
+from src.soap import DATE_FORMAT, parse_date
+
+WSDL = """<?xml version="1.0" encoding="UTF-8"?>
+<definitions xmlns="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="urn:stub" targetNamespace="urn:stub">
+  <types>
+    <xsd:schema targetNamespace="urn:stub" elementFormDefault="qualified">
+      <xsd:complexType name="Payment">
+        <xsd:sequence>
+          <xsd:element name="Title" type="xsd:string"/>
+        </xsd:sequence>
+      </xsd:complexType>
+      <xsd:complexType name="Order">
+        <xsd:sequence>
+          <xsd:element name="Id" type="xsd:int"/>
+          <xsd:element name="Status" type="xsd:string"/>
+          <xsd:element name="Payment" type="tns:Payment"/>
+          <xsd:element name="Vat" type="xsd:double"/>
+          <xsd:element name="Total" type="xsd:double"/>
+          <xsd:element name="DateDelivered" type="xsd:string"/>
+        </xsd:sequence>
+      </xsd:complexType>
+      <xsd:element name="Solution_Connect">
+        <xsd:complexType>
+          <xsd:sequence>
+            <xsd:element name="Username" type="xsd:string"/>
+            <xsd:element name="Password" type="xsd:string"/>
+          </xsd:sequence>
+        </xsd:complexType>
+      </xsd:element>
+      <xsd:element name="Solution_ConnectResponse">
+        <xsd:complexType>
+          <xsd:sequence>
+            <xsd:element name="Solution_ConnectResult" type="xsd:boolean"/>
+          </xsd:sequence>
+        </xsd:complexType>
+      </xsd:element>
+      <xsd:element name="Order_SetFields">
+        <xsd:complexType>
+          <xsd:sequence>
+            <xsd:element name="Fields" type="xsd:string"/>
+          </xsd:sequence>
+        </xsd:complexType>
+      </xsd:element>
+      <xsd:element name="Order_SetFieldsResponse">
+        <xsd:complexType>
+          <xsd:sequence/>
+        </xsd:complexType>
+      </xsd:element>
+      <xsd:element name="Order_GetByDate">
+        <xsd:complexType>
+          <xsd:sequence>
+            <xsd:element name="Start" type="xsd:string"/>
+            <xsd:element name="End" type="xsd:string"/>
+            <xsd:element name="Status" type="xsd:string"/>
+          </xsd:sequence>
+        </xsd:complexType>
+      </xsd:element>
+      <xsd:element name="Order_GetByDateResponse">
+        <xsd:complexType>
+          <xsd:sequence>
+            <xsd:element name="Order_GetByDateResult" type="tns:Order"
+                minOccurs="0" maxOccurs="unbounded"/>
+          </xsd:sequence>
+        </xsd:complexType>
+      </xsd:element>
+    </xsd:schema>
+  </types>
+  {messages}
+  <portType name="WebServicePort">{port_operations}</portType>
+  <binding name="WebServiceBinding" type="tns:WebServicePort">
+    <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+    {binding_operations}
+  </binding>
+  <service name="WebService">
+    <port name="WebServicePort" binding="tns:WebServiceBinding">
+      <soap:address location="{location}"/>
+    </port>
+  </service>
+</definitions>
+"""
+
+OPERATIONS = ["Solution_Connect", "Order_SetFields", "Order_GetByDate"]
+
+ENVELOPE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" '
+    'xmlns:tns="urn:stub"><soap:Body>{body}</soap:Body></soap:Envelope>'
+)
+
+FAULT = (
+    "<soap:Fault><faultcode>soap:Client</faultcode>"
+    "<faultstring>{message}</faultstring></soap:Fault>"
+)
+
+
+def render_wsdl(location: str) -> str:
+    """Fill in the operations and address of the stub WSDL.
+
+    Args:
+        location (str): URL the SOAP calls should be sent to.
+
+    Returns:
+        str: WSDL document.
+    """
+    messages = "".join(
+        f'<message name="{name}{suffix}">'
+        f'<part name="parameters" element="tns:{name}{suffix}"/></message>'
+        for name in OPERATIONS
+        for suffix in ["", "Response"]
+    )
+    port_operations = "".join(
+        f'<operation name="{name}"><input message="tns:{name}"/>'
+        f'<output message="tns:{name}Response"/></operation>'
+        for name in OPERATIONS
+    )
+    binding_operations = "".join(
+        f'<operation name="{name}"><soap:operation soapAction="{name}"/>'
+        '<input><soap:body use="literal"/></input>'
+        '<output><soap:body use="literal"/></output></operation>'
+        for name in OPERATIONS
+    )
+    return WSDL.format(
+        messages=messages,
+        port_operations=port_operations,
+        binding_operations=binding_operations,
+        location=location,
+    )
+
+
+def render_orders(start: str, end: str, orders_per_day: int) -> str:
+    """Create synthetic orders delivered within a range.
+
+    Orders are spread evenly over each day and are the same whichever range
+    they are requested in.
+
+    Args:
+        start (str): Date of earliest orders.
+        end (str): Date of latest orders.
+        orders_per_day (int): Number of orders each day.
+
+    Returns:
+        str: Orders as response elements.
+    """
+    first, last = parse_date(start), parse_date(end)
+    day = datetime(first.year, first.month, first.day)
+    spacing = timedelta(days=1) / orders_per_day
+
+    orders = []
+    while day <= last:
+        rng = random.Random(day.toordinal())
+        for order in range(orders_per_day):
+            title = rng.choice(PAYMENT_METHODS)
+            total = rng.uniform(20, 2000)
+            delivered = day + order * spacing
+            if not first <= delivered <= last:
+                continue
+            orders.append(
+                "<tns:Order_GetByDateResult>"
+                f"<tns:Id>{day.toordinal() * orders_per_day + order}</tns:Id>"
+                "<tns:Status>8</tns:Status>"
+                f"<tns:Payment><tns:Title>{escape(title)}</tns:Title></tns:Payment>"
+                "<tns:Vat>0.25</tns:Vat>"
+                f"<tns:Total>{total:.2f}</tns:Total>"
+                f"<tns:DateDelivered>{delivered.strftime(DATE_FORMAT)}"
+                "</tns:DateDelivered>"
+                "</tns:Order_GetByDateResult>"
+            )
+        day += timedelta(days=1)
+
+    return "".join(orders)
+
+
+class StubService(ThreadingHTTPServer):
+    """Stub SOAP server running in a background thread.
+
+    Args:
+        orders_per_day (int, optional): Orders returned for each day. Defaults to 20.
+        call_latency (float, optional): Seconds added to every call. Defaults to 0.
+        day_latency (float, optional): Seconds added per day of an order range.
+            Defaults to 0.
+        session_calls (int, optional): Number of calls a session is valid for
+            before a fault asks the client to connect again. Defaults to None,
+            never expiring.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        orders_per_day: int = 20,
+        call_latency: float = 0,
+        day_latency: float = 0,
+        session_calls: int = None,
+    ):
+        super().__init__(("127.0.0.1", 0), StubRequestHandler)
+        self.orders_per_day = orders_per_day
+        self.call_latency = call_latency
+        self.day_latency = day_latency
+        self.session_calls = session_calls
+        self.sessions = {}
+        self.calls = {name: 0 for name in OPERATIONS}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    @property
+    def wsdl_url(self) -> str:
+        return f"{self.url}service.wsdl"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    server: StubService
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(
+        self,
+        body: str,
+        content_type: str,
+        headers: dict = None,
+        status: int = 200,
+    ) -> None:
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.send(render_wsdl(self.server.url), "text/xml")
+
+    def do_POST(self):
+        request = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        operation = re.search(r"<(?:\w+:)?(\w+)[ >]", request.split("Body", 1)[1])[1]
+        fields = dict(re.findall(r"<(?:\w+:)?(\w+)>([^<]*)</", request))
+        server = self.server
+        time.sleep(server.call_latency)
+
+        with server.lock:
+            server.calls[operation] += 1
+            cookie = re.search(r"session=(\w+)", self.headers.get("Cookie", ""))
+            session = cookie[1] if cookie else None
+            if operation == "Solution_Connect":
+                session = f"s{len(server.sessions)}"
+                server.sessions[session] = 0
+                headers = {"Set-Cookie": f"session={session}; Path=/"}
+            elif session not in server.sessions or (
+                server.session_calls is not None
+                and server.sessions[session] >= server.session_calls
+            ):
+                body = FAULT.format(message="Not connected")
+                self.send(ENVELOPE.format(body=body), "text/xml", status=500)
+                return
+            else:
+                server.sessions[session] += 1
+                headers = {}
+
+        if operation == "Solution_Connect":
+            body = (
+                "<tns:Solution_ConnectResponse><tns:Solution_ConnectResult>true"
+                "</tns:Solution_ConnectResult></tns:Solution_ConnectResponse>"
+            )
+        elif operation == "Order_SetFields":
+            body = "<tns:Order_SetFieldsResponse/>"
+        else:
+            n_days = (parse_date(fields["End"]) - parse_date(fields["Start"])).days + 1
+            time.sleep(server.day_latency * n_days)
+            orders = render_orders(
+                fields["Start"], fields["End"], server.orders_per_day
+            )
+            body = f"<tns:Order_GetByDateResponse>{orders}</tns:Order_GetByDateResponse>"
+
+        self.send(ENVELOPE.format(body=body), "text/xml", headers)
+
+
+def serve(queue: multiprocessing.Queue, kwargs: dict) -> None:
+    with StubService(**kwargs) as service:
+        queue.put(service.wsdl_url)
+        threading.Event().wait()
+
+
+@contextmanager
+def stub_process(**kwargs) -> Iterator[str]:
+    """Run a stub service in a separate process.
+
+    Keeps the allocations of the stub out of memory measurements.
+
+    Args:
+        **kwargs: Passed on to StubService.
+
+    Yields:
+        Iterator[str]: URL of the WSDL.
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(queue, kwargs), daemon=True)
+    process.start()
+    try:
+        yield queue.get()
+    finally:
+        process.terminate()
+        process.join()
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,233 @@
+"""Benchmarks of parsing, cleaning, aggregation and plotting by order count.
+
+The classes follow the asv conventions (params, setup and time_ methods),
+and can also be run directly from the repository root with
+``python -m benchmarks.suite [n_orders ...]``. All data is synthetic, so
+nothing is fetched from DanDomain.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import (
+    make_order_columns,
+    make_soap_orders,
+    write_csv_export,
+)
+from src.analytics import OrderAnalytics
+from src.clean_csv import clean_file, read_csv_orders, stream_sum_up_csv, sum_up_csv
+from src.data_handler import clean_data
+from src.metrics import rolling_metrics
+from src.order_table import sum_kroner
+from src.plotting import plot_bar_chart, plot_by_day, plot_by_month, plot_by_week
+from src.rollup import Rollup
+from src.soap import DanDomainSOAPHandler, columns_to_dataframe, parse_orders_xml
+
+SIZES = [1_000, 100_000, 1_000_000]
+
+# Orders are spread over one day per this many orders, so larger benchmarks
+# also cover longer reports.
+ORDERS_PER_DAY = 250
+
+RESPONSE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" '
+    'xmlns:tns="urn:stub"><soap:Body><tns:Order_GetByDateResponse>{orders}'
+    "</tns:Order_GetByDateResponse></soap:Body></soap:Envelope>"
+)
+
+ORDER = (
+    "<tns:Order_GetByDateResult><tns:Id>{Id}</tns:Id>"
+    "<tns:Status>{Status}</tns:Status>"
+    "<tns:Payment><tns:Title>{Payment[Title]}</tns:Title></tns:Payment>"
+    "<tns:Vat>{Vat}</tns:Vat><tns:Total>{Total}</tns:Total>"
+    "<tns:DateDelivered>{DateDelivered}</tns:DateDelivered>"
+    "</tns:Order_GetByDateResult>"
+)
+
+
+def n_days(n_orders: int) -> int:
+    return max(7, n_orders // ORDERS_PER_DAY)
+
+
+def make_orders(n_orders: int) -> list[pd.DataFrame]:
+    """Create orders split by payment method, as returned by load_data.
+
+    Args:
+        n_orders (int): Number of orders.
+
+    Returns:
+        list[pd.DataFrame]: Card terminal, credit card and cash orders.
+    """
+    columns = make_order_columns(n_orders, n_days=n_days(n_orders))
+    return DanDomainSOAPHandler.split_by_payment(
+        columns_to_dataframe(
+            columns["DateDelivered"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+            columns["Total"],
+            columns["Vat"],
+            columns["Payment"],
+        )
+    )
+
+
+class Benchmark:
+    params = SIZES
+    param_names = ["n_orders"]
+    timeout = 600
+
+
+class Parsing(Benchmark):
+    def setup(self, n_orders):
+        self.folder = tempfile.mkdtemp()
+        self.export = f"{self.folder}/export.csv"
+        write_csv_export(self.export, n_orders, n_days=n_days(n_orders))
+        self.raw_export = pd.read_csv(
+            self.export, sep=";", encoding="iso 8859-10", dtype=object
+        )
+
+        self.soap_orders = make_soap_orders(n_orders, n_days=n_days(n_orders))
+        self.response = RESPONSE.format(
+            orders="".join(ORDER.format(**order) for order in self.soap_orders)
+        ).encode()
+
+    def teardown(self, n_orders):
+        shutil.rmtree(self.folder)
+
+    def time_reformat_soap_response(self, n_orders):
+        DanDomainSOAPHandler.reformat_soap_response(self.soap_orders)
+
+    def time_parse_orders_xml(self, n_orders):
+        parse_orders_xml(self.response)
+
+    def time_sum_up_csv(self, n_orders):
+        sum_up_csv(self.raw_export.copy())
+
+    def time_stream_sum_up_csv(self, n_orders):
+        stream_sum_up_csv(self.export)
+
+    def time_read_csv_orders(self, n_orders):
+        read_csv_orders(self.export)
+
+
+class Cleaning(Benchmark):
+    def setup(self, n_orders):
+        self.orders = make_orders(n_orders)
+
+        folder = tempfile.mkdtemp()
+        write_csv_export(f"{folder}/export.csv", n_orders, n_days=n_days(n_orders))
+        self.raw_export = pd.read_csv(
+            f"{folder}/export.csv", sep=";", encoding="iso 8859-10", dtype=object
+        ).tail(-13)
+        self.raw_export.columns = [
+            "Item",
+            "Date",
+            "Time",
+            "Item number",
+            "Amount",
+            "Ex. vat",
+            "Vat",
+            "Incl. vat",
+            "Currency",
+            "Employe",
+            *self.raw_export.columns[10:],
+        ]
+        shutil.rmtree(folder)
+
+    def time_clean_data(self, n_orders):
+        clean_data(self.orders, sort_by_order=True)
+
+    def time_clean_file(self, n_orders):
+        clean_file(self.raw_export.copy())
+
+
+class Aggregation(Benchmark):
+    def setup(self, n_orders):
+        self.orders = make_orders(n_orders)
+        self.order_table = pd.concat(self.orders, ignore_index=True)
+        self.report = clean_data(self.orders, sort_by_order=True)
+        self.daily = Rollup(self.report).day
+
+    def time_sum_kroner(self, n_orders):
+        for orders in self.orders:
+            sum_kroner(orders)
+
+    def time_rollup(self, n_orders):
+        Rollup(self.report).as_dict()
+
+    def time_rolling_metrics(self, n_orders):
+        rolling_metrics(self.daily)
+
+    def time_order_analytics(self, n_orders):
+        analytics = OrderAnalytics(self.order_table)
+        analytics.mean_hour_weekday()
+        analytics.basket_sizes()
+        analytics.weekly_hours()
+
+
+class Plotting(Benchmark):
+    def setup(self, n_orders):
+        self.rollup = Rollup(clean_data(make_orders(n_orders), sort_by_order=True))
+        self.rollup.as_dict()
+
+        self.cwd = os.getcwd()
+        self.folder = tempfile.mkdtemp()
+        os.chdir(self.folder)
+
+    def teardown(self, n_orders):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder)
+
+    def time_plot_by_day(self, n_orders):
+        plot_by_day(self.rollup.day, "benchmark")
+
+    def time_plot_by_week(self, n_orders):
+        plot_by_week(self.rollup.week, "benchmark")
+
+    def time_plot_by_month(self, n_orders):
+        plot_by_month(self.rollup.month, "benchmark")
+
+    def time_plot_bar_chart(self, n_orders):
+        plot_bar_chart(self.rollup.day, "benchmark")
+
+
+def run(benchmark: type[Benchmark], n_orders: int, repeats: int) -> None:
+    """Run and print every time_ method of a benchmark for one size.
+
+    Args:
+        benchmark (type[Benchmark]): Benchmark class.
+        n_orders (int): Number of orders.
+        repeats (int): Number of runs to take the best of.
+    """
+    instance = benchmark()
+    instance.setup(n_orders)
+    try:
+        for name in dir(instance):
+            if not name.startswith("time_"):
+                continue
+            timings = []
+            for _ in range(repeats):
+                begin = time.perf_counter()
+                getattr(instance, name)(n_orders)
+                timings.append(time.perf_counter() - begin)
+            print(
+                f"{benchmark.__name__ + '.' + name:<40} {n_orders:>9} orders  "
+                f"{min(timings):.3f} s"
+            )
+    finally:
+        if hasattr(instance, "teardown"):
+            instance.teardown(n_orders)
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    for benchmark in [Parsing, Cleaning, Aggregation, Plotting]:
+        for n_orders in sizes:
+            run(benchmark, n_orders, repeats=3 if n_orders < 1_000_000 else 1)
+
+
+if __name__ == "__main__":
+    main()
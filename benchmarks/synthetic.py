@@ -0,0 +1,262 @@
+"""Synthetic DanDomain data for benchmarks.
+
+Orders follow the opening hours of a shop: most sales are made around noon
+and late afternoon, Saturdays are busiest and Sundays quiet, and basket
+sizes are log-normal. Everything is seeded, so the same arguments always give
+the same data.
+"""
+import csv
+
+import numpy as np
+import pandas as pd
+
+from src.constants import PAYMENT_METHODS, REPORT_COLUMNS
+from src.soap import DATE_FORMAT
+
+# Relative number of orders in each hour of the day and each weekday.
+HOUR_WEIGHTS = np.array(
+    [0, 0, 0, 0, 0, 0, 0, 1, 3, 5, 7, 9, 10, 8, 7, 8, 10, 9, 6, 3, 1, 0, 0, 0],
+    dtype=float,
+)
+WEEKDAY_WEIGHTS = np.array([0.8, 0.8, 0.9, 1.0, 1.3, 1.6, 0.4])
+PAYMENT_WEIGHTS = np.array([0.7, 0.2, 0.1])
+
+EXPORT_COLUMNS = [
+    "Item",
+    "Date",
+    "Time",
+    "Item number",
+    "Amount",
+    "Ex. vat",
+    "Vat",
+    "Incl. vat",
+    "Currency",
+    "Employe",
+]
+
+ITEMS = [
+    "Hakket oksekød 8-12%",
+    "Kyllingebryst",
+    "Flæskesteg med svær",
+    "Medisterpølse",
+    "Oksemørbrad",
+    "Frikadeller",
+    "Hamburgerryg",
+    "Leverpostej",
+]
+
+
+def make_order_columns(
+    n_orders: int,
+    start: str = "2023-01-01",
+    n_days: int = 365,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Draw the delivery time, total, vat and payment method of orders.
+
+    Args:
+        n_orders (int): Number of orders.
+        start (str, optional): First day of orders. Defaults to "2023-01-01".
+        n_days (int, optional): Number of days the orders are spread over.
+            Defaults to 365.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: Orders sorted by "DateDelivered", with "Total"
+            excluding vat, "Vat" and "Payment".
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(start, periods=n_days, freq="D")
+    day_weights = WEEKDAY_WEIGHTS[days.weekday]
+
+    day = rng.choice(n_days, n_orders, p=day_weights / day_weights.sum())
+    hour = rng.choice(24, n_orders, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    second = rng.integers(0, 3600, n_orders)
+    delivered = days.to_numpy()[day] + (
+        hour * 3600 + second
+    ).astype("timedelta64[s]")
+
+    incl_vat = np.exp(rng.normal(5.5, 0.8, n_orders)).clip(10, 20000)
+    payment = rng.choice(len(PAYMENT_METHODS), n_orders, p=PAYMENT_WEIGHTS)
+
+    orders = pd.DataFrame(
+        {
+            "DateDelivered": delivered,
+            "Total": (incl_vat / 1.25).round(2),
+            "Vat": 0.25,
+            "Payment": np.asarray(PAYMENT_METHODS)[payment],
+        }
+    )
+    return orders.sort_values("DateDelivered", ignore_index=True)
+
+
+def make_soap_orders(
+    n_orders: int,
+    start: str = "2023-01-01",
+    n_days: int = 365,
+    seed: int = 0,
+) -> list[dict]:
+    """Create orders shaped like the Order_GetByDate response.
+
+    Args:
+        n_orders (int): Number of orders.
+        start (str, optional): First day of orders. Defaults to "2023-01-01".
+        n_days (int, optional): Number of days the orders are spread over.
+            Defaults to 365.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        list[dict]: Orders with the fields requested by the handler.
+    """
+    columns = make_order_columns(n_orders, start, n_days, seed)
+    dates = columns["DateDelivered"].dt.strftime(DATE_FORMAT).tolist()
+
+    return [
+        {
+            "Id": order_id,
+            "Status": "8",
+            "Payment": {"Title": payment},
+            "Vat": 0.25,
+            "Total": total,
+            "DateDelivered": date,
+        }
+        for order_id, (date, total, payment) in enumerate(
+            zip(dates, columns["Total"].tolist(), columns["Payment"].tolist()),
+            start=1,
+        )
+    ]
+
+
+def export_rows(
+    n_orders: int,
+    start: str,
+    n_days: int,
+    seed: int,
+    skew: float,
+    max_split: int,
+) -> tuple[list[str], list[list[str]]]:
+    """Create the rows of a dandomain export, see write_csv_export."""
+    rng = np.random.default_rng(seed + 1)
+    columns = make_order_columns(n_orders, start, n_days, seed)
+    categories = PAYMENT_METHODS[:2]
+    final = PAYMENT_METHODS[2]
+
+    overview = [
+        ["Omsætningsrapport", *[""] * 9],
+        [f"Periode: {start}", *[""] * 9],
+        *[[""] * 10 for _ in range(3)],
+        ["Betalingsmetode", "Antal", "Beløb", *[""] * 7],
+        ["Alle", str(n_orders), "", *[""] * 7],
+        *[[category, "", "", *[""] * 7] for category in categories],
+        ["I alt", str(n_orders), "", *[""] * 7],
+        *[[""] * 10 for _ in range(3)],
+    ]
+
+    n_split = np.where(
+        rng.random(n_orders) < skew, rng.integers(1, max_split + 1, n_orders), 0
+    )
+    item = rng.integers(0, len(ITEMS), n_orders)
+    amount = rng.integers(1, 5, n_orders)
+
+    incl_vat = columns["Total"].to_numpy() * 1.25
+    days = columns["DateDelivered"].dt.strftime("%d-%m-%Y").tolist()
+    times = columns["DateDelivered"].dt.strftime("%H:%M").tolist()
+    payments = columns["Payment"].to_numpy()
+
+    rows = []
+    for section, method in enumerate([*categories, final]):
+        in_section = np.flatnonzero(payments == method)
+        for position in in_section:
+            # Long names spill over into the following columns.
+            name = ITEMS[item[position]] + " ekstra lang" * n_split[position]
+            piece_length = -(-len(name) // (n_split[position] + 1))
+            rows.append(
+                [
+                    *[
+                        name[offset : offset + piece_length]
+                        for offset in range(0, len(name), piece_length)
+                    ],
+                    days[position],
+                    times[position],
+                    str(1000 + item[position]),
+                    str(amount[position]),
+                    f"{incl_vat[position] * 0.8:.2f}",
+                    f"{incl_vat[position] * 0.2:.2f}",
+                    f"{incl_vat[position]:.2f}",
+                    "DKK",
+                    "Kasse 1",
+                ]
+            )
+
+        total = f"{incl_vat[in_section].sum():.2f}"
+        if section < len(categories):
+            rows.append(["Subtotal", "", "", "", "", "", "", total, "DKK", ""])
+            rows.append([""] * 10)
+            rows.append([method, *[""] * 9])
+        else:
+            rows.append(["Total", "", "", "", "", "", "", total, "DKK", ""])
+
+    header = [*EXPORT_COLUMNS, *[f"Unnamed {i}" for i in range(max_split + 1)]]
+    return header, overview + rows
+
+
+def write_csv_export(
+    path: str,
+    n_orders: int,
+    start: str = "2023-01-01",
+    n_days: int = 365,
+    seed: int = 0,
+    skew: float = 0.05,
+    max_split: int = 3,
+) -> None:
+    """Write a dandomain export of synthetic orders.
+
+    The export has a header, a 13 row overview naming the first two payment
+    methods, and one section per payment method. A share of the item names
+    are long enough to be split over up to max_split extra columns, which
+    squish_row and repair_row have to undo.
+
+    Args:
+        path (str): Path of the export.
+        n_orders (int): Number of orders.
+        start (str, optional): First day of orders. Defaults to "2023-01-01".
+        n_days (int, optional): Number of days the orders are spread over.
+            Defaults to 365.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+        skew (float, optional): Share of rows with a split item name.
+            Defaults to 0.05.
+        max_split (int, optional): Most extra columns a name is split over.
+            Defaults to 3.
+    """
+    header, rows = export_rows(n_orders, start, n_days, seed, skew, max_split)
+    with open(path, "w", encoding="iso 8859-10", newline="") as file:
+        writer = csv.writer(file, delimiter=";")
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def make_report(n_days: int, start: str = "2023-01-01", seed: int = 0) -> pd.DataFrame:
+    """Create a report like the one returned by clean_data.
+
+    Args:
+        n_days (int): Number of days.
+        start (str, optional): First day. Defaults to "2023-01-01".
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: Daily sales per payment method and in total.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n_days, freq="D", name="Date")
+    scale = WEEKDAY_WEIGHTS[index.weekday][:, None] * PAYMENT_WEIGHTS
+    report = pd.DataFrame(
+        (rng.gamma(4, 2500, (n_days, 3)) * scale).round(2),
+        index=index,
+        columns=REPORT_COLUMNS,
+    )
+    report["Total"] = report.sum(axis=1)
+    return report
+
+
+if __name__ == "__main__":
+    pass
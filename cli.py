@@ -0,0 +1,444 @@
+"""Create reports from the command line, without the GUI.
+
+Dates, shops and outputs are given as arguments, so the date range is never
+written to the config file. matplotlib, zeep and tkinter are only imported
+by the subcommands that need them, which keeps scheduled runs quick to start.
+
+Examples:
+    python cli.py report 2024-01-01 2024-01-31 --shop config --format xlsx csv
+    python cli.py daily --no-plots
+    python cli.py analytics 2024-01-01 2024-06-30 --no-cache
+    python cli.py ingest Data/Exports --store Data/export_sums.csv
+    python cli.py history from-exports Data/Exports
+    python cli.py history plot 2020-01-01 2024-12-31
+    python cli.py serve --port 8000
+"""
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+def date_argument(value: str) -> str:
+    """Check that an argument is a date, with or without a time of day.
+
+    Args:
+        value (str): Argument.
+
+    Returns:
+        str: The argument unchanged.
+    """
+    for date_format in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
+        try:
+            datetime.strptime(value, date_format)
+            return value
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"Not a date: {value}")
+
+
+def shop_configs(args: argparse.Namespace, start_date: str, end_date: str) -> dict:
+    """Load the config of each shop and fill in the date range.
+
+    The config files are only read, never written.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments.
+        start_date (str): Date of earliest orders.
+        end_date (str): Date of latest orders.
+
+    Returns:
+        dict: Config per shop name.
+    """
+    from src.filehandling import load_config
+
+    configs = {}
+    for shop in args.shop or ["config"]:
+        config = load_config(shop)
+        config["Start_date"], config["End_date"] = start_date, end_date
+        if args.no_cache:
+            config["Use_cache"] = False
+        configs[shop] = config
+    return configs
+
+
+def fetch_reports(configs: dict, sort_by_order: bool) -> dict:
+    """Download and clean the data of each shop.
+
+    Args:
+        configs (dict): Config per shop name.
+        sort_by_order (bool): Define sorting method.
+
+    Returns:
+        dict: Report per shop name, without shops that failed.
+    """
+    from src.data_handler import get_and_clean_data, get_and_clean_shops
+
+    if len(configs) == 1:
+        reports = [get_and_clean_data(next(iter(configs.values())), sort_by_order)]
+    else:
+        jobs = [
+            (config, (config["Start_date"], config["End_date"]))
+            for config in configs.values()
+        ]
+        reports = get_and_clean_shops(jobs, sort_by_order)
+
+    return {
+        shop: report
+        for shop, report in zip(configs, reports)
+        if report is not None and not report.empty
+    }
+
+
+def write_outputs(
+    report, path: str, formats: list[str], plots: bool, cache=None
+) -> None:
+    """Export a report and, unless disabled, plot it while it is exported.
+
+    Args:
+        report (pd.DataFrame): Report as returned by clean_data.
+        path (str): Folder under Reports the outputs are written to.
+        formats (list[str]): Export formats, see save_dataframe.
+        plots (bool): Whether to render the plots.
+        cache (RenderCache, optional): Cache of rendered outputs. Defaults to
+            None.
+    """
+    from src.filehandling import save_dataframe, save_timings
+    from src.rollup import Rollup
+
+    rollup = Rollup(report)
+    if not plots:
+        timings = save_dataframe(report, path, rollup.as_dict(), formats, cache)
+    else:
+        from src.plotting import get_all_plots
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            export = executor.submit(
+                save_dataframe, report, path, rollup.as_dict(), formats, cache
+            )
+            get_all_plots(report, path, rollup=rollup, cache=cache)
+            timings = export.result()
+
+    save_timings(timings, path)
+
+
+def run_reports(
+    args: argparse.Namespace,
+    start_date: str,
+    end_date: str,
+    default_path: str,
+    sort_by_order: bool,
+) -> None:
+    """Create the report of every shop for a date range.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments.
+        start_date (str): Date of earliest orders.
+        end_date (str): Date of latest orders.
+        default_path (str): Output folder used when none is given, formatted
+            with the first and last day of the report.
+        sort_by_order (bool): Define sorting method.
+    """
+    from src.render_cache import get_render_cache
+
+    configs = shop_configs(args, start_date, end_date)
+    reports = fetch_reports(configs, sort_by_order)
+    for shop in configs:
+        if shop not in reports:
+            print(f"No orders found for {shop}")
+
+    for shop, report in reports.items():
+        path = args.output or default_path.format(
+            first=report.index[0].strftime("%Y-%m-%d"),
+            last=report.index[-1].strftime("%Y-%m-%d"),
+        )
+        if len(configs) > 1:
+            path = f"{path}/{shop}"
+
+        formats = args.format or configs[shop].get("Export_formats", ["xlsx"])
+        write_outputs(
+            report, path, formats, not args.no_plots, get_render_cache(configs[shop])
+        )
+
+
+def report_command(args: argparse.Namespace) -> None:
+    run_reports(
+        args, args.start_date, args.end_date, "{first}_to_{last}", sort_by_order=False
+    )
+
+
+def daily_command(args: argparse.Namespace) -> None:
+    from src.filehandling import yesterday_range
+
+    run_reports(args, *yesterday_range(), "Daily_report_{first}", sort_by_order=True)
+
+
+def analytics_command(args: argparse.Namespace) -> None:
+    import pandas as pd
+
+    from src.analytics import WEEKDAYS, OrderAnalytics
+    from src.data_handler import load_orders
+    from src.filehandling import save_dataframe, save_timings
+    from src.render_cache import get_render_cache
+
+    configs = shop_configs(args, args.start_date, args.end_date)
+    for shop, config in configs.items():
+        analytics = OrderAnalytics(load_orders(config))
+        path = args.output or f"Analytics_{args.start_date}_to_{args.end_date}"
+        if len(configs) > 1:
+            path = f"{path}/{shop}"
+
+        hour_weekday = pd.DataFrame(
+            analytics.mean_hour_weekday(), index=pd.Index(WEEKDAYS, name="Weekday")
+        )
+        formats = args.format or config.get("Export_formats", ["xlsx"])
+        timings = save_dataframe(
+            hour_weekday,
+            path,
+            {"Baskets": analytics.basket_sizes(), "Weeks": analytics.weekly_hours()},
+            formats,
+            get_render_cache(config),
+        )
+        save_timings(timings, path)
+
+        if not args.no_plots:
+            from src.plotting import plot_order_analytics
+
+            plot_order_analytics(analytics, path)
+
+
+def ingest_command(args: argparse.Namespace) -> None:
+    from src.clean_csv import ingest_exports
+
+    ingest_exports(args.folder, args.store, args.pattern, args.workers)
+
+
+def history_command(args: argparse.Namespace) -> None:
+    from src.history import DailyHistory, rebuild_from_exports, rebuild_from_soap
+
+    history = DailyHistory(args.file)
+    if args.action == "from-soap":
+        if len(args.shop or []) > 1:
+            print("A history file holds one shop, use a --file per shop")
+            return
+        start = datetime.strptime(args.start_date[:10], "%Y-%m-%d").date()
+        end = datetime.strptime(args.end_date[:10], "%Y-%m-%d").date()
+        configs = shop_configs(args, args.start_date, args.end_date)
+        rebuild_from_soap(next(iter(configs.values())), start, end, history)
+    elif args.action == "from-exports":
+        from src.clean_csv import ingest_exports
+
+        sums = ingest_exports(args.folder, args.store, args.pattern, args.workers)
+        if sums is not None:
+            rebuild_from_exports(sums, history)
+    elif args.action == "metrics":
+        from src.metrics import METRICS_PATH, RollingMetrics, rolling_metrics
+
+        recorded = history.recorded_range()
+        if recorded is None:
+            print("History is empty")
+            return
+        if os.path.exists(METRICS_PATH):
+            os.remove(METRICS_PATH)
+        metrics = RollingMetrics(METRICS_PATH)
+        rolling_metrics(history.report(*recorded), metrics)
+        metrics.save()
+        print(f"Rolling metrics reach {metrics.last_day}")
+    else:
+        from src.plotting import plot_by_month, plot_yearly_comparisson
+        from src.rollup import Rollup
+
+        start = datetime.strptime(args.start_date[:10], "%Y-%m-%d").date()
+        end = datetime.strptime(args.end_date[:10], "%Y-%m-%d").date()
+        monthly = Rollup(history.report(start, end)).month
+        path = args.output or f"History_{start}_to_{end}"
+        plot_by_month(monthly, path)
+        plot_yearly_comparisson(monthly, path)
+
+    recorded = history.recorded_range()
+    if recorded is not None:
+        print(f"History holds {recorded[0]} to {recorded[1]}")
+
+
+def serve_command(args: argparse.Namespace) -> None:
+    from src.filehandling import load_config
+    from src.report_service import serve
+
+    config = load_config(args.shop)
+    if args.no_cache:
+        config["Use_cache"] = False
+    serve(config, args.host, args.port)
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Create sales reports.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a run log with the time and memory of each stage.",
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="Also dump a cProfile profile of the run.",
+    )
+
+    outputs = argparse.ArgumentParser(add_help=False)
+    outputs.add_argument(
+        "--shop",
+        action="append",
+        help="Name of a config file in Config with the login of a shop. "
+        "Can be given several times. Defaults to config.",
+    )
+    outputs.add_argument(
+        "--output",
+        help="Folder under Reports to write to. Defaults to one named after "
+        "the dates of the report.",
+    )
+    outputs.add_argument(
+        "--format",
+        nargs="+",
+        choices=["xlsx", "parquet", "csv"],
+        help="Export formats. Defaults to Export_formats of the config.",
+    )
+    outputs.add_argument(
+        "--no-plots", action="store_true", help="Only export the data."
+    )
+    outputs.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not use the order cache or the render cache.",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report = subparsers.add_parser(
+        "report", parents=[outputs], help="Create a report for a date range."
+    )
+    report.add_argument("start_date", type=date_argument, help="YYYY-MM-DD")
+    report.add_argument("end_date", type=date_argument, help="YYYY-MM-DD")
+    report.set_defaults(run=report_command)
+
+    daily = subparsers.add_parser(
+        "daily", parents=[outputs], help="Create a report for yesterday."
+    )
+    daily.set_defaults(run=daily_command)
+
+    analytics = subparsers.add_parser(
+        "analytics",
+        parents=[outputs],
+        help="Break orders down by weekday, hour and basket size.",
+    )
+    analytics.add_argument("start_date", type=date_argument, help="YYYY-MM-DD")
+    analytics.add_argument("end_date", type=date_argument, help="YYYY-MM-DD")
+    analytics.set_defaults(run=analytics_command)
+
+    ingest = subparsers.add_parser(
+        "ingest", help="Sum up a folder of dandomain exports into one store."
+    )
+    ingest.add_argument("folder", help="Folder holding the exports.")
+    ingest.add_argument(
+        "--pattern", default="*.csv", help="Glob pattern of the exports."
+    )
+    ingest.add_argument(
+        "--store",
+        default="Data/export_sums.csv",
+        help="CSV file the sums per day are merged into.",
+    )
+    ingest.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes. Defaults to one per CPU.",
+    )
+    ingest.set_defaults(run=ingest_command)
+
+    history = subparsers.add_parser(
+        "history", help="Build or plot the daily sales history file."
+    )
+    history.add_argument(
+        "--file", default="Data/history.bin", help="Path of the history file."
+    )
+    history.set_defaults(run=history_command)
+    actions = history.add_subparsers(dest="action", required=True)
+
+    from_soap = actions.add_parser(
+        "from-soap", help="Record a range fetched from DanDomain."
+    )
+    from_soap.add_argument("start_date", type=date_argument, help="YYYY-MM-DD")
+    from_soap.add_argument("end_date", type=date_argument, help="YYYY-MM-DD")
+    from_soap.add_argument(
+        "--shop",
+        action="append",
+        help="Name of a config file in Config with the login of the shop. "
+        "Defaults to config.",
+    )
+    from_soap.add_argument(
+        "--no-cache", action="store_true", help="Do not use the order cache."
+    )
+
+    from_exports = actions.add_parser(
+        "from-exports", help="Record a folder of dandomain exports."
+    )
+    from_exports.add_argument("folder", help="Folder holding the exports.")
+    from_exports.add_argument(
+        "--pattern", default="*.csv", help="Glob pattern of the exports."
+    )
+    from_exports.add_argument(
+        "--store",
+        default="Data/export_sums.csv",
+        help="CSV file the sums per day are merged into.",
+    )
+    from_exports.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes. Defaults to one per CPU.",
+    )
+
+    actions.add_parser(
+        "metrics",
+        help="Rebuild the rolling metrics of the nightly report from the history.",
+    )
+
+    plot = actions.add_parser(
+        "plot", help="Plot monthly sales and a yearly comparison."
+    )
+    plot.add_argument("start_date", type=date_argument, help="YYYY-MM-DD")
+    plot.add_argument("end_date", type=date_argument, help="YYYY-MM-DD")
+    plot.add_argument(
+        "--output",
+        help="Folder under Reports to write to. Defaults to one named after "
+        "the dates.",
+    )
+
+    serve = subparsers.add_parser(
+        "serve", help="Serve reports and plots over HTTP from a warm process."
+    )
+    serve.add_argument(
+        "--shop",
+        default="config",
+        help="Name of a config file in Config with the login of the shop.",
+    )
+    serve.add_argument("--host", default="127.0.0.1", help="Host to listen on.")
+    serve.add_argument("--port", type=int, default=8000, help="Port to listen on.")
+    serve.add_argument(
+        "--no-cache", action="store_true", help="Do not use the order cache."
+    )
+    serve.set_defaults(run=serve_command)
+
+    return parser
+
+
+def main():
+    args = make_parser().parse_args()
+
+    from src.profiling import finish_run, start_run
+
+    start_run(f"cli_{args.command}", args.profile, args.cprofile)
+    try:
+        args.run(args)
+    finally:
+        finish_run()
+
+
+if __name__ == "__main__":
+    main()
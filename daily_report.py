@@ -1,6 +1,129 @@
-from src.filehandling import save_dataframe, load_config, change_date_today
-from src.plotting import get_all_plots
-from src.data_handler import get_and_clean_data
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pandas as pd
+
+from src.filehandling import save_dataframe, save_timings, load_config, change_date_today
+from src.plotting import get_all_plots, plot_by_day, plot_by_month
+from src.data_handler import get_and_clean_data, get_daily_report
+from src.rollup import Rollup
+from src.render_cache import get_render_cache
+from src.running_totals import PERIOD_FORMATS, RunningTotals, period_start
+from src.metrics import METRICS_PATH, RollingMetrics
+from src.profiling import finish_run, start_run
+from src.soap import parse_date
+
+
+def backfill_trends(metrics: RollingMetrics, day: date, config: dict) -> None:
+    """Add the days missed since the last run to the rolling metrics.
+
+    The days are summed by get_daily_report, so days already in the order
+    cache are not downloaded again. If that fails the days are left unknown.
+
+    Args:
+        metrics (RollingMetrics): Rolling metrics to add the days to.
+        day (date): Day of the report, the days before it are backfilled.
+        config (dict): Config file containing login information and such.
+    """
+    if metrics.last_day is None or (day - metrics.last_day).days <= 1:
+        return
+
+    first = max(metrics.last_day, day - timedelta(days=metrics.size)) + timedelta(
+        days=1
+    )
+    last = day - timedelta(days=1)
+    try:
+        daily = get_daily_report(
+            dict(
+                config,
+                Start_date=f"{first.isoformat()} 00:00:00",
+                End_date=f"{last.isoformat()} 23:59:59",
+            )
+        )
+    except Exception as e:
+        print(f"Could not backfill rolling metrics from {first} to {last}: {e}")
+        return
+
+    days = pd.date_range(first, last, freq="D", name="Date")
+    for missed_day, total in daily["Total"].reindex(days, fill_value=0).items():
+        metrics.add_day(missed_day.date(), total)
+
+
+def backfill_running_totals(
+    running_totals: RunningTotals, day: date, config: dict
+) -> list[str]:
+    """Add the days missed since the last run to the running totals.
+
+    Only days in the year of the report are backfilled, as older days are
+    not part of any to-date sum. The days are summed by get_daily_report, so
+    days already in the order cache are not downloaded again. If that fails
+    the days are left out.
+
+    Args:
+        running_totals (RunningTotals): Running totals to add the days to.
+        day (date): Day of the report, the days before it are backfilled.
+        config (dict): Config file containing login information and such.
+
+    Returns:
+        list[str]: Periods whose sums changed.
+    """
+    last_day = running_totals.to_date.get("last_day")
+    if last_day is None:
+        return []
+
+    first = max(
+        date.fromisoformat(last_day) + timedelta(days=1), period_start(day, "year")
+    )
+    last = day - timedelta(days=1)
+    if first > last:
+        return []
+    try:
+        daily = get_daily_report(
+            dict(
+                config,
+                Start_date=f"{first.isoformat()} 00:00:00",
+                End_date=f"{last.isoformat()} 23:59:59",
+            )
+        )
+    except Exception as e:
+        print(f"Could not backfill running totals from {first} to {last}: {e}")
+        return []
+
+    days = pd.date_range(first, last, freq="D", name="Date")
+    changed = set()
+    for missed_day, totals in daily.reindex(days, fill_value=0).iterrows():
+        changed.update(running_totals.add_day(missed_day.date(), totals.to_dict()))
+    return list(changed)
+
+
+def update_trends(day: date, report: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """Add the sales of a day to the saved rolling metrics.
+
+    Days missed since the last run are backfilled first.
+
+    Args:
+        day (date): Day of the report.
+        report (pd.DataFrame): Report of the day, as returned by clean_data.
+        config (dict): Config file containing login information and such.
+
+    Returns:
+        pd.DataFrame: Metrics ending on the latest day added, empty if the day
+            is too old to be kept.
+    """
+    metrics = RollingMetrics(METRICS_PATH)
+    backfill_trends(metrics, day, config)
+    row = metrics.add_day(day, report["Total"].sum())
+    if row is None:
+        return pd.DataFrame(columns=list(metrics.metrics()))
+    metrics.save()
+
+    for name, value in row.items():
+        if pd.notna(value):
+            print(f"{name}: {value:.2f}")
+    return pd.DataFrame(
+        [row], index=pd.DatetimeIndex([metrics.last_day], name="Date")
+    )
 
 
 def main():
@@ -13,10 +136,77 @@ def main():
 
     path = f"Daily_report_{report.index[0].strftime('%Y-%m-%d')}"
 
-    save_dataframe(report, path)
+    rollup = Rollup(report)
+    rollup.trends = update_trends(
+        parse_date(dd_config["Start_date"]).date(), report, dd_config
+    )
 
-    get_all_plots(report, path)
+    formats = dd_config.get("Export_formats", ["xlsx"])
+    cache = get_render_cache(dd_config)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        export = executor.submit(
+            save_dataframe, report, path, rollup.as_dict(), formats, cache
+        )
+        get_all_plots(report, path, rollup=rollup, cache=cache)
+        timings = export.result()
+
+    save_timings(timings, path)
+
+
+def incremental_main():
+    """Add yesterday's sales to the running totals and update what changed."""
+    change_date_today()
+
+    dd_config = load_config("config")
+
+    report = get_and_clean_data(dd_config)
+
+    day = parse_date(dd_config["Start_date"]).date()
+
+    running_totals = RunningTotals()
+    changed = set(backfill_running_totals(running_totals, day, dd_config))
+    changed.update(running_totals.add_day(day, report.sum().to_dict()))
+
+    trends = update_trends(day, report, dd_config)
+    if not changed:
+        return
+
+    save_dataframe(running_totals.to_date_frame(), "Running", {"Trends": trends})
+
+    for period in PERIOD_FORMATS:
+        if period not in changed:
+            continue
+        days = running_totals.load_days(period_start(day, period))
+        if period == "year":
+            plot_by_month(Rollup(days).month, f"Running/{period}")
+        else:
+            plot_by_day(days, f"Running/{period}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Create a daily report.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update the running totals instead of writing a new report.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a run log with the time and memory of each stage.",
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="Also dump a cProfile profile of the run.",
+    )
+    args = parser.parse_args()
+
+    start_run("daily_report", args.profile, args.cprofile)
+    try:
+        if args.incremental:
+            incremental_main()
+        else:
+            main()
+    finally:
+        finish_run()
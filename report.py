@@ -1,9 +1,14 @@
+import argparse
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 
-from src.filehandling import save_dataframe, load_config
+from src.filehandling import save_dataframe, save_timings, load_config
 from src.plotting import get_all_plots
 from src.data_handler import get_and_clean_data
+from src.rollup import Rollup
+from src.render_cache import get_render_cache
 from src.gui import DateRangeWindow
+from src.profiling import finish_run, start_run
 
 
 def main():
@@ -14,13 +19,40 @@ def main():
 
     path = f"{report.index[0].strftime('%Y-%m-%d')}_to_{report.index[-1].strftime('%Y-%m-%d')}"
 
-    save_dataframe(report, path)
+    rollup = Rollup(report)
 
-    get_all_plots(report, path)
+    formats = dd_config.get("Export_formats", ["xlsx"])
+    cache = get_render_cache(dd_config)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        export = executor.submit(
+            save_dataframe, report, path, rollup.as_dict(), formats, cache
+        )
+        get_all_plots(report, path, rollup=rollup, cache=cache)
+        timings = export.result()
+
+    save_timings(timings, path)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create a report.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a run log with the time and memory of each stage.",
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="Also dump a cProfile profile of the run.",
+    )
+    args = parser.parse_args()
+
     root = tk.Tk()
     date_range_window = DateRangeWindow(root)
     root.mainloop()
-    main()
+
+    start_run("report", args.profile, args.cprofile)
+    try:
+        main()
+    finally:
+        finish_run()
@@ -0,0 +1,139 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from src.order_table import AMOUNT_COLUMN
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Lower edge of each basket size bucket in DKK, the last bucket is open.
+BASKET_EDGES = [0, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 5000]
+
+SECONDS_PER_DAY = 24 * 3600
+
+
+def basket_labels(edges: list[int] = BASKET_EDGES) -> list[str]:
+    """Label each basket size bucket with its range in DKK.
+
+    Args:
+        edges (list[int], optional): Lower edges. Defaults to BASKET_EDGES.
+
+    Returns:
+        list[str]: Label of each bucket.
+    """
+    return [f"{low}-{high}" for low, high in zip(edges, edges[1:])] + [f"{edges[-1]}+"]
+
+
+class OrderAnalytics:
+    """Hour, weekday and basket size breakdowns of an order table.
+
+    The bucket of every order is computed once as an integer index, and each
+    breakdown is a single bincount over a combination of them.
+
+    Args:
+        orders (pd.DataFrame): Order table, see make_order_table.
+        basket_edges (list[int], optional): Lower edges of the basket size
+            buckets in DKK. Defaults to BASKET_EDGES.
+    """
+
+    def __init__(self, orders: pd.DataFrame, basket_edges: list[int] = BASKET_EDGES):
+        self.orders = orders
+        self.basket_edges = basket_edges
+
+        seconds = orders["Date"].to_numpy(dtype="datetime64[s]").astype(np.int64)
+        self.day = seconds // SECONDS_PER_DAY
+        self.hour = (seconds % SECONDS_PER_DAY) // 3600
+        # 1970-01-01 was a Thursday, weekday 3.
+        self.weekday = (self.day + 3) % 7
+        self.amount = orders[AMOUNT_COLUMN].to_numpy()
+        self.basket = (
+            np.searchsorted(np.asarray(basket_edges) * 100, self.amount, side="right")
+            - 1
+        ).clip(0)
+        self.payment = orders["PaymentMethod"].cat.codes.to_numpy()
+
+    @cached_property
+    def iso_week(self) -> np.ndarray:
+        """ISO year and week of every order as yyyyww."""
+        days, inverse = np.unique(self.day, return_inverse=True)
+        iso = pd.DatetimeIndex(days.astype("datetime64[D]")).isocalendar()
+        keys = iso["year"].to_numpy(dtype=np.int64) * 100 + iso["week"].to_numpy(
+            dtype=np.int64
+        )
+        return keys[inverse]
+
+    def days_per_weekday(self) -> np.ndarray:
+        """Count the days with orders of each weekday."""
+        days = np.unique(self.day)
+        return np.bincount((days + 3) % 7, minlength=7)
+
+    def hour_weekday(self, sales: bool = False) -> np.ndarray:
+        """Orders or sales per weekday and hour of day.
+
+        Args:
+            sales (bool, optional): Sum sales in DKK instead of counting
+                orders. Defaults to False.
+
+        Returns:
+            np.ndarray: Array of 7 weekdays by 24 hours.
+        """
+        weights = self.amount / 100 if sales else None
+        return np.bincount(
+            self.weekday * 24 + self.hour, weights=weights, minlength=7 * 24
+        ).reshape(7, 24)
+
+    def mean_hour_weekday(self, sales: bool = False) -> np.ndarray:
+        """Average orders or sales per weekday and hour of day.
+
+        Args:
+            sales (bool, optional): Average sales in DKK instead of orders.
+                Defaults to False.
+
+        Returns:
+            np.ndarray: Array of 7 weekdays by 24 hours, per day with orders.
+        """
+        days = self.days_per_weekday()
+        return self.hour_weekday(sales) / np.maximum(days, 1)[:, None]
+
+    def basket_sizes(self) -> pd.DataFrame:
+        """Count orders per payment method and basket size.
+
+        Returns:
+            pd.DataFrame: Orders with a row per payment method and a column
+                per basket size bucket.
+        """
+        methods = self.orders["PaymentMethod"].cat.categories
+        n_baskets = len(self.basket_edges)
+        known = self.payment >= 0
+        counts = np.bincount(
+            self.payment[known] * n_baskets + self.basket[known],
+            minlength=len(methods) * n_baskets,
+        ).reshape(len(methods), n_baskets)
+        return pd.DataFrame(
+            counts,
+            index=pd.Index(methods, name="PaymentMethod"),
+            columns=basket_labels(self.basket_edges),
+        )
+
+    def weekly_hours(self) -> pd.DataFrame:
+        """Count orders per ISO week and hour of day.
+
+        Returns:
+            pd.DataFrame: Orders with a row per ISO week ("YYYY-Www") and a
+                column per hour.
+        """
+        weeks, week_index = np.unique(self.iso_week, return_inverse=True)
+        counts = np.bincount(
+            week_index * 24 + self.hour, minlength=len(weeks) * 24
+        ).reshape(len(weeks), 24)
+        return pd.DataFrame(
+            counts,
+            index=pd.Index(
+                [f"{week // 100}-W{week % 100:02d}" for week in weeks], name="Week"
+            ),
+        )
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,236 @@
+import asyncio
+import os
+from urllib.parse import urlparse
+
+import httpx
+import pandas as pd
+from zeep import AsyncClient
+from zeep.cache import SqliteCache
+from zeep.exceptions import Fault
+from zeep.transports import AsyncTransport
+
+from src.soap import (
+    ORDER_FIELDS,
+    WSDL_URL,
+    DanDomainSOAPHandler,
+    is_session_fault,
+    split_date_range,
+)
+
+
+def make_async_client(config: dict) -> AsyncClient:
+    """Create an async client with its own cookies for a shop.
+
+    Loading the WSDL blocks, so this should run in a worker thread.
+
+    Args:
+        config (dict): Config file containing login information and such.
+
+    Returns:
+        AsyncClient: Client for the shop.
+    """
+    cache_path = config.get("Wsdl_cache_path", "Data/wsdl_cache.sqlite")
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    transport = AsyncTransport(
+        client=httpx.AsyncClient(timeout=300),
+        wsdl_client=httpx.Client(),
+        cache=SqliteCache(
+            path=cache_path,
+            timeout=config.get("Wsdl_cache_ttl", 86400),
+        ),
+    )
+    return AsyncClient(wsdl=config.get("Wsdl_url", WSDL_URL), transport=transport)
+
+
+class AsyncOrderFetcher:
+    """Fetch orders for several shops and ranges concurrently.
+
+    Each shop gets one logged in client, shared by all of its jobs, and calls
+    to the same host are limited to the "Host_limit" of the first config
+    seen for the host, or host_limit, at a time. Windows are retried like in
+    DanDomainSOAPHandler.fetch_orders, logging in again if the session
+    expired.
+    """
+
+    def __init__(self, host_limit: int = 4):
+        self.host_limit = host_limit
+        self.clients = {}
+        self.client_locks = {}
+        self.logins = {}
+        self.host_semaphores = {}
+
+    def semaphore(self, config: dict) -> asyncio.Semaphore:
+        host = urlparse(config.get("Wsdl_url", WSDL_URL)).netloc
+        if host not in self.host_semaphores:
+            self.host_semaphores[host] = asyncio.Semaphore(
+                config.get("Host_limit", self.host_limit)
+            )
+        return self.host_semaphores[host]
+
+    @staticmethod
+    def key(config: dict) -> tuple[str, str]:
+        return (config.get("Wsdl_url", WSDL_URL), config["Username"])
+
+    async def login(self, client: AsyncClient, config: dict) -> None:
+        """Log a client in and choose the order fields of the config."""
+        async with self.semaphore(config):
+            await client.service.Solution_Connect(
+                Username=config["Username"],
+                Password=config["Password"],
+            )
+            await client.service.Order_SetFields(
+                config.get("Order_fields", ORDER_FIELDS)
+            )
+        self.logins[self.key(config)] = self.logins.get(self.key(config), 0) + 1
+
+    async def client(self, config: dict) -> AsyncClient:
+        """Get the logged in client of a shop, logging in on first use.
+
+        Args:
+            config (dict): Config file containing login information and such.
+
+        Returns:
+            AsyncClient: Logged in client.
+        """
+        key = self.key(config)
+        lock = self.client_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key not in self.clients:
+                client = await asyncio.to_thread(make_async_client, config)
+                await self.login(client, config)
+                self.clients[key] = client
+
+        return self.clients[key]
+
+    async def relogin(self, config: dict, logins: int) -> None:
+        """Log in again, unless another job already did.
+
+        Args:
+            config (dict): Config file containing login information and such.
+            logins (int): Number of logins the caller saw before its call.
+        """
+        async with self.client_locks[self.key(config)]:
+            if self.logins[self.key(config)] == logins:
+                await self.login(self.clients[self.key(config)], config)
+
+    async def fetch_window(self, config: dict, start_date: str, end_date: str) -> list:
+        """Fetch the raw orders of a single window, retrying on failure.
+
+        Args:
+            config (dict): Config file containing login information and such.
+            start_date (str): Date of earliest orders.
+            end_date (str): Date of latest orders.
+
+        Returns:
+            list: Orders.
+        """
+        retries = config.get("Fetch_retries", 3)
+        backoff = config.get("Fetch_backoff", 1.0)
+        client = await self.client(config)
+        for attempt in range(retries + 1):
+            logins = self.logins[self.key(config)]
+            try:
+                async with self.semaphore(config):
+                    result = await client.service.Order_GetByDate(
+                        Start=start_date,
+                        End=end_date,
+                        Status="8",
+                    )
+                return list(result or [])
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                if isinstance(e, Fault) and is_session_fault(e.message):
+                    await self.relogin(config, logins)
+                    continue
+                print(
+                    f"Retrying orders from {start_date} to {end_date} "
+                    f"after error: {e}"
+                )
+                await asyncio.sleep(backoff * 2**attempt)
+
+    async def fetch(
+        self, config: dict, start_date: str, end_date: str
+    ) -> pd.DataFrame | None:
+        """Fetch the orders of one shop and range.
+
+        Args:
+            config (dict): Config file containing login information and such.
+            start_date (str): Date of earliest orders.
+            end_date (str): Date of latest orders.
+
+        Returns:
+            pd.DataFrame | None: Order table, see make_order_table, or None on
+                failure.
+        """
+        if config.get("Fetch_slice") is None:
+            windows = [(start_date, end_date)]
+        else:
+            windows = split_date_range(start_date, end_date, config["Fetch_slice"])
+
+        try:
+            results = await asyncio.gather(
+                *[self.fetch_window(config, *window) for window in windows]
+            )
+        except Exception as e:
+            print(f"Error making SOAP request for {config['Username']}: {e}")
+            return None
+
+        orders = [order for result in results for order in result]
+        return DanDomainSOAPHandler.orders_to_dataframe(orders)
+
+    async def close(self) -> None:
+        for client in self.clients.values():
+            await client.transport.aclose()
+            client.transport.wsdl_client.close()
+        self.clients.clear()
+
+
+async def fetch_jobs(
+    jobs: list[tuple[dict, tuple[str, str]]],
+    host_limit: int = 4,
+) -> list[pd.DataFrame | None]:
+    """Fetch the orders of every job concurrently.
+
+    Args:
+        jobs (list[tuple[dict, tuple[str, str]]]): Config and date range of
+            each job.
+        host_limit (int, optional): Maximum concurrent calls per host, for
+            configs without "Host_limit". Defaults to 4.
+
+    Returns:
+        list[pd.DataFrame | None]: Order table of each job, in the order of
+            the jobs, None for failed jobs.
+    """
+    fetcher = AsyncOrderFetcher(host_limit)
+    try:
+        return await asyncio.gather(
+            *[fetcher.fetch(config, *date_range) for config, date_range in jobs]
+        )
+    finally:
+        await fetcher.close()
+
+
+def fetch_all(
+    jobs: list[tuple[dict, tuple[str, str]]],
+    host_limit: int = 4,
+) -> list[pd.DataFrame | None]:
+    """Fetch the orders of every job, see fetch_jobs.
+
+    Args:
+        jobs (list[tuple[dict, tuple[str, str]]]): Config and date range of
+            each job.
+        host_limit (int, optional): Maximum concurrent calls per host, for
+            configs without "Host_limit". Defaults to 4.
+
+    Returns:
+        list[pd.DataFrame | None]: Order table of each job, None for failed
+            jobs.
+    """
+    if not jobs:
+        return []
+    return asyncio.run(fetch_jobs(jobs, host_limit))
+
+
+if __name__ == "__main__":
+    pass
@@ -1,5 +1,18 @@
+import csv
+import glob
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Iterator
+
+import numpy as np
 import pandas as pd
 
+from src.constants import PAYMENT_METHODS, REPORT_COLUMNS
+from src.order_table import AMOUNT_COLUMN, make_order_table
+
 
 def squish_row(dataframe: pd.DataFrame, mask: pd.Series, n_squish: int) -> pd.DataFrame:
     """Shift rows that are skewed due to long item names.
@@ -53,6 +66,61 @@ def clean_file(dataframe: pd.DataFrame) -> pd.DataFrame:
     return dataframe
 
 
+def segment_data(dataframe: pd.DataFrame, categories: list[str]) -> pd.DataFrame:
+    """Label every order with the payment method section it belongs to.
+
+    The sections are found in a single pass. The two rows before each section
+    header, the headers themselves and the final total row are dropped.
+
+    Args:
+        dataframe (pd.DataFrame): Cleaned dataframe.
+        categories (list[str]): List of payment methods
+
+    Raises:
+        IndexError: If the header of a section is missing.
+
+    Returns:
+        pd.DataFrame: Orders with a "PaymentMethod" column. Orders in the last
+            section are labeled "final".
+    """
+    first_column = dataframe[dataframe.columns[0]].to_numpy()
+    codes = pd.Index(categories).get_indexer(first_column)
+
+    header_positions = []
+    for position in np.flatnonzero(codes >= 0):
+        if codes[position] == len(header_positions):
+            header_positions.append(position)
+            if len(header_positions) == len(categories):
+                break
+    if len(header_positions) != len(categories):
+        raise IndexError(
+            f"Missing the header of section {categories[len(header_positions)]}"
+        )
+    header_positions = np.array(header_positions, dtype=int)
+
+    markers = np.zeros(len(dataframe) + 1, dtype=np.int8)
+    markers[header_positions + 1] = 1
+    section = np.cumsum(markers[:-1])
+
+    keep = np.ones(len(dataframe), dtype=bool)
+    for offset in range(3):
+        # A header in the first rows has fewer rows before it to drop.
+        positions = header_positions - offset
+        keep[positions[positions >= 0]] = False
+    keep[-1:] = False
+
+    segmented = dataframe[keep].assign(
+        **{
+            "Incl. vat": pd.to_numeric(dataframe["Incl. vat"][keep]),
+            "PaymentMethod": pd.Categorical.from_codes(
+                section[keep], categories=[*categories, "final"]
+            ),
+        }
+    )
+
+    return segmented
+
+
 def seperate_data(dataframe: pd.DataFrame, categories: list[str]) -> list[pd.DataFrame]:
     """Seperate the dataframe into different payment methods.
 
@@ -63,21 +131,11 @@ def seperate_data(dataframe: pd.DataFrame, categories: list[str]) -> list[pd.Dat
     Returns:
         list[pd.DataFrame]: Seperated dataframes.
     """
-    seperated_df = {}
-    for category in categories:
-        index = dataframe[dataframe[dataframe.columns[0]] == category].index[0]
-        seperated_df[category] = dataframe.loc[: index - 3]
-        seperated_df[category].loc[:, "Incl. vat"] = pd.to_numeric(
-            seperated_df[category]["Incl. vat"]
-        )
-        dataframe = dataframe.loc[index + 1 :]
+    segmented = segment_data(dataframe, categories)
 
-    seperated_df["final"] = dataframe.iloc[:-1]
-    seperated_df["final"].loc[:, "Incl. vat"] = pd.to_numeric(
-        seperated_df["final"]["Incl. vat"]
-    )
-
-    return list(seperated_df.values())
+    return [
+        frame for _, frame in segmented.groupby("PaymentMethod", observed=False)
+    ]
 
 
 def sum_up_csv(data):
@@ -109,12 +167,275 @@ def sum_up_csv(data):
 
     clean_data = clean_file(data)
 
-    overviews = seperate_data(clean_data, overview_categories)
+    orders = segment_data(clean_data, overview_categories)
+    orders["Date"] = pd.to_datetime(orders["Date"], format="%d-%m-%Y")
+
+    sums = [
+        values.groupby("Date")["Incl. vat"].sum()
+        for _, values in orders.groupby("PaymentMethod", observed=False)
+    ]
+    return sums
+
+
+def repair_row(row: list[str]) -> list[str]:
+    """Merge an item name that has been split over several columns.
+
+    The currency column should hold "DKK", any columns it has been pushed to
+    the right by are part of the item name.
+
+    Args:
+        row (list[str]): Raw row from dandomain.
+
+    Returns:
+        list[str]: The first ten columns of the repaired row.
+    """
+    if "DKK" not in row[8:]:
+        return row[:10]
+
+    n_squish = row.index("DKK", 8) - 8
+    return ["".join(row[: n_squish + 1]), *row[n_squish + 1 : n_squish + 10]]
+
+
+def read_rows(path: str, encoding: str = "iso 8859-10") -> Iterator[list[str]]:
+    """Read a dandomain export one row at a time, skipping blank lines.
+
+    Args:
+        path (str): Path to the export.
+        encoding (str, optional): Encoding of the export. Defaults to "iso 8859-10".
+
+    Yields:
+        Iterator[list[str]]: Raw rows.
+    """
+    with open(path, encoding=encoding, newline="") as file:
+        for row in csv.reader(file, delimiter=";"):
+            if row:
+                yield row
+
+
+def parse_order(row: list[str]) -> tuple[datetime, float] | None:
+    """Read the day and amount of a repaired row.
+
+    Args:
+        row (list[str]): Repaired row.
+
+    Raises:
+        ValueError: If a row with a date has a malformed date or amount, as
+            sum_up_csv raises for it, rather than leaving it out of the sums.
+
+    Returns:
+        tuple[datetime, float] | None: Day and amount incl. vat, None for rows
+            without a date, such as blank rows and subtotals.
+    """
+    if len(row) < 2 or not row[1]:
+        return None
+    try:
+        return datetime.strptime(row[1], "%d-%m-%Y"), float(row[7])
+    except (IndexError, ValueError) as e:
+        raise ValueError(f"Malformed order {row}: {e}") from e
+
+
+def read_overview(rows: Iterator[list[str]]) -> list[str]:
+    """Read past the header and overview of an export.
+
+    Args:
+        rows (Iterator[list[str]]): Raw rows, from read_rows.
+
+    Returns:
+        list[str]: Payment methods of the sections before the final one.
+    """
+    next(rows)
+    overview = [next(rows) for _ in range(13)]
+    return [overview[7][0], overview[8][0]]
 
-    for i in overviews:
-        i.loc[:, "Date"] = pd.to_datetime(i["Date"], format="%d-%m-%Y")
 
-    sums = [values.groupby("Date")["Incl. vat"].sum() for values in overviews]
+def section_payment_methods(categories: list[str]) -> list[str]:
+    """Match the sections of an export to PAYMENT_METHODS.
+
+    The final section of an export has no header, so it is taken to be the
+    one payment method not named by the others.
+
+    Args:
+        categories (list[str]): Payment methods, from read_overview.
+
+    Raises:
+        ValueError: If the sections do not name all but one payment method.
+
+    Returns:
+        list[str]: Payment method of every section, the final one included.
+    """
+    unnamed = [method for method in PAYMENT_METHODS if method not in categories]
+    if len(unnamed) != 1 or len(categories) != len(PAYMENT_METHODS) - 1:
+        raise ValueError(f"Sections {categories} do not match {PAYMENT_METHODS}")
+    return [*categories, *unnamed]
+
+
+def iter_orders(
+    rows: Iterator[list[str]],
+    categories: list[str],
+) -> Iterator[tuple[str, list[str]]]:
+    """Repair the order rows of an export and label them with their section.
+
+    Args:
+        rows (Iterator[list[str]]): Raw rows following the overview.
+        categories (list[str]): Payment methods, from read_overview.
+
+    Yields:
+        Iterator[tuple[str, list[str]]]: Payment method, "final" for the last
+            section, and repaired row.
+    """
+    sections = [*categories, "final"]
+    section = 0
+    # The last two rows before a section header are not orders.
+    pending = deque()
+    for row in rows:
+        if section < len(categories) and row[0] == categories[section]:
+            pending.clear()
+            section += 1
+            continue
+
+        pending.append(repair_row(row))
+        if len(pending) > 2:
+            yield sections[section], pending.popleft()
+
+    # The last row of the final section is the total.
+    while len(pending) > 1:
+        yield sections[section], pending.popleft()
+
+
+def stream_sum_up_csv(path: str, encoding: str = "iso 8859-10") -> list[pd.Series]:
+    """Sum up a dandomain export per day without loading it into memory.
+
+    Produces the same sums as sum_up_csv, but repairs and sums each row as it
+    is read, so only the sums per day are kept in memory.
+
+    Args:
+        path (str): Path to the export.
+        encoding (str, optional): Encoding of the export. Defaults to "iso 8859-10".
+
+    Returns:
+        list[pd.Series]: Sales per day for each payment method.
+    """
+    rows = read_rows(path, encoding)
+    categories = read_overview(rows)
+
+    sums = {section: defaultdict(float) for section in [*categories, "final"]}
+    for section, row in iter_orders(rows, categories):
+        order = parse_order(row)
+        if order is not None:
+            sums[section][order[0]] += order[1]
+
+    return [
+        pd.Series(day_sums, name="Incl. vat", dtype=float)
+        .rename_axis("Date")
+        .sort_index()
+        for day_sums in sums.values()
+    ]
+
+
+def read_csv_orders(path: str, encoding: str = "iso 8859-10") -> pd.DataFrame:
+    """Read the orders of a dandomain export into the compact order table.
+
+    The export only holds the day of each order, so every order is placed at
+    midnight.
+
+    Args:
+        path (str): Path to the export.
+        encoding (str, optional): Encoding of the export. Defaults to "iso 8859-10".
+
+    Returns:
+        pd.DataFrame: Order table, see make_order_table, with the sections
+            matched to PAYMENT_METHODS by section_payment_methods.
+    """
+    rows = read_rows(path, encoding)
+    categories = read_overview(rows)
+    methods = dict(zip([*categories, "final"], section_payment_methods(categories)))
+
+    days, amounts, payments = [], [], []
+    for section, row in iter_orders(rows, categories):
+        order = parse_order(row)
+        if order is not None:
+            days.append(order[0])
+            amounts.append(order[1])
+            payments.append(methods[section])
+
+    return make_order_table(days, amounts, payments)
+
+
+def sum_export_by_day(
+    path: str, encoding: str = "iso 8859-10"
+) -> tuple[pd.DataFrame, int]:
+    """Sum up a dandomain export per day and payment method.
+
+    Args:
+        path (str): Path to the export.
+        encoding (str, optional): Encoding of the export. Defaults to "iso 8859-10".
+
+    Returns:
+        tuple[pd.DataFrame, int]: Sales per day with the columns of
+            clean_data, and the number of orders read.
+    """
+    orders = read_csv_orders(path, encoding)
+    sums = (
+        orders.groupby(["Date", "PaymentMethod"], observed=False)[AMOUNT_COLUMN]
+        .sum()
+        .unstack()[PAYMENT_METHODS]
+    )
+    sums = (sums.astype(np.int64) / 100).rename_axis(columns=None)
+    sums.columns = REPORT_COLUMNS
+    sums["Total"] = sums.sum(axis=1)
+    return sums, len(orders)
+
+
+def ingest_exports(
+    folder: str,
+    store_path: str = "Data/export_sums.csv",
+    pattern: str = "*.csv",
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """Sum up every dandomain export in a folder and merge them into a store.
+
+    Exports are read in a process pool. Where exports overlap, the sums of
+    a day are taken from the most recently modified export holding it, and
+    days already in the store are replaced by the sums from the exports.
+
+    Args:
+        folder (str): Folder holding the exports.
+        store_path (str, optional): CSV file the merged sums per day are
+            written to. Defaults to "Data/export_sums.csv".
+        pattern (str, optional): Glob pattern of the exports. Defaults to "*.csv".
+        max_workers (int | None, optional): Number of worker processes.
+            Defaults to None, using one per CPU.
+
+    Returns:
+        pd.DataFrame: Every day in the store, with the columns of clean_data.
+    """
+    paths = sorted(glob.glob(os.path.join(folder, pattern)), key=os.path.getmtime)
+    if not paths:
+        print(f"No exports matching {pattern} in {folder}")
+        return None
+
+    begin = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(sum_export_by_day, paths))
+    seconds = time.perf_counter() - begin
+
+    n_rows = sum(n_orders for _, n_orders in results)
+    sums = pd.concat([file_sums for file_sums, _ in results])
+    n_overlapping = int(sums.index.duplicated().sum())
+
+    if os.path.exists(store_path):
+        stored = pd.read_csv(store_path, index_col="Date", parse_dates=True)
+        sums = pd.concat([stored, sums])
+    sums = sums[~sums.index.duplicated(keep="last")].sort_index().fillna(0)
+
+    os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
+    sums.to_csv(store_path)
+
+    print(
+        f"Ingested {len(paths)} files and {n_rows} orders in {seconds:.2f} s "
+        f"({len(paths) / seconds:.1f} files/s, {n_rows / seconds:.0f} rows/s), "
+        f"{n_overlapping} overlapping days"
+    )
     return sums
 
 
@@ -1 +1,11 @@
 PLOTTING_COLORS = ["lightseagreen", "green", "firebrick", "orangered"]
+
+# Payment titles in the order the per-payment dataframes are returned.
+PAYMENT_METHODS = ["Kortterminal", "Kreditkortbetaling", "Kontant betaling"]
+
+# Column of each payment method in the report, in the order of PAYMENT_METHODS:
+# Kortterminal is the card terminal and Kreditkortbetaling credit card payment.
+REPORT_COLUMNS = ["Card terminal", "Credit card payment", "Cash payment"]
+
+# Minimum horizontal distance between value labels in a plot.
+LABEL_SPACING_PIXELS = 40
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.order_table import AMOUNT_COLUMN
+
+
+def sum_orders_by_day(
+    orders: list[pd.DataFrame], first_day: date, n_days: int
+) -> np.ndarray:
+    """Sum orders per day and payment method in whole øre.
+
+    Args:
+        orders (list[pd.DataFrame]): Order tables, one per payment method.
+        first_day (date): First day of the range.
+        n_days (int): Number of days in the range.
+
+    Returns:
+        np.ndarray: Sums with a row per day and a column per payment method.
+    """
+    sums = np.zeros((n_days, len(orders)), dtype=np.int64)
+    for column, frame in enumerate(orders):
+        days = frame["Date"].to_numpy(dtype="datetime64[D]")
+        day_numbers = (days - np.datetime64(first_day, "D")).astype(np.int64)
+        in_range = (day_numbers >= 0) & (day_numbers < n_days)
+        sums[:, column] = np.bincount(
+            day_numbers[in_range],
+            weights=frame[AMOUNT_COLUMN].to_numpy()[in_range],
+            minlength=n_days,
+        ).round()
+    return sums
+
+
+class DailySums:
+    """Sales per shop and day kept in memory, so ranges can be stitched.
+
+    Entries are evicted least recently used first once there are more than
+    max_days, and are dropped when older than max_age seconds, as sales of
+    recent days can still change.
+    """
+
+    def __init__(self, max_days: int = 100_000, max_age: float = 600):
+        self.max_days = max_days
+        self.max_age = max_age
+        self.days = OrderedDict()
+        self.lock = threading.Lock()
+
+    def lookup(self, shop: str, days: list[date]) -> dict[date, np.ndarray]:
+        """Get the sums of the days of a shop that are cached and not expired.
+
+        Args:
+            shop (str): Key of the shop, see shop_key.
+            days (list[date]): Days of the requested range.
+
+        Returns:
+            dict[date, np.ndarray]: Sums per payment method of each cached day.
+        """
+        now = time.monotonic()
+        found = {}
+        with self.lock:
+            for day in days:
+                entry = self.days.get((shop, day))
+                if entry is None:
+                    continue
+                if now - entry[1] > self.max_age:
+                    del self.days[(shop, day)]
+                    continue
+                self.days.move_to_end((shop, day))
+                found[day] = entry[0]
+        return found
+
+    def store(self, shop: str, first_day: date, sums: np.ndarray) -> None:
+        """Store the sums of consecutive days.
+
+        Args:
+            shop (str): Key of the shop, see shop_key.
+            first_day (date): Day of the first row of sums.
+            sums (np.ndarray): Sums with a row per day.
+        """
+        now = time.monotonic()
+        with self.lock:
+            for offset, row in enumerate(sums):
+                key = (shop, first_day + timedelta(days=offset))
+                self.days[key] = (row, now)
+                self.days.move_to_end(key)
+            while len(self.days) > self.max_days:
+                self.days.popitem(last=False)
+
+
+if __name__ == "__main__":
+    pass
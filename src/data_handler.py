@@ -1,6 +1,28 @@
+import numpy as np
 import pandas as pd
 
-from src.soap import DanDomainSOAPHandler
+from src.async_soap import fetch_all
+from src.constants import REPORT_COLUMNS
+from src.daily_sums import DailySums, sum_orders_by_day
+from src.order_cache import OrderCache, days_in_range, group_consecutive_days
+from src.order_table import sum_kroner
+from src.profiling import stage
+from src.soap import WSDL_URL, DanDomainSOAPHandler, get_handler
+
+# Sales per shop and day kept between calls to get_daily_report.
+_daily_sums = DailySums()
+
+
+def shop_key(config: dict) -> str:
+    """Identify the shop a config logs in to.
+
+    Args:
+        config (dict): Config file containing login information and such.
+
+    Returns:
+        str: Username and WSDL url of the shop.
+    """
+    return f"{config['Username']}@{config.get('Wsdl_url', WSDL_URL)}"
 
 
 def get_and_clean_data(
@@ -16,9 +38,155 @@ def get_and_clean_data(
     Returns:
         list[pd.DataFrame]: Cleaned data.
     """
-    sums = load_data(config)
+    with stage("load_data") as record:
+        sums = load_data(config)
+        record["rows"] = sum(len(orders) for orders in sums or [])
 
-    report = clean_data(sums, sort_by_order)
+    with stage("clean_data") as record:
+        report = clean_data(sums, sort_by_order)
+        record["rows"] = len(report)
+    return report
+
+
+def get_and_clean_shops(
+    jobs: list[tuple[dict, tuple[str, str]]],
+    sort_by_order: bool = True,
+) -> list[pd.DataFrame]:
+    """Download and clean data for several shops and ranges concurrently.
+
+    Args:
+        jobs (list[tuple[dict, tuple[str, str]]]): Config and date range of
+            each job.
+        sort_by_order (bool, optional): Define sorting method. Defaults to True.
+
+    Returns:
+        list[pd.DataFrame]: Cleaned data of each job, None for failed jobs.
+    """
+    return [
+        None if dataframe is None else clean_data(dataframe, sort_by_order)
+        for dataframe in load_shops(jobs)
+    ]
+
+
+def load_shops(
+    jobs: list[tuple[dict, tuple[str, str]]],
+) -> list[list[pd.DataFrame] | None]:
+    """Download data for several shops and ranges, like load_data does for one.
+
+    Days missing from the order cache of each shop, or recent enough to still
+    change, are fetched for all shops concurrently and stored. Shops fetching
+    in pages are fetched one at a time by load_data.
+
+    Args:
+        jobs (list[tuple[dict, tuple[str, str]]]): Config and date range of
+            each job.
+
+    Returns:
+        list[list[pd.DataFrame] | None]: Orders per payment method of each
+            job, None for failed jobs.
+    """
+    configs = [
+        dict(config, Start_date=start_date, End_date=end_date)
+        for config, (start_date, end_date) in jobs
+    ]
+
+    caches = {}
+    fetches = []
+    for i, config in enumerate(configs):
+        if config.get("Fetch_page_size") is not None:
+            continue
+        if not config.get("Use_cache", True):
+            fetches.append((i, config, (config["Start_date"], config["End_date"])))
+            continue
+
+        caches[i] = OrderCache(
+            config.get("Cache_path", "Data/orders.sqlite"),
+            config.get("Cache_refetch_days", 7),
+            shop_key(config),
+        )
+        stale_days = caches[i].stale_days(config["Start_date"], config["End_date"])
+        for date_range in group_consecutive_days(stale_days):
+            fetches.append((i, config, date_range))
+
+    results = [None] * len(configs)
+    failed = set()
+    tables = fetch_all([(config, date_range) for _, config, date_range in fetches])
+    for (i, _, date_range), orders in zip(fetches, tables):
+        if orders is None:
+            failed.add(i)
+        elif i in caches:
+            caches[i].store(orders, days_in_range(*date_range))
+        else:
+            results[i] = DanDomainSOAPHandler.split_by_payment(orders)
+
+    for i, config in enumerate(configs):
+        if config.get("Fetch_page_size") is not None:
+            results[i] = load_data(config)
+        elif i in caches and i not in failed:
+            results[i] = DanDomainSOAPHandler.split_by_payment(
+                caches[i].load(config["Start_date"], config["End_date"])
+            )
+
+    return results
+
+
+def load_orders(config: dict) -> pd.DataFrame:
+    """Load the individual orders of the range in the config.
+
+    Args:
+        config (dict): Config file containing login information and such.
+
+    Returns:
+        pd.DataFrame: Order table, see make_order_table.
+    """
+    orders = load_data(config)
+    if orders is None:
+        raise RuntimeError("No orders loaded")
+    return pd.concat(orders, ignore_index=True)
+
+
+def get_daily_report(config: dict) -> pd.DataFrame:
+    """Get sales per day, reusing the days summed up by earlier calls.
+
+    Sums are kept per shop and day, so a range overlapping earlier ranges
+    only downloads and sums the days not seen before, and the rest is
+    stitched together from memory. The range is widened to whole days.
+
+    Args:
+        config (dict): Config file containing login information and such.
+
+    Returns:
+        pd.DataFrame: Sales of every day with orders, with the columns of
+            clean_data.
+    """
+    shop = shop_key(config)
+    days = days_in_range(config["Start_date"], config["End_date"])
+
+    found = _daily_sums.lookup(shop, days)
+    missing = [day for day in days if day not in found]
+    for start_date, end_date in group_consecutive_days(missing):
+        with stage("load_data") as record:
+            orders = load_data(dict(config, Start_date=start_date, End_date=end_date))
+        if orders is None:
+            raise RuntimeError(f"No orders loaded from {start_date} to {end_date}")
+        record["rows"] = sum(len(frame) for frame in orders)
+
+        range_days = days_in_range(start_date, end_date)
+        with stage("sum_orders_by_day"):
+            sums = sum_orders_by_day(orders, range_days[0], len(range_days))
+        _daily_sums.store(shop, range_days[0], sums)
+        found.update(zip(range_days, sums))
+
+    sums = np.array([found[day] for day in days]).reshape(len(days), -1)
+    has_orders = (sums != 0).any(axis=1)
+
+    report = pd.DataFrame(
+        sums[has_orders] / 100,
+        index=pd.DatetimeIndex(days, name="Date")[has_orders],
+        columns=REPORT_COLUMNS,
+    )
+
+    report["Total"] = report.sum(axis=1)
     return report
 
 
@@ -39,7 +207,7 @@ def clean_data(
 
     report = pd.concat(sums, axis=1).fillna(0)
 
-    report.columns = ["Credit card payment", "Card terminal", "Cash payment"]
+    report.columns = REPORT_COLUMNS
 
     report["Total"] = report.sum(axis=1)
     return report
@@ -48,16 +216,61 @@ def clean_data(
 def load_data(config: dict) -> pd.DataFrame:
     """Downlaod data using SOAP call.
 
+    Unless "Use_cache" is disabled in the config, only days missing from the
+    local order cache of the shop, or recent enough to still change, are
+    downloaded.
+
     Args:
         config (dict): Config file containing login information and such.
 
     Returns:
-        pd.DataFrame: Data summed up per day.
+        pd.DataFrame: Data summed up per day, None if any download failed.
     """
-    loader = DanDomainSOAPHandler(config)
-    dataframe = loader.make_soap_request(
-        start_date=config["Start_date"],
-        end_date=config["End_date"],
+    if not config.get("Use_cache", True):
+        loader = get_handler(config)
+        return loader.make_soap_request(
+            start_date=config["Start_date"],
+            end_date=config["End_date"],
+            slice_size=config.get("Fetch_slice"),
+            max_workers=config.get("Fetch_workers", 4),
+            retries=config.get("Fetch_retries", 3),
+            page_size=config.get("Fetch_page_size"),
+        )
+
+    cache = OrderCache(
+        config.get("Cache_path", "Data/orders.sqlite"),
+        config.get("Cache_refetch_days", 7),
+        shop_key(config),
+    )
+    stale_days = cache.stale_days(config["Start_date"], config["End_date"])
+    if stale_days:
+        loader = get_handler(config)
+    for start_date, end_date in group_consecutive_days(stale_days):
+        try:
+            if config.get("Fetch_page_size") is not None:
+                orders = loader.fetch_orders_paged(
+                    start_date,
+                    end_date,
+                    page_size=config["Fetch_page_size"],
+                    retries=config.get("Fetch_retries", 3),
+                )
+            else:
+                orders = DanDomainSOAPHandler.orders_to_dataframe(
+                    loader.get_orders(
+                        start_date,
+                        end_date,
+                        slice_size=config.get("Fetch_slice"),
+                        max_workers=config.get("Fetch_workers", 4),
+                        retries=config.get("Fetch_retries", 3),
+                    )
+                )
+        except Exception as e:
+            print(f"Error making SOAP request: {e}")
+            return None
+        cache.store(orders, days_in_range(start_date, end_date))
+
+    dataframe = DanDomainSOAPHandler.split_by_payment(
+        cache.load(config["Start_date"], config["End_date"])
     )
 
     return dataframe
@@ -82,6 +295,6 @@ def sum_up_data(
         for df in dataframe:
             df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d")
 
-    sums = [values.groupby("Date")["Incl. vat"].sum() for values in dataframe]
+    sums = [sum_kroner(values) for values in dataframe]
 
     return sums
@@ -1,7 +1,12 @@
 import os
 import json
+import time
 
 import pandas as pd
+import xlsxwriter
+
+from src.profiling import stage
+from src.render_cache import RenderCache, fingerprint, remove_output
 from datetime import datetime, timedelta
 
 
@@ -39,23 +44,134 @@ def load_dataframe(path: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Read dataframe
     """
-    return pd.read_csv(
-        "Data/Månedsrapport webshop december 2023.csv", encoding="iso 8859-10", sep=";"
-    )
+    return pd.read_csv(path, encoding="iso 8859-10", sep=";")
+
 
+def write_xlsx(sheets: dict[str, pd.DataFrame], file_path: str) -> None:
+    """Write dataframes to a workbook with xlsxwriter in constant memory mode.
 
-def save_dataframe(dataframe: list[pd.DataFrame], path: str) -> None:
+    Rows are written one at a time and flushed to disk, so memory use does
+    not grow with the length of the dataframes.
+
+    Args:
+        sheets (dict[str, pd.DataFrame]): Dataframes keyed by sheet name.
+        file_path (str): Path of the workbook.
+    """
+    workbook = xlsxwriter.Workbook(
+        file_path, {"constant_memory": True, "nan_inf_to_errors": True}
+    )
+    date_format = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+
+    for sheet_name, dataframe in sheets.items():
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(
+            0, 0, [dataframe.index.name or "", *map(str, dataframe.columns)]
+        )
+
+        is_date = isinstance(dataframe.index, pd.DatetimeIndex)
+        for row, (label, values) in enumerate(
+            zip(dataframe.index, dataframe.to_numpy().tolist()), start=1
+        ):
+            if is_date:
+                worksheet.write_datetime(row, 0, label.to_pydatetime(), date_format)
+            else:
+                worksheet.write(row, 0, label)
+            worksheet.write_row(row, 1, values)
+
+    workbook.close()
+
+
+def save_dataframe(
+    dataframe: list[pd.DataFrame],
+    path: str,
+    rollup: dict[str, pd.DataFrame] = None,
+    formats: list[str] = None,
+    cache: RenderCache = None,
+) -> dict[str, float]:
     """Save dataframe.
 
     Args:
         dataframe (list[pd.DataFrame]): Dataframe to be saved.
         path (str): Path to folder where dataframe will be saved.
+        rollup (dict[str, pd.DataFrame], optional): Aggregates to be saved as
+            extra sheets, keyed by sheet name. Defaults to None.
+        formats (list[str], optional): Any of "xlsx", "parquet" and "csv".
+            Parquet and csv files are written per sheet. Defaults to None,
+            writing xlsx.
+        cache (RenderCache, optional): Cache of exported files. Files of data
+            exported before are linked from it. Defaults to None.
+
+    Returns:
+        dict[str, float]: Seconds spent writing each format.
     """
+    formats = formats or ["xlsx"]
     os.makedirs(f"Reports/{path}", exist_ok=True)
-    dataframe.to_excel(f"Reports/{path}/spreadsheet.xlsx")
+    sheets = {"Sheet1": dataframe, **(rollup or {})}
+    file_names = {"Sheet1": "spreadsheet"}
+
+    timings = {}
+    for file_format in formats:
+        with stage(f"export_{file_format}") as record:
+            record["rows"] = sum(len(sheet) for sheet in sheets.values())
+            begin = time.perf_counter()
+            if file_format == "xlsx":
+                outputs = [(f"Reports/{path}/spreadsheet.xlsx", sheets)]
+            elif file_format in ("parquet", "csv"):
+                outputs = [
+                    (
+                        f"Reports/{path}/"
+                        f"{file_names.get(sheet_name, sheet_name.lower())}"
+                        f".{file_format}",
+                        {sheet_name: sheet},
+                    )
+                    for sheet_name, sheet in sheets.items()
+                ]
+            else:
+                raise ValueError(f"Unknown export format: {file_format}")
+
+            for file_path, output_sheets in outputs:
+                if cache is not None:
+                    key = fingerprint(output_sheets, save_dataframe, file_format)
+                    if cache.fetch(key, file_path):
+                        continue
+
+                remove_output(file_path)
+                if file_format == "xlsx":
+                    write_xlsx(output_sheets, file_path)
+                else:
+                    sheet = next(iter(output_sheets.values()))
+                    if file_format == "parquet":
+                        sheet.to_parquet(file_path)
+                    else:
+                        sheet.to_csv(file_path)
+
+                if cache is not None:
+                    cache.store(key, file_path)
+        timings[file_format] = time.perf_counter() - begin
+
+    return timings
+
+
+def save_timings(timings: dict[str, float], path: str) -> None:
+    """Save and print the time spent on each export format.
 
+    Args:
+        timings (dict[str, float]): Seconds spent per format.
+        path (str): Path to folder of the report.
+    """
+    with open(f"Reports/{path}/export_timings.json", "w") as file:
+        json.dump(timings, file, indent=4)
 
-def change_date_today():
+    for file_format, seconds in timings.items():
+        print(f"Exported {file_format} in {seconds:.2f} s")
+
+
+def yesterday_range() -> tuple[str, str]:
+    """Get the first and last second of yesterday.
+
+    Returns:
+        tuple[str, str]: Start and end date of yesterday.
+    """
     # Get the current date and time
     current_datetime = datetime.now()
 
@@ -68,9 +184,14 @@ def change_date_today():
     # # Get the latest timestamp for yesterday (23:59:59)
     end_date = datetime(yesterday.year, yesterday.month, yesterday.day, 23, 59, 59)
 
+    return start_date.strftime("%Y-%m-%d %H:%M:%S"), end_date.strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
+
+
+def change_date_today():
     config = load_config("config")
-    config["Start_date"] = start_date.strftime("%Y-%m-%d %H:%M:%S")
-    config["End_date"] = end_date.strftime("%Y-%m-%d %H:%M:%S")
+    config["Start_date"], config["End_date"] = yesterday_range()
 
     save_config("config", config)
 
@@ -0,0 +1,190 @@
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.constants import PAYMENT_METHODS
+from src.daily_sums import sum_orders_by_day
+from src.data_handler import REPORT_COLUMNS, load_data
+from src.order_cache import days_in_range
+
+# Day of the first record in a history file.
+HISTORY_EPOCH = date(2000, 1, 1)
+
+# Sales in øre per payment method, in the order of REPORT_COLUMNS, and whether
+# the day has been recorded at all.
+RECORD = np.dtype([("sales", "<i8", (len(PAYMENT_METHODS),)), ("recorded", "u1")])
+
+
+class DailyHistory:
+    """Daily sales per payment method in a fixed-width binary file.
+
+    Record i holds day HISTORY_EPOCH + i, so any range is a slice of a
+    memory map and reading decades costs no parsing. Writing a day past the
+    end grows the file, earlier days are overwritten in place.
+
+    Args:
+        path (str, optional): Path of the history file. Defaults to
+            "Data/history.bin".
+    """
+
+    def __init__(self, path: str = "Data/history.bin"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not os.path.exists(path):
+            open(path, "wb").close()
+
+    def __len__(self) -> int:
+        return os.path.getsize(self.path) // RECORD.itemsize
+
+    @staticmethod
+    def day_number(day: date) -> int:
+        number = (day - HISTORY_EPOCH).days
+        if number < 0:
+            raise ValueError(f"History starts at {HISTORY_EPOCH}, not {day}")
+        return number
+
+    def records(self, mode: str = "r") -> np.memmap | np.ndarray:
+        """Map the whole file.
+
+        Args:
+            mode (str, optional): Mode of the memory map. Defaults to "r".
+
+        Returns:
+            np.memmap | np.ndarray: Every record, an empty array for an empty file.
+        """
+        if len(self) == 0:
+            return np.zeros(0, dtype=RECORD)
+        return np.memmap(self.path, dtype=RECORD, mode=mode, shape=(len(self),))
+
+    def write(self, first_day: date, sales: np.ndarray) -> None:
+        """Record the sales of consecutive days.
+
+        Args:
+            first_day (date): Day of the first row of sales.
+            sales (np.ndarray): Sales in øre with a row per day and a column
+                per payment method.
+        """
+        start = self.day_number(first_day)
+        end = start + len(sales)
+        if end > len(self):
+            with open(self.path, "r+b") as file:
+                file.truncate(end * RECORD.itemsize)
+
+        records = self.records("r+")
+        records["sales"][start:end] = sales
+        records["recorded"][start:end] = 1
+        records.flush()
+
+    def read(self, start: date, end: date) -> np.ndarray:
+        """Slice the records of a range of days.
+
+        Args:
+            start (date): First day.
+            end (date): Last day, included.
+
+        Returns:
+            np.ndarray: Records of the days, days past the end of the file
+                are left out.
+        """
+        first = max((start - HISTORY_EPOCH).days, 0)
+        return self.records()[first : self.day_number(end) + 1]
+
+    def report(self, start: date, end: date) -> pd.DataFrame:
+        """Get the recorded days of a range as a report.
+
+        Args:
+            start (date): First day.
+            end (date): Last day, included.
+
+        Returns:
+            pd.DataFrame: Sales of every recorded day, with the columns of
+                clean_data.
+        """
+        first = max(start, HISTORY_EPOCH)
+        records = self.read(first, end)
+        recorded = records["recorded"].astype(bool)
+        days = np.datetime64(first, "D") + np.arange(len(records))
+
+        report = pd.DataFrame(
+            records["sales"][recorded] / 100,
+            index=pd.DatetimeIndex(days[recorded], name="Date"),
+            columns=REPORT_COLUMNS,
+        )
+
+        report["Total"] = report.sum(axis=1)
+        return report
+
+    def recorded_range(self) -> tuple[date, date] | None:
+        """Find the first and last recorded day.
+
+        Returns:
+            tuple[date, date] | None: First and last day, None if empty.
+        """
+        recorded = np.flatnonzero(self.records()["recorded"])
+        if len(recorded) == 0:
+            return None
+        return (
+            HISTORY_EPOCH + timedelta(days=int(recorded[0])),
+            HISTORY_EPOCH + timedelta(days=int(recorded[-1])),
+        )
+
+
+def rebuild_from_soap(
+    config: dict,
+    start: date,
+    end: date,
+    history: DailyHistory,
+    chunk_days: int = 31,
+) -> None:
+    """Record the sales of a range fetched from DanDomain.
+
+    The range is fetched a chunk at a time, so only one chunk of orders is
+    held in memory.
+
+    Args:
+        config (dict): Config file containing login information and such.
+        start (date): First day.
+        end (date): Last day, included.
+        history (DailyHistory): History to write to.
+        chunk_days (int, optional): Days fetched per call. Defaults to 31.
+    """
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+        start_date = f"{chunk_start.isoformat()} 00:00:00"
+        end_date = f"{chunk_end.isoformat()} 23:59:59"
+
+        orders = load_data(dict(config, Start_date=start_date, End_date=end_date))
+        if orders is None:
+            print(f"Skipping {chunk_start} to {chunk_end}, no orders loaded")
+        else:
+            days = days_in_range(start_date, end_date)
+            history.write(chunk_start, sum_orders_by_day(orders, days[0], len(days)))
+
+        chunk_start = chunk_end + timedelta(days=1)
+
+
+def rebuild_from_exports(sums: pd.DataFrame, history: DailyHistory) -> None:
+    """Record the sales per day of summed up dandomain exports.
+
+    Args:
+        sums (pd.DataFrame): Sales per day with the columns of clean_data,
+            from ingest_exports.
+        history (DailyHistory): History to write to.
+    """
+    days = pd.date_range(sums.index.min(), sums.index.max(), freq="D")
+    sales = sums.reindex(days)[REPORT_COLUMNS]
+    recorded = sales.notna().any(axis=1).to_numpy()
+    sales = np.rint(sales.fillna(0).to_numpy() * 100).astype(np.int64)
+
+    # Write runs of recorded days, so gaps between exports stay unrecorded.
+    starts = np.flatnonzero(np.diff(np.r_[0, recorded.astype(int)]) == 1)
+    ends = np.flatnonzero(np.diff(np.r_[recorded.astype(int), 0]) == -1)
+    for run_start, run_end in zip(starts, ends):
+        history.write(days[run_start].date(), sales[run_start : run_end + 1])
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,202 @@
+import json
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+METRICS_PATH = "Data/rolling_metrics.json"
+
+# Lengths in days of the rolling windows.
+WINDOWS = (7, 28)
+
+# Days between a window and the window it is compared to a year earlier. 52
+# weeks, so the same weekdays are compared.
+YEAR_DAYS = 364
+
+
+class RollingMetrics:
+    """Rolling sums, means and year-over-year deltas of daily sales.
+
+    The sales of the last YEAR_DAYS + max(WINDOWS) days are kept in a ring
+    buffer in whole øre, and the sum of each window and of the same window a
+    year earlier is updated as days are added, so adding a day costs the same
+    however much history there is. Days that were never added are unknown,
+    and metrics of windows holding an unknown day are NaN until it is added.
+
+    Args:
+        path (str, optional): JSON file the state is loaded from and saved to.
+            Defaults to None, starting empty and not saving.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.size = YEAR_DAYS + max(WINDOWS)
+        self.values = [None] * self.size
+        self.count = 0
+        self.last_day = None
+        self.sums = [0] * len(WINDOWS)
+        self.last_year = [0] * len(WINDOWS)
+
+        if path is not None and os.path.exists(path):
+            with open(path) as file:
+                state = json.load(file)
+            self.values = state["values"]
+            self.count = state["count"]
+            self.last_day = date.fromisoformat(state["last_day"])
+            self.sums = state["sums"]
+            self.last_year = state["last_year"]
+
+    def value(self, day_number: int) -> int:
+        """Sales in øre of a day, zero before the first day or if unknown."""
+        if day_number < 0:
+            return 0
+        return self.values[day_number % self.size] or 0
+
+    def is_known(self, first: int, last: int) -> bool:
+        """Check that every day from first to last, included, was added."""
+        return first >= 0 and all(
+            self.values[day_number % self.size] is not None
+            for day_number in range(first, last + 1)
+        )
+
+    def append(self, sales: int | None) -> None:
+        """Append the sales in øre of the day after the last one.
+
+        Args:
+            sales (int | None): Sales in øre, None if unknown.
+        """
+        t = self.count
+        for i, window in enumerate(WINDOWS):
+            self.sums[i] += (sales or 0) - self.value(t - window)
+            self.last_year[i] += self.value(t - YEAR_DAYS) - self.value(
+                t - YEAR_DAYS - window
+            )
+        # Read before writing, the slot of day t held day t - size.
+        self.values[t % self.size] = sales
+        self.count += 1
+
+    def replace(self, day_number: int, sales: int) -> None:
+        """Replace the sales of a day still in the ring buffer.
+
+        Args:
+            day_number (int): Number of the day, counted from the first day.
+            sales (int): Sales in øre.
+        """
+        t = self.count - 1
+        change = sales - self.value(day_number)
+        for i, window in enumerate(WINDOWS):
+            if t - window < day_number <= t:
+                self.sums[i] += change
+            if t - YEAR_DAYS - window < day_number <= t - YEAR_DAYS:
+                self.last_year[i] += change
+        self.values[day_number % self.size] = sales
+
+    def add_day(self, day: date, total: float) -> dict[str, float] | None:
+        """Add the sales of a day and get the metrics ending on the last day.
+
+        Days skipped since the last day are left unknown until they are
+        added. Adding a day again replaces its sales.
+
+        Args:
+            day (date): Day the sales belong to.
+            total (float): Sales of the day in DKK.
+
+        Returns:
+            dict[str, float] | None: Metrics ending on the last day, None if
+                the day is too old to be kept.
+        """
+        sales = int(round(total * 100))
+        if self.last_day is None or day > self.last_day:
+            if self.last_day is not None:
+                for _ in range((day - self.last_day).days - 1):
+                    self.append(None)
+            self.append(sales)
+            self.last_day = day
+        else:
+            day_number = self.count - 1 - (self.last_day - day).days
+            if day_number < 0 or day_number <= self.count - 1 - self.size:
+                print(f"Skipping {day}, rolling metrics only keep {self.size} days")
+                return None
+            self.replace(day_number, sales)
+
+        return self.metrics()
+
+    def metrics(self) -> dict[str, float]:
+        """Get the metrics ending on the last day.
+
+        Windows not yet filled or holding unknown days, and year-over-year
+        deltas without a known window a year before them, are NaN.
+
+        Returns:
+            dict[str, float]: Sum, mean and year-over-year delta in DKK, and
+                the delta in percent, of each window.
+        """
+        metrics = {}
+        t = self.count - 1
+        for window, window_sum, last_year in zip(WINDOWS, self.sums, self.last_year):
+            full = self.is_known(t - window + 1, t)
+            has_last_year = full and self.is_known(
+                t - YEAR_DAYS - window + 1, t - YEAR_DAYS
+            )
+            metrics[f"{window} day sum"] = window_sum / 100 if full else np.nan
+            metrics[f"{window} day mean"] = (
+                window_sum / 100 / window if full else np.nan
+            )
+            metrics[f"{window} day YoY"] = (
+                (window_sum - last_year) / 100 if has_last_year else np.nan
+            )
+            metrics[f"{window} day YoY %"] = (
+                (window_sum - last_year) / last_year * 100
+                if has_last_year and last_year != 0
+                else np.nan
+            )
+        return metrics
+
+    def save(self) -> None:
+        """Save the state to the JSON file it was loaded from."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w") as file:
+            json.dump(
+                {
+                    "values": self.values,
+                    "count": self.count,
+                    "last_day": self.last_day.isoformat(),
+                    "sums": self.sums,
+                    "last_year": self.last_year,
+                },
+                file,
+            )
+
+
+def rolling_metrics(
+    daily: pd.DataFrame, metrics: RollingMetrics = None, column: str = "Total"
+) -> pd.DataFrame:
+    """Compute the rolling metrics of every day of a report.
+
+    Args:
+        daily (pd.DataFrame): Sales per day, see Rollup.day.
+        metrics (RollingMetrics, optional): State to continue from. Defaults
+            to None, starting from the first day of the report.
+        column (str, optional): Column of sales. Defaults to "Total".
+
+    Returns:
+        pd.DataFrame: Metrics with a row per day.
+    """
+    if metrics is None:
+        metrics = RollingMetrics()
+
+    days, rows = [], []
+    for day, total in zip(daily.index, daily[column].to_numpy()):
+        row = metrics.add_day(day.date(), total)
+        if row is not None:
+            days.append(day)
+            rows.append(row)
+
+    return pd.DataFrame(
+        rows, index=pd.DatetimeIndex(days, name="Date"), columns=list(metrics.metrics())
+    )
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,194 @@
+import os
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from src.order_table import AMOUNT_COLUMN, make_order_table
+from src.soap import DATE_FORMAT, parse_date
+
+
+def days_in_range(start_date: str, end_date: str) -> list[date]:
+    """List every day touched by a date range.
+
+    Args:
+        start_date (str): Date of earliest orders.
+        end_date (str): Date of latest orders.
+
+    Returns:
+        list[date]: Days from start to end, both included.
+    """
+    start = parse_date(start_date).date()
+    end = parse_date(end_date).date()
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def group_consecutive_days(days: list[date]) -> list[tuple[str, str]]:
+    """Merge days into as few contiguous ranges as possible.
+
+    Args:
+        days (list[date]): Days to be fetched.
+
+    Returns:
+        list[tuple[str, str]]: Start and end of every contiguous range.
+    """
+    ranges = []
+    for day in sorted(days):
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+
+    return [
+        (f"{start.isoformat()} 00:00:00", f"{end.isoformat()} 23:59:59")
+        for start, end in ranges
+    ]
+
+
+class OrderCache:
+    """Orders stored on disk, partitioned by shop and delivery date.
+
+    A day counts as final once it has been fetched at least refetch_days after
+    it ended. Days fetched earlier than that are fetched again, in case order
+    statuses changed late.
+
+    Args:
+        path (str, optional): Path of the SQLite file. Defaults to
+            "Data/orders.sqlite".
+        refetch_days (int, optional): Days after which a day is final.
+            Defaults to 7.
+        shop (str, optional): Key of the shop the orders belong to, see
+            shop_key. Defaults to "".
+    """
+
+    def __init__(
+        self, path: str = "Data/orders.sqlite", refetch_days: int = 7, shop: str = ""
+    ):
+        self.path = path
+        self.refetch_days = refetch_days
+        self.shop = shop
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self.connect() as connection:
+            columns = [
+                row[1]
+                for row in connection.execute("PRAGMA table_info(fetched_days)")
+            ]
+            if columns and "shop" not in columns:
+                # Stored before orders were kept per shop, so the shop of the
+                # orders is unknown and they are fetched again.
+                connection.execute("DROP TABLE IF EXISTS orders")
+                connection.execute("DROP TABLE fetched_days")
+
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS orders "
+                "(shop TEXT, day TEXT, date TEXT, incl_vat REAL, payment_method TEXT)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS orders_shop_day ON orders (shop, day)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS fetched_days "
+                "(shop TEXT, day TEXT, fetched_at TEXT, PRIMARY KEY (shop, day))"
+            )
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def stale_days(self, start_date: str, end_date: str) -> list[date]:
+        """Find the days that are missing or may still change.
+
+        Args:
+            start_date (str): Date of earliest orders.
+            end_date (str): Date of latest orders.
+
+        Returns:
+            list[date]: Days that should be fetched.
+        """
+        days = days_in_range(start_date, end_date)
+        with self.connect() as connection:
+            fetched = dict(
+                connection.execute(
+                    "SELECT day, fetched_at FROM fetched_days "
+                    "WHERE shop = ? AND day BETWEEN ? AND ?",
+                    (self.shop, days[0].isoformat(), days[-1].isoformat()),
+                ).fetchall()
+            )
+
+        stale = []
+        for day in days:
+            fetched_at = fetched.get(day.isoformat())
+            settled = datetime.combine(day, datetime.min.time()) + timedelta(
+                days=1 + self.refetch_days
+            )
+            if fetched_at is None or datetime.fromisoformat(fetched_at) < settled:
+                stale.append(day)
+
+        return stale
+
+    def store(self, orders: pd.DataFrame, days: list[date]) -> None:
+        """Replace the stored orders of the given days.
+
+        Args:
+            orders (pd.DataFrame): Order table of the given days.
+            days (list[date]): Days the orders were fetched for.
+        """
+        fetched_at = datetime.now().isoformat(timespec="seconds")
+        day_keys = [(day.isoformat(),) for day in days]
+        orders = orders[pd.to_datetime(orders["Date"]).dt.date.isin(days)]
+        rows = [
+            (
+                self.shop,
+                order_date.date().isoformat(),
+                order_date.strftime(DATE_FORMAT),
+                amount / 100,
+                payment_method,
+            )
+            for order_date, amount, payment_method in zip(
+                orders["Date"],
+                orders[AMOUNT_COLUMN].tolist(),
+                orders["PaymentMethod"],
+            )
+        ]
+
+        with self.connect() as connection:
+            connection.executemany(
+                "DELETE FROM orders WHERE shop = ? AND day = ?",
+                [(self.shop, day) for (day,) in day_keys],
+            )
+            connection.executemany(
+                "INSERT INTO orders VALUES (?, ?, ?, ?, ?)", rows
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO fetched_days VALUES (?, ?, ?)",
+                [(self.shop, day, fetched_at) for (day,) in day_keys],
+            )
+
+    def load(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """Read the stored orders of a range.
+
+        Args:
+            start_date (str): Date of earliest orders.
+            end_date (str): Date of latest orders.
+
+        Returns:
+            pd.DataFrame: Order table, see make_order_table.
+        """
+        days = days_in_range(start_date, end_date)
+        with self.connect() as connection:
+            orders = pd.read_sql_query(
+                "SELECT date, incl_vat, payment_method FROM orders "
+                "WHERE shop = ? AND day BETWEEN ? AND ? ORDER BY date",
+                connection,
+                params=(self.shop, days[0].isoformat(), days[-1].isoformat()),
+            )
+
+        return make_order_table(
+            pd.to_datetime(orders["date"], format=DATE_FORMAT),
+            orders["incl_vat"],
+            orders["payment_method"],
+        )
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from src.constants import PAYMENT_METHODS
+
+# Amounts are kept as whole øre, which makes sums exact and uses 4 bytes.
+AMOUNT_COLUMN = "Incl. vat øre"
+
+
+def make_order_table(
+    dates: pd.DatetimeIndex,
+    amounts: np.ndarray,
+    payments: list[str],
+    payment_methods: list[str] = PAYMENT_METHODS,
+) -> pd.DataFrame:
+    """Build the compact order table used for orders from every source.
+
+    Args:
+        dates (pd.DatetimeIndex): Delivery time of every order.
+        amounts (np.ndarray): Amount incl. vat in DKK of every order.
+        payments (list[str]): Payment method of every order.
+        payment_methods (list[str], optional): Known payment methods, any
+            other method is stored as missing. Defaults to PAYMENT_METHODS.
+
+    Raises:
+        ValueError: If an amount is missing or does not fit in int32 øre.
+
+    Returns:
+        pd.DataFrame: Orders with a second resolution "Date", the amount in
+            whole øre as int32 and "PaymentMethod" as a categorical.
+    """
+    ore = np.rint(np.asarray(amounts, dtype=float) * 100)
+    limits = np.iinfo(np.int32)
+    invalid = ~np.isfinite(ore) | (ore < limits.min) | (ore > limits.max)
+    if invalid.any():
+        raise ValueError(
+            f"{invalid.sum()} order amounts are missing or too large, "
+            f"first {np.asarray(amounts, dtype=float)[invalid][0]}"
+        )
+
+    return pd.DataFrame(
+        {
+            "Date": np.asarray(dates, dtype="datetime64[s]"),
+            AMOUNT_COLUMN: ore.astype(np.int32),
+            "PaymentMethod": pd.Categorical.from_codes(
+                pd.Index(payment_methods).get_indexer(payments),
+                categories=payment_methods,
+            ),
+        }
+    )
+
+
+def sum_kroner(orders: pd.DataFrame, by: str = "Date") -> pd.Series:
+    """Sum the amounts of orders, converting øre back to DKK.
+
+    Args:
+        orders (pd.DataFrame): Order table.
+        by (str, optional): Column to group by. Defaults to "Date".
+
+    Returns:
+        pd.Series: Sales incl. vat in DKK per group.
+    """
+    sums = orders.groupby(by, observed=True)[AMOUNT_COLUMN].sum()
+    return (sums.astype(np.int64) / 100).rename("Incl. vat")
+
+
+if __name__ == "__main__":
+    pass
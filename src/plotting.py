@@ -1,104 +1,202 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import timedelta
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.dates import date2num
+from matplotlib.figure import Figure
 
-from src.constants import PLOTTING_COLORS
+from src.analytics import WEEKDAYS, OrderAnalytics
+from src.constants import LABEL_SPACING_PIXELS, PLOTTING_COLORS
+from src.metrics import WINDOWS
+from src.profiling import add_record, is_profiling, run_stage
+from src.render_cache import RenderCache, fingerprint, remove_output
+from src.rollup import Rollup
 
 
-def save_image(path: str, dataframe: pd.DataFrame) -> None:
+def new_figure() -> tuple[Figure, Axes]:
+    """Create a figure rendered by the Agg canvas, without pyplot.
+
+    Returns:
+        tuple[Figure, Axes]: Figure and its axes.
+    """
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def save_image(fig: Figure, ax: Axes, path: str, dataframe: pd.DataFrame) -> None:
     """Save plotted image.
 
     Args:
+        fig (Figure): Figure to be saved.
+        ax (Axes): Axes of the figure.
         path (str): path to folder where image will be saved.
         dataframe (pd.DateFrame): Data to be plotted.
     """
-    plt.ylabel("Sales Incl. vat [DKK]")
-    plt.tight_layout()
-    plt.ylim(bottom=0)
-    plt.legend(loc="upper right")
-    plt.savefig(f"Reports/{path}.png")
-    plt.close()
+    ax.set_ylabel("Sales Incl. vat [DKK]")
+    fig.tight_layout()
+    ax.set_ylim(bottom=0)
+    ax.legend(loc="upper right")
+    remove_output(f"Reports/{path}.png")
+    fig.savefig(f"Reports/{path}.png")
 
 
-def plot_weekend(dataframe: pd.DataFrame) -> None:
+def plot_weekend(ax: Axes, dataframe: pd.DataFrame) -> None:
     """Show the weekend in a plot.
 
     Args:
+        ax (Axes): Axes to plot on.
         dataframe (pd.DataFrame): Data to be plotted.
-        date_index (pd.Index, optional): Index in date format. Needed for bar chart. Defaults to None.
     """
-    saturdays = [date for date in dataframe.index if date.weekday() == 5]
+    saturdays = dataframe.index[dataframe.index.weekday == 5].to_numpy()
+    if len(saturdays) == 0:
+        return
 
-    for saturday in saturdays:
-        plt.axvspan(
-            saturday - np.timedelta64(12, "h"),
-            saturday + np.timedelta64(36, "h"),
+    ax.xaxis.update_units(saturdays)
+    starts = date2num(saturdays - np.timedelta64(12, "h"))
+    ends = date2num(saturdays + np.timedelta64(36, "h"))
+
+    # One rectangle per weekend, spanning the full height of the axes.
+    bottom = np.zeros_like(starts)
+    top = np.ones_like(starts)
+    vertices = np.stack(
+        [
+            np.column_stack([starts, bottom]),
+            np.column_stack([starts, top]),
+            np.column_stack([ends, top]),
+            np.column_stack([ends, bottom]),
+        ],
+        axis=1,
+    )
+    ax.add_collection(
+        PolyCollection(
+            vertices,
+            transform=ax.get_xaxis_transform(),
             color="gray",
             alpha=0.4,
+        ),
+        autolim=False,
+    )
+    ax.update_datalim(
+        np.column_stack([np.r_[starts, ends], np.r_[bottom, top]]), updatey=False
+    )
+    ax.autoscale_view()
+
+
+def select_labels(
+    ax: Axes,
+    values: np.ndarray,
+    label_spacing: float = LABEL_SPACING_PIXELS,
+    label_top: int = None,
+) -> np.ndarray:
+    """Choose which points of a series get a value label.
+
+    Nonzero points are binned so that bins are at least label_spacing pixels
+    wide, and only the largest value of each bin is labeled.
+
+    Args:
+        ax (Axes): Axes the series is plotted on.
+        values (np.ndarray): Values of the series.
+        label_spacing (float, optional): Minimum distance between labels in
+            pixels. Defaults to LABEL_SPACING_PIXELS, 0 labels every point.
+        label_top (int, optional): Only label the largest label_top values.
+            Defaults to None.
+
+    Returns:
+        np.ndarray: Positions of the points to be labeled.
+    """
+    values = np.asarray(values)
+    positions = np.flatnonzero(values)
+    if label_top is not None:
+        positions = np.sort(
+            positions[np.argsort(-values[positions], kind="stable")[:label_top]]
         )
 
+    points_per_label = max(
+        1, int(np.ceil(label_spacing * len(values) / ax.bbox.width))
+    )
+    bins = positions // points_per_label
+    order = np.lexsort((-values[positions], bins))
+    _, first_in_bin = np.unique(bins[order], return_index=True)
+
+    return np.sort(positions[order][first_in_bin])
+
+
+def add_labels(
+    ax: Axes,
+    x: pd.Index,
+    y: np.ndarray,
+    positions: np.ndarray,
+    text_format: str = "{:.2f}",
+    **kwargs,
+) -> None:
+    """Add the value labels of the chosen points.
 
-def plot_by_payment(dataframe: pd.DataFrame) -> None:
+    Args:
+        ax (Axes): Axes to plot on.
+        x (pd.Index): X values of the series.
+        y (np.ndarray): Label positions and values of the series.
+        positions (np.ndarray): Positions of the points to be labeled.
+        text_format (str, optional): Format of the labels. Defaults to "{:.2f}".
+        **kwargs: Passed on to Axes.text.
+    """
+    y = np.asarray(y)
+    for x_value, y_value in zip(x[positions], y[positions]):
+        ax.text(x_value, y_value, text_format.format(y_value), **kwargs)
+
+
+def plot_by_payment(
+    ax: Axes,
+    dataframe: pd.DataFrame,
+    label_spacing: float = LABEL_SPACING_PIXELS,
+    label_top: int = None,
+) -> None:
     """Plot the different payment methods, in a plot addetively.
 
     Args:
+        ax (Axes): Axes to plot on.
         dataframe (pd.DataFrame): Dataframe to be plotted.
+        label_spacing (float, optional): Minimum distance between labels in
+            pixels. Defaults to LABEL_SPACING_PIXELS.
+        label_top (int, optional): Only label the largest values. Defaults to None.
     """
     cash = dataframe["Cash payment"].copy()
     terminal = dataframe["Card terminal"] + cash
     card = dataframe["Credit card payment"] + terminal
 
-    plt.plot(
+    ax.plot(
         card,
         label="Credit card",
         color=PLOTTING_COLORS[0],
         alpha=0.7,
     )
-    plt.plot(
+    ax.plot(
         terminal,
         label="Card terminal",
         color=PLOTTING_COLORS[1],
         alpha=0.7,
     )
-    plt.plot(
+    ax.plot(
         cash,
         label="Cash payment",
         color=PLOTTING_COLORS[2],
         alpha=0.7,
     )
 
-    cash_nonzero = np.nonzero(cash)
-    terminal_nonzero = np.nonzero(dataframe["Card terminal"])
-    card_nonzero = np.nonzero(dataframe["Credit card payment"])
-
-    for idx in cash_nonzero[0]:
-        plt.text(
-            dataframe.index[idx],
-            cash.iloc[idx],
-            f"{cash.iloc[idx]:.2f}",
-            ha="center",
-            va="bottom",
-        )
-    for idx in terminal_nonzero[0]:
-        plt.text(
-            dataframe.index[idx],
-            terminal.iloc[idx],
-            f"{terminal.iloc[idx]:.2f}",
-            ha="center",
-            va="top",
-        )
-    for idx in card_nonzero[0]:
-        plt.text(
-            dataframe.index[idx],
-            card.iloc[idx],
-            f"{card.iloc[idx]:.2f}",
-            ha="center",
-            va="bottom",
-        )
+    for stacked, own, va in [
+        (cash, cash, "bottom"),
+        (terminal, dataframe["Card terminal"], "top"),
+        (card, dataframe["Credit card payment"], "bottom"),
+    ]:
+        positions = select_labels(ax, own, label_spacing, label_top)
+        add_labels(ax, dataframe.index, stacked, positions, ha="center", va=va)
 
-    plt.fill_between(
+    ax.fill_between(
         card.index,
         terminal,
         card,
@@ -106,7 +204,7 @@ def plot_by_payment(dataframe: pd.DataFrame) -> None:
         color=PLOTTING_COLORS[0],
         label=None,
     )
-    plt.fill_between(
+    ax.fill_between(
         card.index,
         cash,
         terminal,
@@ -114,7 +212,7 @@ def plot_by_payment(dataframe: pd.DataFrame) -> None:
         color=PLOTTING_COLORS[1],
         label=None,
     )
-    plt.fill_between(
+    ax.fill_between(
         card.index,
         0,
         cash,
@@ -124,109 +222,119 @@ def plot_by_payment(dataframe: pd.DataFrame) -> None:
     )
 
 
-def plot_by_day(dataframe: pd.DataFrame, path: str) -> None:
+def plot_by_day(
+    dataframe: pd.DataFrame,
+    path: str,
+    label_spacing: float = LABEL_SPACING_PIXELS,
+    label_top: int = None,
+) -> None:
     """Plot sales by day.
 
     Args:
         dataframe (pd.DataFrame): Daily sales.
         path (str): Path to folder where image will be saved.
+        label_spacing (float, optional): Minimum distance between labels in
+            pixels. Defaults to LABEL_SPACING_PIXELS.
+        label_top (int, optional): Only label the largest values. Defaults to None.
     """
     if len(dataframe.index) < 3:
         return
 
-    plt.figure(figsize=(10, 6))
+    fig, ax = new_figure()
 
-    plot_weekend(dataframe)
+    plot_weekend(ax, dataframe)
 
-    plot_by_payment(dataframe)
+    plot_by_payment(ax, dataframe, label_spacing, label_top)
 
-    plt.xticks(dataframe.index, [date.strftime("%m-%d") for date in dataframe.index])
+    ax.set_xticks(dataframe.index)
+    ax.set_xticklabels([date.strftime("%m-%d") for date in dataframe.index])
 
-    save_image(f"{path}/daily", dataframe)
+    save_image(fig, ax, f"{path}/daily", dataframe)
 
 
-def plot_by_week(dataframe: pd.DataFrame, path: str) -> None:
+def plot_by_week(weekly_data: pd.DataFrame, path: str) -> None:
     """Plot sales by week.
 
     Args:
-        dataframe (pd.DataFrame): Daily sales.
+        weekly_data (pd.DataFrame): Weekly sales, from Rollup.week.
         path (str): Path to folder where image will be saved.
     """
-    weekly_data = dataframe.copy()
-    weekly_data.index = weekly_data.index.strftime("%W")
-    weekly_data = weekly_data.groupby("Date").sum()
-
     if len(weekly_data.index) < 3:
         return
 
-    plt.figure(figsize=(10, 6))
-    plot_by_payment(weekly_data)
-    plt.xlabel("Week number")
+    fig, ax = new_figure()
+    plot_by_payment(ax, weekly_data)
+    ax.set_xlabel("Week number")
 
-    save_image(f"{path}/weekly", weekly_data)
+    save_image(fig, ax, f"{path}/weekly", weekly_data)
 
 
-def plot_by_month(dataframe: pd.DataFrame, path: str) -> None:
-    """Plot sales by week.
+def plot_by_month(monthly_data: pd.DataFrame, path: str) -> None:
+    """Plot sales by month.
 
     Args:
-        dataframe (pd.DataFrame): Daily sales.
+        monthly_data (pd.DataFrame): Monthly sales, from Rollup.month.
         path (str): Path to folder where image will be saved.
     """
-    monthly_data = dataframe.copy()
-    monthly_data.index = monthly_data.index.strftime("%m")
-    monthly_data = monthly_data.groupby("Date").sum()
-
     if len(monthly_data.index) < 3:
         return
 
-    plt.figure(figsize=(10, 6))
-    plot_by_payment(monthly_data)
-    plt.xlabel("Month")
+    fig, ax = new_figure()
+    plot_by_payment(ax, monthly_data)
+    ax.set_xlabel("Month")
 
-    save_image(f"{path}/monthly", monthly_data)
+    save_image(fig, ax, f"{path}/monthly", monthly_data)
 
 
-def plot_yearly_comparisson(dataframe: pd.DataFrame, path: str) -> None:
+def plot_yearly_comparisson(monthly_data: pd.DataFrame, path: str) -> None:
     """Plot last years sales compared to this years.
 
     Args:
-        dataframe (pd.DataFrame): Data to be plotted.
-        path (str): Path where plot will be saved.
+        monthly_data (pd.DataFrame): Monthly sales, from Rollup.month.
+        path (str): Path to folder where image will be saved.
     """
-    plt.figure(figsize=(10, 6))
-    monthly_data = dataframe.copy()
-    monthly_data.index = monthly_data.index.strftime("%Y-%m")
-    monthly_data = monthly_data.groupby("Date").sum()
-
     if len(monthly_data.index) < 13:
         return
 
-    dataframe_list = monthly_data.groupby(pd.Grouper(freq="Y"))
+    fig, ax = new_figure()
+    years = monthly_data.index.str[:4]
+    months = monthly_data.index.str[5:].astype(int)
 
-    for _, df in dataframe_list:
-        plt.plot(df["Total"])
+    for year in years.unique():
+        in_year = years == year
+        ax.plot(months[in_year], monthly_data["Total"][in_year], label=year)
 
-    save_image(path, dataframe)
+    ax.set_xticks(range(1, 13))
+    ax.set_xlabel("Month")
 
+    save_image(fig, ax, f"{path}/yearly_comparisson", monthly_data)
 
-def plot_bar_chart(dataframe: pd.DataFrame, path: str) -> None:
+
+def plot_bar_chart(
+    dataframe: pd.DataFrame,
+    path: str,
+    label_spacing: float = LABEL_SPACING_PIXELS,
+    label_top: int = None,
+) -> None:
     """Plot a histogram of daily sales.
 
     Args:
         dataframe (pd.DataFrame): Data to be ploted.
         path (str): Path to folder where image will be saved
+        label_spacing (float, optional): Minimum distance between labels in
+            pixels. Defaults to LABEL_SPACING_PIXELS.
+        label_top (int, optional): Only label the largest values. Defaults to None.
     """
     if len(dataframe.index) < 3:
         return
 
-    plt.figure(figsize=(10, 6))
+    fig, ax = new_figure()
 
     bar_spacing = timedelta(hours=3)
 
     # Create a bar chart for each column
     for i, col in enumerate(dataframe.columns):
-        plt.bar(
+        ax.bar(
             dataframe.index + (i - 2) * bar_spacing,
             dataframe[col],
             width=0.1,
@@ -234,40 +342,218 @@ def plot_bar_chart(dataframe: pd.DataFrame, path: str) -> None:
             alpha=0.7,
             color=PLOTTING_COLORS[i],
         )
-        for j, value in enumerate(dataframe[col]):
-            if value == 0:
-                continue
-            plt.text(
-                dataframe.index[j] + (i - 2) * bar_spacing,
+        positions = select_labels(ax, dataframe[col], label_spacing, label_top)
+        for x_value, value in zip(
+            dataframe.index[positions] + (i - 2) * bar_spacing,
+            dataframe[col].iloc[positions],
+        ):
+            ax.text(
+                x_value,
                 value + 1,  # Adjust the vertical position of the text as needed
                 str(value),
                 ha="center",
                 rotation=30,
             )
 
-    plot_weekend(dataframe)
+    plot_weekend(ax, dataframe)
 
-    plt.xticks(dataframe.index, [date.strftime("%m-%d") for date in dataframe.index])
+    ax.set_xticks(dataframe.index)
+    ax.set_xticklabels([date.strftime("%m-%d") for date in dataframe.index])
 
-    save_image(f"{path}/bar_chart", dataframe)
+    save_image(fig, ax, f"{path}/bar_chart", dataframe)
 
 
-def get_all_plots(report: pd.DataFrame, path: str) -> None:
-    """Plot all relevant plots.
+def plot_rolling_means(trends: pd.DataFrame, path: str) -> None:
+    """Plot the rolling mean of daily sales of each window.
 
     Args:
-        report (pd.Dataframe): Data plots should be made from.
-        path (str): Folder where data should be saved.
+        trends (pd.DataFrame): Rolling metrics, from Rollup.trends.
+        path (str): Path to folder where image will be saved.
     """
-    plot_by_week(report, path)
+    if trends[f"{WINDOWS[0]} day mean"].count() < 3:
+        return
 
-    plot_by_month(report, path)
+    fig, ax = new_figure()
+    for i, window in enumerate(WINDOWS):
+        ax.plot(
+            trends[f"{window} day mean"],
+            label=f"{window} day mean",
+            color=PLOTTING_COLORS[i],
+        )
+    ax.set_xlabel("Date")
+
+    save_image(fig, ax, f"{path}/rolling_means", trends)
+
+
+def plot_year_over_year(trends: pd.DataFrame, path: str) -> None:
+    """Plot the change of each rolling window from a year earlier.
+
+    Args:
+        trends (pd.DataFrame): Rolling metrics, from Rollup.trends.
+        path (str): Path to folder where image will be saved.
+    """
+    if trends[f"{WINDOWS[0]} day YoY %"].count() < 3:
+        return
+
+    fig, ax = new_figure()
+    for i, window in enumerate(WINDOWS):
+        ax.plot(
+            trends[f"{window} day YoY %"],
+            label=f"{window} days",
+            color=PLOTTING_COLORS[i],
+        )
+    ax.axhline(0, color="black", linewidth=0.8)
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Change from a year earlier [%]")
+    ax.legend(loc="upper right")
+
+    fig.tight_layout()
+    remove_output(f"Reports/{path}/year_over_year.png")
+    fig.savefig(f"Reports/{path}/year_over_year.png")
+
+
+def plot_heatmap(
+    values: pd.DataFrame,
+    path: str,
+    xlabel: str,
+    ylabel: str,
+    colorbar_label: str,
+) -> None:
+    """Plot a table of values as a heatmap.
+
+    Args:
+        values (pd.DataFrame): Values, rows are drawn top to bottom.
+        path (str): Path of the image, without extension, under Reports.
+        xlabel (str): Label of the columns.
+        ylabel (str): Label of the rows.
+        colorbar_label (str): Label of the values.
+    """
+    fig, ax = new_figure()
 
-    daily_report = report.groupby(pd.Grouper(freq="D")).sum()
+    image = ax.imshow(values.to_numpy(), aspect="auto", cmap="viridis")
+    fig.colorbar(image, ax=ax, label=colorbar_label)
 
-    plot_by_day(daily_report, path)
+    ax.set_xticks(range(len(values.columns)))
+    ax.set_xticklabels(values.columns, rotation=45 if len(values.columns) < 24 else 0)
+    ax.set_yticks(range(len(values.index)))
+    ax.set_yticklabels(values.index)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
 
-    plot_bar_chart(daily_report, path)
+    fig.tight_layout()
+    remove_output(f"Reports/{path}.png")
+    fig.savefig(f"Reports/{path}.png")
+
+
+def plot_order_analytics(analytics: OrderAnalytics, path: str) -> None:
+    """Plot orders per weekday and hour, and the basket sizes.
+
+    Args:
+        analytics (OrderAnalytics): Breakdowns of the orders.
+        path (str): Path to folder where images will be saved.
+    """
+    plot_heatmap(
+        pd.DataFrame(analytics.mean_hour_weekday(), index=WEEKDAYS),
+        f"{path}/hourly_heatmap",
+        xlabel="Hour of day",
+        ylabel="Weekday",
+        colorbar_label="Orders per day",
+    )
+    plot_heatmap(
+        analytics.basket_sizes(),
+        f"{path}/basket_sizes",
+        xlabel="Basket size [DKK]",
+        ylabel="Payment method",
+        colorbar_label="Orders",
+    )
+
+
+def plot_process_context() -> multiprocessing.context.BaseContext | None:
+    """Get the context plot worker processes are started in.
+
+    Plots are rendered while the export runs in a thread, and forking a
+    process with other threads running can deadlock the child on locks held
+    at the time of the fork. Workers are started from a fork server instead,
+    which has this module imported already.
+
+    Returns:
+        multiprocessing.context.BaseContext | None: Fork server context, None
+            for the default where fork servers are not supported.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return None
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["src.plotting"])
+    return context
+
+
+def get_all_plots(
+    report: pd.DataFrame,
+    path: str,
+    max_workers: int = None,
+    rollup: Rollup = None,
+    cache: RenderCache = None,
+) -> None:
+    """Plot all relevant plots.
+
+    Each plot is rendered in its own worker process. Plots of data that was
+    rendered before are linked from the render cache instead.
+
+    Args:
+        report (pd.Dataframe): Data plots should be made from.
+        path (str): Folder where data should be saved.
+        max_workers (int, optional): Number of worker processes. Defaults to
+            None, using one per CPU.
+        rollup (Rollup, optional): Aggregates of the report. Defaults to None,
+            computing them from the report.
+        cache (RenderCache, optional): Cache of rendered plots. Defaults to
+            None, rendering every plot.
+    """
+    if rollup is None:
+        rollup = Rollup(report)
+
+    plots = [
+        (plot_by_week, rollup.week, "weekly"),
+        (plot_by_month, rollup.month, "monthly"),
+        (plot_by_day, rollup.day, "daily"),
+        (plot_bar_chart, rollup.day, "bar_chart"),
+        (plot_rolling_means, rollup.trends, "rolling_means"),
+        (plot_year_over_year, rollup.trends, "year_over_year"),
+    ]
+
+    keys = {}
+    if cache is not None:
+        missing = []
+        for plot, data, file_name in plots:
+            key = fingerprint({"data": data}, plot, file_name)
+            image_path = f"Reports/{path}/{file_name}.png"
+            if not cache.fetch(key, image_path):
+                # Plots of too little data write nothing, so an image left by
+                # an earlier run must not be stored under the new key.
+                remove_output(image_path)
+                keys[image_path] = key
+                missing.append((plot, data, file_name))
+        plots = missing
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=plot_process_context()
+    ) as executor:
+        if is_profiling():
+            futures = [
+                executor.submit(run_stage, plot.__name__, plot, data, path)
+                for plot, data, _ in plots
+            ]
+            for future, (_, data, _) in zip(futures, plots):
+                _, record = future.result()
+                record["rows"] = len(data)
+                add_record(record)
+        else:
+            futures = [executor.submit(plot, data, path) for plot, data, _ in plots]
+            for future in futures:
+                future.result()
+
+    for image_path, key in keys.items():
+        cache.store(key, image_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Callable, Iterator
+
+# Set to "1" to write a run log, or to "cprofile" to also dump a profile.
+ENV_VARIABLE = "DD_PROFILE"
+
+
+class RunLog:
+    """Wall time, CPU time, row count and peak memory of each stage of a run.
+
+    Memory is traced with tracemalloc, so a stage's peak is the most memory
+    allocated by Python at any point while it was open, in any thread.
+
+    Args:
+        name (str): Name of the run, used in the file names.
+        folder (str, optional): Folder the log is saved to. Defaults to "Logs".
+        cprofile (bool, optional): Also profile the main thread with
+            cProfile and dump the stats next to the log. Defaults to False.
+    """
+
+    def __init__(self, name: str, folder: str = "Logs", cprofile: bool = False):
+        self.name = name
+        self.folder = folder
+        self.started_at = datetime.now()
+        self.stages = []
+        self.open_stages = []
+        self.lock = threading.Lock()
+
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+
+        self.profile = cProfile.Profile() if cprofile else None
+        if self.profile is not None:
+            self.profile.enable()
+
+    def update_peaks(self) -> None:
+        """Pass the traced peak since the last update on to every open stage."""
+        peak = tracemalloc.get_traced_memory()[1]
+        for record in self.open_stages:
+            record["peak_memory_mb"] = max(record["peak_memory_mb"], peak / 1e6)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict]:
+        """Measure a stage.
+
+        Args:
+            name (str): Name of the stage.
+
+        Yields:
+            Iterator[dict]: Record of the stage, "rows" can be set on it.
+        """
+        record = {"stage": name, "thread": threading.current_thread().name}
+        with self.lock:
+            self.update_peaks()
+            record["peak_memory_mb"] = tracemalloc.get_traced_memory()[0] / 1e6
+            self.open_stages.append(record)
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_s"] = time.perf_counter() - wall
+            record["cpu_s"] = time.process_time() - cpu
+            with self.lock:
+                self.update_peaks()
+                self.open_stages.remove(record)
+                self.stages.append(record)
+
+    def add(self, record: dict) -> None:
+        """Add a stage measured elsewhere, such as in a worker process.
+
+        Args:
+            record (dict): Record of the stage.
+        """
+        with self.lock:
+            self.stages.append(record)
+
+    def summary(self) -> dict[str, dict]:
+        """Sum the stages by name.
+
+        Returns:
+            dict[str, dict]: Calls, wall and CPU time, rows and peak memory
+                per stage name.
+        """
+        summary = {}
+        for record in self.stages:
+            total = summary.setdefault(
+                record["stage"],
+                {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_memory_mb": 0.0},
+            )
+            total["calls"] += 1
+            total["wall_s"] += record["wall_s"]
+            total["cpu_s"] += record["cpu_s"]
+            total["peak_memory_mb"] = max(
+                total["peak_memory_mb"], record["peak_memory_mb"]
+            )
+            if "rows" in record:
+                total["rows"] = total.get("rows", 0) + record["rows"]
+        return summary
+
+    def save(self) -> str:
+        """Stop measuring and save the log, and the profile if enabled.
+
+        Returns:
+            str: Path of the log.
+        """
+        if self.profile is not None:
+            self.profile.disable()
+        _, peak = tracemalloc.get_traced_memory()
+        if self.started_tracing:
+            tracemalloc.stop()
+
+        os.makedirs(self.folder, exist_ok=True)
+        base = f"{self.folder}/{self.name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}"
+        log = {
+            "run": self.name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_s": (datetime.now() - self.started_at).total_seconds(),
+            "peak_memory_mb": peak / 1e6,
+            "summary": self.summary(),
+            "stages": self.stages,
+        }
+        with open(f"{base}.json", "w") as file:
+            json.dump(log, file, indent=4)
+
+        if self.profile is not None:
+            self.profile.dump_stats(f"{base}.prof")
+
+        return f"{base}.json"
+
+
+# Run log of the current run, None when profiling is disabled.
+_run_log = None
+
+
+def start_run(name: str, enabled: bool = False, cprofile: bool = False) -> None:
+    """Start a run log if enabled here or through the DD_PROFILE variable.
+
+    Args:
+        name (str): Name of the run.
+        enabled (bool, optional): Write a run log. Defaults to False.
+        cprofile (bool, optional): Also dump a cProfile profile. Defaults to False.
+    """
+    global _run_log
+    setting = os.environ.get(ENV_VARIABLE, "").lower()
+    cprofile = cprofile or setting == "cprofile"
+    if enabled or cprofile or setting not in ("", "0"):
+        _run_log = RunLog(name, cprofile=cprofile)
+
+
+def finish_run() -> None:
+    """Save the run log of the current run, if any."""
+    global _run_log
+    if _run_log is not None:
+        print(f"Run log saved to {_run_log.save()}")
+        _run_log = None
+
+
+def is_profiling() -> bool:
+    return _run_log is not None
+
+
+def stage(name: str):
+    """Measure a stage of the current run, doing nothing when not profiling.
+
+    Args:
+        name (str): Name of the stage.
+
+    Returns:
+        Context manager yielding the record of the stage.
+    """
+    if _run_log is None:
+        return nullcontext({})
+    return _run_log.stage(name)
+
+
+def add_record(record: dict) -> None:
+    if _run_log is not None:
+        _run_log.add(record)
+
+
+def run_stage(name: str, func: Callable, *args, **kwargs) -> tuple:
+    """Call a function as a stage in a worker process.
+
+    The worker has no run log of its own, so the record is returned to be
+    added to the run log of the parent with add_record.
+
+    Args:
+        name (str): Name of the stage.
+        func (Callable): Function to call.
+        *args: Passed on to func.
+        **kwargs: Passed on to func.
+
+    Returns:
+        tuple: Result of func and record of the stage.
+    """
+    run_log = RunLog(name)
+    with run_log.stage(name) as record:
+        result = func(*args, **kwargs)
+    if run_log.started_tracing:
+        tracemalloc.stop()
+    return result, record
+
+
+if __name__ == "__main__":
+    pass
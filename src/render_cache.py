@@ -0,0 +1,176 @@
+import hashlib
+import inspect
+import os
+import shutil
+import uuid
+from functools import lru_cache
+from importlib.metadata import version
+
+import pandas as pd
+
+from src import constants
+
+RENDER_CACHE_PATH = "Data/render_cache"
+
+# Bump to drop every cached output, for changes not caught by the fingerprint.
+RENDER_CACHE_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def source_fingerprint(path: str) -> str:
+    """Hash a source file, so cached outputs are dropped when it changes."""
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def fingerprint(dataframes: dict[str, pd.DataFrame], func, *parameters) -> str:
+    """Hash the data and parameters an output is made from.
+
+    Args:
+        dataframes (dict[str, pd.DataFrame]): Input data keyed by name.
+        func (Callable): Function writing the output. The source of its module
+            is part of the key, as are src/constants.py, which holds the
+            colors and label spacing of plots, and the matplotlib version.
+        *parameters: Any other arguments affecting the output, hashed by repr.
+
+    Returns:
+        str: Hex digest identifying the output.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((RENDER_CACHE_VERSION, version("matplotlib"))).encode())
+    digest.update(f"{func.__module__}.{func.__qualname__}".encode())
+    digest.update(source_fingerprint(inspect.getsourcefile(func)).encode())
+    digest.update(source_fingerprint(constants.__file__).encode())
+    digest.update(repr(parameters).encode())
+    for name, dataframe in dataframes.items():
+        digest.update(repr((name, dataframe.shape)).encode())
+        digest.update(repr(list(zip(dataframe.columns, dataframe.dtypes))).encode())
+        digest.update(repr(dataframe.index.name).encode())
+        digest.update(
+            pd.util.hash_pandas_object(dataframe, index=True).to_numpy().tobytes()
+        )
+    return digest.hexdigest()
+
+
+def remove_output(file_path: str) -> None:
+    """Make room for a new output file.
+
+    Outputs can be hard links into the render cache, so they are removed
+    rather than overwritten in place, which would change the cached copy.
+
+    Args:
+        file_path (str): Path the output will be written to.
+    """
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    if os.path.lexists(file_path):
+        os.remove(file_path)
+
+
+def link_file(source: str, target: str) -> None:
+    """Hard link a file, falling back to a copy across file systems.
+
+    The link is made under a temporary name and moved into place, so the
+    target is never seen half written.
+
+    Args:
+        source (str): Existing file.
+        target (str): Path of the new link, replaced if it exists.
+    """
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    temporary = f"{target}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.link(source, temporary)
+    except OSError:
+        shutil.copy2(source, temporary)
+    os.replace(temporary, target)
+
+
+class RenderCache:
+    """Rendered plots and exported files stored by the hash of their input.
+
+    An output made from the same data, by the same code and with the same
+    parameters as one rendered before is hard linked from the cache instead
+    of being rendered again. Least recently used entries are removed once the
+    cache is larger than max_bytes.
+
+    Args:
+        folder (str, optional): Folder of the cached files. Defaults to
+            RENDER_CACHE_PATH.
+        max_bytes (int, optional): Size the cache is pruned to. Defaults to
+            1 GB.
+    """
+
+    def __init__(self, folder: str = RENDER_CACHE_PATH, max_bytes: int = 10**9):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        os.makedirs(folder, exist_ok=True)
+
+    def entry_path(self, key: str, file_path: str) -> str:
+        return f"{self.folder}/{key}{os.path.splitext(file_path)[1]}"
+
+    def fetch(self, key: str, file_path: str) -> bool:
+        """Put the cached output of a key at a path.
+
+        Args:
+            key (str): Fingerprint of the output.
+            file_path (str): Path the output belongs at.
+
+        Returns:
+            bool: Whether the output was cached.
+        """
+        entry = self.entry_path(key, file_path)
+        if not os.path.exists(entry):
+            return False
+
+        os.utime(entry)
+        if not (os.path.exists(file_path) and os.path.samefile(entry, file_path)):
+            link_file(entry, file_path)
+        return True
+
+    def store(self, key: str, file_path: str) -> None:
+        """Add a freshly written output to the cache.
+
+        Args:
+            key (str): Fingerprint of the output.
+            file_path (str): Path of the output. Outputs that were not written,
+                such as plots of too little data, are skipped.
+        """
+        if os.path.exists(file_path):
+            link_file(file_path, self.entry_path(key, file_path))
+            self.prune()
+
+    def prune(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes."""
+        entries = [
+            entry
+            for entry in os.scandir(self.folder)
+            if entry.is_file() and not entry.name.endswith(".tmp")
+        ]
+        size = sum(entry.stat().st_size for entry in entries)
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            if size <= self.max_bytes:
+                break
+            size -= entry.stat().st_size
+            os.remove(entry.path)
+
+
+def get_render_cache(config: dict) -> RenderCache | None:
+    """Get the render cache configured for a shop.
+
+    Args:
+        config (dict): Config file containing login information and such.
+
+    Returns:
+        RenderCache | None: The cache, None if caching is turned off with
+            "Use_cache".
+    """
+    if not config.get("Use_cache", True):
+        return None
+    return RenderCache(
+        config.get("Render_cache_path", RENDER_CACHE_PATH),
+        config.get("Render_cache_max_bytes", 10**9),
+    )
+
+
+if __name__ == "__main__":
+    pass
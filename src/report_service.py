@@ -0,0 +1,275 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import cached_property
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from src.data_handler import get_and_clean_data, get_daily_report
+from src.plotting import (
+    plot_bar_chart,
+    plot_by_day,
+    plot_by_month,
+    plot_by_week,
+    plot_rolling_means,
+    plot_year_over_year,
+    plot_yearly_comparisson,
+)
+from src.rollup import Rollup
+from src.soap import get_handler, parse_date
+
+# Plot function, aggregate it is drawn from and file name of each plot.
+PLOTS = {
+    "daily": (plot_by_day, "day", "daily"),
+    "weekly": (plot_by_week, "week", "weekly"),
+    "monthly": (plot_by_month, "month", "monthly"),
+    "yearly": (plot_yearly_comparisson, "month", "yearly_comparisson"),
+    "bar_chart": (plot_bar_chart, "day", "bar_chart"),
+    "rolling_means": (plot_rolling_means, "trends", "rolling_means"),
+    "year_over_year": (plot_year_over_year, "trends", "year_over_year"),
+}
+
+
+class CachedReport:
+    """Reports of a range and the responses made from them so far.
+
+    The reports are only fetched when first needed, and should be used while
+    holding the lock.
+    """
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.bodies = {}
+        self.plots = {}
+        self.created_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    @cached_property
+    def report(self) -> pd.DataFrame:
+        return get_and_clean_data(self.config, sort_by_order=False)
+
+    @cached_property
+    def daily(self) -> pd.DataFrame:
+        return get_daily_report(self.config)
+
+    @cached_property
+    def rollup(self) -> Rollup:
+        return Rollup(self.daily)
+
+
+class ReportService(ThreadingHTTPServer):
+    """Local HTTP service answering report requests from a warm process.
+
+    The SOAP handler is logged in once at start up and reused, and the
+    reports of the most recently requested ranges are kept in memory, so
+    only the first request for a range waits for DanDomain. Plots are drawn
+    from get_daily_report, so ranges overlapping earlier ones only fetch the
+    days not seen before.
+
+    Endpoints:
+        GET /report?start=YYYY-MM-DD&end=YYYY-MM-DD[&format=csv]: Report as
+            returned by clean_data, as JSON in split orientation or as CSV.
+        GET /daily?start=YYYY-MM-DD&end=YYYY-MM-DD[&format=csv]: Sales per
+            day, from get_daily_report.
+        GET /plot/<name>.png?start=YYYY-MM-DD&end=YYYY-MM-DD: One of the
+            plots in PLOTS.
+
+    Args:
+        config (dict): Config file containing login information and such.
+        address (tuple[str, int], optional): Host and port to listen on.
+            Defaults to ("127.0.0.1", 8000).
+        max_reports (int, optional): Number of reports kept in memory.
+            Defaults to 32.
+        report_ttl (float, optional): Seconds a report is served before it is
+            fetched again. Defaults to 600.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        config: dict,
+        address: tuple[str, int] = ("127.0.0.1", 8000),
+        max_reports: int = 32,
+        report_ttl: float = 600,
+    ):
+        super().__init__(address, ReportRequestHandler)
+        self.config = config
+        self.max_reports = max_reports
+        self.report_ttl = report_ttl
+        self.reports = OrderedDict()
+        self.lock = threading.Lock()
+        self.render_lock = threading.Lock()
+
+        get_handler(config)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/"
+
+    def get_report(self, start_date: str, end_date: str) -> CachedReport:
+        """Get the cache entry of a range, creating it if needed.
+
+        Args:
+            start_date (str): Date of earliest orders.
+            end_date (str): Date of latest orders.
+
+        Returns:
+            CachedReport: Reports of the range.
+        """
+        key = (start_date, end_date)
+        with self.lock:
+            cached = self.reports.get(key)
+            expired = (
+                cached is not None
+                and time.monotonic() - cached.created_at > self.report_ttl
+            )
+            if cached is None or expired:
+                config = dict(self.config, Start_date=start_date, End_date=end_date)
+                cached = self.reports[key] = CachedReport(config)
+            self.reports.move_to_end(key)
+            while len(self.reports) > self.max_reports:
+                self.reports.popitem(last=False)
+
+        return cached
+
+    def get_body(
+        self, start_date: str, end_date: str, kind: str, file_format: str
+    ) -> bytes:
+        """Get a report of a range encoded as JSON or CSV.
+
+        Args:
+            start_date (str): Date of earliest orders.
+            end_date (str): Date of latest orders.
+            kind (str): Either "report" for the clean_data report or "daily"
+                for the sales per day.
+            file_format (str): Either "json" or "csv".
+
+        Returns:
+            bytes: Encoded report.
+        """
+        cached = self.get_report(start_date, end_date)
+        with cached.lock:
+            if (kind, file_format) not in cached.bodies:
+                report = cached.daily if kind == "daily" else cached.report
+                if file_format == "csv":
+                    body = report.to_csv()
+                else:
+                    body = report.to_json(orient="split", date_format="iso")
+                cached.bodies[(kind, file_format)] = body.encode()
+
+        return cached.bodies[(kind, file_format)]
+
+    def get_plot(self, start_date: str, end_date: str, name: str) -> bytes | None:
+        """Get a plot of a range as PNG, rendering it on first request.
+
+        Args:
+            start_date (str): Date of earliest orders.
+            end_date (str): Date of latest orders.
+            name (str): Name of the plot, a key of PLOTS.
+
+        Returns:
+            bytes | None: PNG image, None if the range is too short for the plot.
+        """
+        cached = self.get_report(start_date, end_date)
+        with cached.lock:
+            if name not in cached.plots:
+                plot, aggregate, file_name = PLOTS[name]
+                path = f"Service/{start_date}_to_{end_date}"
+                image_path = f"Reports/{path}/{file_name}.png"
+                if os.path.exists(image_path):
+                    os.remove(image_path)
+                with self.render_lock:
+                    plot(getattr(cached.rollup, aggregate), path)
+                try:
+                    with open(image_path, "rb") as file:
+                        cached.plots[name] = file.read()
+                except FileNotFoundError:
+                    cached.plots[name] = None
+
+        return cached.plots[name]
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    server: ReportService
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, body: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_message(self, status: int, message: str) -> None:
+        self.send(json.dumps({"error": message}).encode(), "application/json", status)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            start_date, end_date = query["start"], query["end"]
+            parse_date(start_date)
+            parse_date(end_date)
+        except (KeyError, ValueError):
+            self.send_error_message(400, "start and end must be given as YYYY-MM-DD")
+            return
+
+        try:
+            if url.path in ("/report", "/daily"):
+                file_format = "csv" if query.get("format") == "csv" else "json"
+                body = self.server.get_body(
+                    start_date, end_date, url.path[1:], file_format
+                )
+                if file_format == "csv":
+                    self.send(body, "text/csv")
+                else:
+                    self.send(body, "application/json")
+            elif url.path.startswith("/plot/") and url.path.endswith(".png"):
+                name = url.path[len("/plot/") : -len(".png")]
+                if name not in PLOTS:
+                    self.send_error_message(404, f"Unknown plot: {name}")
+                    return
+                image = self.server.get_plot(start_date, end_date, name)
+                if image is None:
+                    self.send_error_message(404, f"Too little data for {name}")
+                else:
+                    self.send(image, "image/png")
+            else:
+                self.send_error_message(404, f"Unknown path: {url.path}")
+        except Exception as e:
+            print(f"Error creating report: {e}")
+            self.send_error_message(502, str(e))
+
+
+def serve(config: dict, host: str = "127.0.0.1", port: int = 8000) -> None:
+    """Run the report service until interrupted.
+
+    Args:
+        config (dict): Config file containing login information and such.
+        host (str, optional): Host to listen on. Defaults to "127.0.0.1".
+        port (int, optional): Port to listen on. Defaults to 8000.
+    """
+    service = ReportService(
+        config,
+        (host, port),
+        max_reports=config.get("Service_max_reports", 32),
+        report_ttl=config.get("Service_report_ttl", 600),
+    )
+    print(f"Serving reports on {service.url}")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.server_close()
+
+
+if __name__ == "__main__":
+    pass
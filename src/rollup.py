@@ -0,0 +1,135 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from src.metrics import rolling_metrics
+
+
+def sum_by_day(report: pd.DataFrame) -> pd.DataFrame:
+    """Sum a report per calendar day in a single pass.
+
+    Days without sales are included with zero sales, so the result has one
+    row for every day between the first and the last sale.
+
+    Args:
+        report (pd.DataFrame): Report as returned by clean_data.
+
+    Returns:
+        pd.DataFrame: Sales per day.
+    """
+    days = report.index.to_numpy(dtype="datetime64[D]")
+    if len(days) == 0:
+        return report.iloc[:0].copy()
+
+    first_day = days.min()
+    day_numbers = (days - first_day).astype(np.int64)
+    n_days = int(day_numbers.max()) + 1
+
+    values = report.to_numpy(dtype=float)
+    daily = np.column_stack(
+        [
+            np.bincount(day_numbers, weights=values[:, column], minlength=n_days)
+            for column in range(values.shape[1])
+        ]
+    )
+
+    return pd.DataFrame(
+        daily,
+        index=pd.DatetimeIndex(first_day + np.arange(n_days), name="Date"),
+        columns=report.columns,
+    )
+
+
+def sum_by_key(daily: pd.DataFrame, keys: np.ndarray, labels: list[str]) -> pd.DataFrame:
+    """Sum daily sales over integer period keys.
+
+    Args:
+        daily (pd.DataFrame): Sales per day.
+        keys (np.ndarray): Sorted integer key of the period each day belongs to.
+        labels (list[str]): Label of each day's period.
+
+    Returns:
+        pd.DataFrame: Sales per period, indexed by label.
+    """
+    summed = daily.groupby(keys, sort=True).sum()
+    _, first_of_period = np.unique(keys, return_index=True)
+    summed.index = pd.Index(np.asarray(labels)[first_of_period], name="Date")
+    return summed
+
+
+class Rollup:
+    """Day, ISO week, month and year aggregates of a report.
+
+    Each aggregate is computed once, on first use, from the daily sums, so
+    plots and exports can share them.
+    """
+
+    def __init__(self, report: pd.DataFrame):
+        self.report = report
+
+    @cached_property
+    def day(self) -> pd.DataFrame:
+        return sum_by_day(self.report)
+
+    @cached_property
+    def calendar(self) -> pd.DataFrame:
+        """ISO year, ISO week, year and month of every day."""
+        iso = self.day.index.isocalendar()
+        return pd.DataFrame(
+            {
+                "iso_year": iso["year"].to_numpy(dtype=np.int64),
+                "iso_week": iso["week"].to_numpy(dtype=np.int64),
+                "year": self.day.index.year.to_numpy(dtype=np.int64),
+                "month": self.day.index.month.to_numpy(dtype=np.int64),
+            }
+        )
+
+    @cached_property
+    def week(self) -> pd.DataFrame:
+        calendar = self.calendar
+        labels = [
+            f"{year}-W{week:02d}"
+            for year, week in zip(calendar["iso_year"], calendar["iso_week"])
+        ]
+        keys = (calendar["iso_year"] * 100 + calendar["iso_week"]).to_numpy()
+        return sum_by_key(self.day, keys, labels)
+
+    @cached_property
+    def month(self) -> pd.DataFrame:
+        calendar = self.calendar
+        labels = [
+            f"{year}-{month:02d}"
+            for year, month in zip(calendar["year"], calendar["month"])
+        ]
+        keys = (calendar["year"] * 100 + calendar["month"]).to_numpy()
+        return sum_by_key(self.day, keys, labels)
+
+    @cached_property
+    def year(self) -> pd.DataFrame:
+        years = self.calendar["year"].to_numpy()
+        return sum_by_key(self.day, years, years.astype(str).tolist())
+
+    @cached_property
+    def trends(self) -> pd.DataFrame:
+        """Rolling sums, means and year-over-year deltas of each day."""
+        return rolling_metrics(self.day)
+
+    def as_dict(self) -> dict[str, pd.DataFrame]:
+        """Get every aggregate, keyed by its name.
+
+        Returns:
+            dict[str, pd.DataFrame]: Daily, weekly, monthly and yearly sales,
+                and the rolling metrics.
+        """
+        return {
+            "Daily": self.day,
+            "Weekly": self.week,
+            "Monthly": self.month,
+            "Yearly": self.year,
+            "Trends": self.trends,
+        }
+
+
+if __name__ == "__main__":
+    pass
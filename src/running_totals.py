@@ -0,0 +1,159 @@
+import json
+import os
+from datetime import date
+
+import pandas as pd
+
+# Label of the period a day belongs to, for each to-date aggregate.
+PERIOD_FORMATS = {"week": "%G-W%V", "month": "%Y-%m", "year": "%Y"}
+
+
+def period_start(day: date, period: str) -> date:
+    """Find the first day of the period a day belongs to.
+
+    Args:
+        day (date): Any day in the period.
+        period (str): Either "week", "month" or "year".
+
+    Returns:
+        date: First day of the period.
+    """
+    if period == "week":
+        return date.fromordinal(day.toordinal() - day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+class RunningTotals:
+    """Daily totals and week-, month- and year-to-date sums kept on disk.
+
+    Daily totals are appended to one CSV file per year, and the to-date sums
+    are updated in place, so adding a day costs the same however much history
+    has been stored.
+    """
+
+    def __init__(self, folder: str = "Data/running_totals"):
+        self.folder = folder
+        self.to_date_path = f"{folder}/to_date.json"
+
+        os.makedirs(folder, exist_ok=True)
+        if os.path.exists(self.to_date_path):
+            with open(self.to_date_path) as file:
+                self.to_date = json.load(file)
+        else:
+            self.to_date = {}
+
+    def daily_path(self, year: int) -> str:
+        return f"{self.folder}/daily_{year}.csv"
+
+    def day_totals(self, day: date) -> dict[str, float]:
+        """Get the totals added for a day.
+
+        Args:
+            day (date): Day to look up.
+
+        Returns:
+            dict[str, float]: Sales of the day per column of the report, empty
+                if the day has not been added.
+        """
+        if day.isoformat() == self.to_date.get("last_day"):
+            return self.to_date["last_totals"]
+
+        path = self.daily_path(day.year)
+        if not os.path.exists(path):
+            return {}
+        days = pd.read_csv(path, index_col="Date")
+        if day.isoformat() not in days.index:
+            return {}
+        return days.loc[[day.isoformat()]].iloc[-1].to_dict()
+
+    def add_day(self, day: date, totals: dict[str, float]) -> list[str]:
+        """Add the totals of a day and update the to-date sums.
+
+        Adding a day again replaces its totals. A day before the latest one
+        only changes the sums of the periods it shares with the latest day.
+
+        Args:
+            day (date): Day the totals belong to.
+            totals (dict[str, float]): Sales of the day per column of the report.
+
+        Returns:
+            list[str]: Periods whose sums changed.
+        """
+        last_day = self.to_date.get("last_day")
+        is_latest = last_day is None or day.isoformat() >= last_day
+        previous = self.day_totals(day) if last_day is not None else {}
+
+        changed = []
+        for period, period_format in PERIOD_FORMATS.items():
+            label = day.strftime(period_format)
+            current = self.to_date.get(period, {})
+            if current.get("label") != label:
+                if not is_latest:
+                    continue
+                current = {"label": label, "totals": {}}
+                old_totals = {}
+            else:
+                old_totals = dict(current["totals"])
+                for column, value in previous.items():
+                    current["totals"][column] -= value
+
+            for column, value in totals.items():
+                current["totals"][column] = current["totals"].get(column, 0) + value
+
+            if current["totals"] != old_totals:
+                changed.append(period)
+            self.to_date[period] = current
+
+        if is_latest:
+            self.to_date["last_day"] = day.isoformat()
+            self.to_date["last_totals"] = totals
+
+        path = self.daily_path(day.year)
+        row = pd.DataFrame([totals], index=pd.Index([day.isoformat()], name="Date"))
+        row.to_csv(path, mode="a", header=not os.path.exists(path))
+
+        with open(self.to_date_path, "w") as file:
+            json.dump(self.to_date, file, indent=4)
+
+        return changed
+
+    def load_days(self, start: date) -> pd.DataFrame:
+        """Read the daily totals from a day up to the latest day.
+
+        Only the files of the years in the range are read.
+
+        Args:
+            start (date): First day to be read.
+
+        Returns:
+            pd.DataFrame: Daily totals.
+        """
+        last_day = date.fromisoformat(self.to_date["last_day"])
+        days = [
+            pd.read_csv(self.daily_path(year), index_col="Date", parse_dates=True)
+            for year in range(start.year, last_day.year + 1)
+            if os.path.exists(self.daily_path(year))
+        ]
+        days = pd.concat(days)
+        days = days[~days.index.duplicated(keep="last")].sort_index()
+
+        return days[days.index >= pd.Timestamp(start)]
+
+    def to_date_frame(self) -> pd.DataFrame:
+        """Get the to-date sums as a dataframe.
+
+        Returns:
+            pd.DataFrame: Week-, month- and year-to-date sums.
+        """
+        return pd.DataFrame(
+            {
+                self.to_date[period]["label"]: self.to_date[period]["totals"]
+                for period in PERIOD_FORMATS
+            }
+        ).T.rename_axis("Period")
+
+
+if __name__ == "__main__":
+    pass
@@ -1,62 +1,572 @@
-from datetime import datetime
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
+from lxml import etree
+from requests import Session
+from requests.adapters import HTTPAdapter
 from zeep import Client
+from zeep.cache import SqliteCache
+from zeep.exceptions import Fault
+from zeep.transports import Transport
+import numpy as np
 import pandas as pd
 
+from src.constants import PAYMENT_METHODS
+from src.order_table import make_order_table
+from src.profiling import stage
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+WSDL_URL = "https://api.hostedshop.io/service.wsdl"
+ORDER_FIELDS = "Id, Status, Payment, Vat, Total, DateDelivered"
+
+# Parts of the fault messages of calls made without a valid session.
+SESSION_FAULTS = ("not connected", "not logged in", "session", "login")
+
+# Handlers kept alive between calls, keyed by WSDL and user.
+_handlers = {}
+_handlers_lock = threading.Lock()
+
+
+def is_session_fault(message: str | None) -> bool:
+    """Check if a fault message says the session expired.
+
+    Args:
+        message (str | None): Fault message.
+
+    Returns:
+        bool: Whether logging in again may fix the call.
+    """
+    return message is not None and any(
+        part in message.lower() for part in SESSION_FAULTS
+    )
+
+
+def fault_message(content: bytes) -> str | None:
+    """Find the fault message of a raw SOAP response.
+
+    Args:
+        content (bytes): Body of the response.
+
+    Returns:
+        str | None: Fault message, None if the response holds no fault.
+    """
+    try:
+        return etree.fromstring(content).findtext(".//faultstring")
+    except etree.XMLSyntaxError:
+        return None
+
+
+def parse_date(date: str) -> datetime:
+    """Parse a date given either with or without a time of day.
+
+    Args:
+        date (str): Date as "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS".
+
+    Returns:
+        datetime: Parsed date.
+    """
+    try:
+        return datetime.strptime(date, DATE_FORMAT)
+    except ValueError:
+        return datetime.strptime(date, "%Y-%m-%d")
+
+
+def next_slice_start(date: datetime, slice_size: str) -> datetime:
+    """Find the start of the slice following the one containing date.
+
+    Args:
+        date (datetime): Any date within the current slice.
+        slice_size (str): Either "day", "week" or "month".
+
+    Returns:
+        datetime: Midnight at the start of the next slice.
+    """
+    midnight = datetime(date.year, date.month, date.day)
+    if slice_size == "day":
+        return midnight + timedelta(days=1)
+    if slice_size == "week":
+        return midnight + timedelta(days=7 - midnight.weekday())
+    if slice_size == "month":
+        if date.month == 12:
+            return datetime(date.year + 1, 1, 1)
+        return datetime(date.year, date.month + 1, 1)
+    raise ValueError(f"Unknown slice size: {slice_size}")
+
+
+def split_date_range(
+    start_date: str,
+    end_date: str,
+    slice_size: str,
+) -> list[tuple[str, str]]:
+    """Split a date range into consecutive, non overlapping windows.
+
+    Args:
+        start_date (str): Date of earliest orders.
+        end_date (str): Date of latest orders.
+        slice_size (str): Either "day", "week" or "month".
+
+    Returns:
+        list[tuple[str, str]]: Start and end of every window.
+    """
+    start = parse_date(start_date)
+    end = parse_date(end_date)
+    if len(end_date) == len("YYYY-MM-DD"):
+        end = end + timedelta(days=1, seconds=-1)
+
+    windows = []
+    while start <= end:
+        window_end = min(
+            next_slice_start(start, slice_size) - timedelta(seconds=1), end
+        )
+        windows.append((start.strftime(DATE_FORMAT), window_end.strftime(DATE_FORMAT)))
+        start = window_end + timedelta(seconds=1)
+
+    return windows
+
+
+def columns_to_dataframe(
+    dates: list[str],
+    totals: list[float],
+    vats: list[float],
+    payments: list[str],
+) -> pd.DataFrame:
+    """Build the order table from one list per field.
+
+    Args:
+        dates (list[str]): Delivery date of every order.
+        totals (list[float]): Total excluding vat of every order.
+        vats (list[float]): Vat rate of every order.
+        payments (list[str]): Payment title of every order.
+
+    Returns:
+        pd.DataFrame: Order table, see make_order_table.
+    """
+    totals = np.asarray(totals, dtype=float)
+    vats = np.asarray(vats, dtype=float)
+
+    return make_order_table(
+        pd.to_datetime(dates, format=DATE_FORMAT), totals * (1 + vats), payments
+    )
+
+
+def parse_orders_xml(content: bytes) -> pd.DataFrame:
+    """Parse an Order_GetByDate response straight into columns.
+
+    Each order element is freed as soon as its fields have been read, so the
+    orders are never materialized as zeep objects.
+
+    Args:
+        content (bytes): Raw SOAP response.
+
+    Returns:
+        pd.DataFrame: Order table, see make_order_table.
+    """
+    dates, totals, vats, payments = [], [], [], []
+    for _, element in etree.iterparse(io.BytesIO(content), events=("end",)):
+        fields = {etree.QName(child).localname: child for child in element}
+        if "DateDelivered" not in fields:
+            continue
+
+        dates.append(fields["DateDelivered"].text)
+        totals.append(fields["Total"].text)
+        vats.append(fields["Vat"].text)
+        payments.append(
+            next(
+                (
+                    child.text
+                    for child in fields.get("Payment", [])
+                    if etree.QName(child).localname == "Title"
+                ),
+                None,
+            )
+        )
+
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+    return columns_to_dataframe(dates, totals, vats, payments)
+
+
+def make_transport(config: dict) -> Transport:
+    """Create a transport with a pooled HTTP session and a cached WSDL.
+
+    Args:
+        config (dict): Config file containing login information and such.
+
+    Returns:
+        Transport: Transport for the zeep client.
+    """
+    session = Session()
+    adapter = HTTPAdapter(pool_maxsize=config.get("Fetch_workers", 4))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    cache_path = config.get("Wsdl_cache_path", "Data/wsdl_cache.sqlite")
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    cache = SqliteCache(path=cache_path, timeout=config.get("Wsdl_cache_ttl", 86400))
+
+    return Transport(session=session, cache=cache)
+
+
+def get_handler(config: dict) -> "DanDomainSOAPHandler":
+    """Get a logged in handler, reusing the one from an earlier call.
+
+    Args:
+        config (dict): Config file containing login information and such.
+
+    Returns:
+        DanDomainSOAPHandler: Handler for the user in the config.
+    """
+    key = (config.get("Wsdl_url", WSDL_URL), config["Username"])
+    with _handlers_lock:
+        if key not in _handlers:
+            _handlers[key] = DanDomainSOAPHandler(config)
+
+        return _handlers[key]
+
 
 class DanDomainSOAPHandler:
     def __init__(self, config):
-        self.wsdl_url = "https://api.hostedshop.io/service.wsdl"
+        self.wsdl_url = config.get("Wsdl_url", WSDL_URL)
         self.username = config["Username"]
         self.password = config["Password"]
+        self.session_ttl = config.get("Session_ttl", 3600)
+        self.order_fields = config.get("Order_fields", ORDER_FIELDS)
 
-        self.client = Client(wsdl=self.wsdl_url)
-        self.client.service.Solution_Connect(
-            Username=self.username,
-            Password=self.password,
-        )
+        with stage("load_wsdl"):
+            self.client = Client(wsdl=self.wsdl_url, transport=make_transport(config))
+        self.lock = threading.Lock()
+        self.connect()
+
+    def connect(self) -> None:
+        """Log in and choose the order fields, starting a new session."""
+        with stage("connect"):
+            self.client.service.Solution_Connect(
+                Username=self.username,
+                Password=self.password,
+            )
 
-        self.specify_format()
+            self.specify_format()
+        self.connected_at = time.monotonic()
 
     def specify_format(self):
-        self.client.service.Order_SetFields(
-            "Id, Status, Payment, Vat, Total, DateDelivered"
+        self.client.service.Order_SetFields(self.order_fields)
+
+    def call(self, operation: str, *args, **kwargs):
+        """Call a service operation, logging in again if the session expired.
+
+        Args:
+            operation (str): Name of the operation.
+            *args: Passed on to the operation.
+            **kwargs: Passed on to the operation.
+
+        Returns:
+            Result of the operation.
+        """
+        connected_at = self.connected_at
+        if time.monotonic() - connected_at > self.session_ttl:
+            self.reconnect(connected_at)
+
+        try:
+            return getattr(self.client.service, operation)(*args, **kwargs)
+        except Fault as fault:
+            if not is_session_fault(fault.message):
+                raise
+            self.reconnect(connected_at)
+            return getattr(self.client.service, operation)(*args, **kwargs)
+
+    def call_raw(self, operation: str, **kwargs):
+        """Call a service operation without letting zeep parse the response.
+
+        Faults are not raised for raw responses, so a failed call whose fault
+        says the session expired is retried once after logging in again.
+
+        Args:
+            operation (str): Name of the operation.
+            **kwargs: Passed on to the operation.
+
+        Returns:
+            requests.Response: Raw response.
+        """
+        connected_at = self.connected_at
+        with self.client.settings(raw_response=True):
+            response = self.call(operation, **kwargs)
+            if response.status_code != 200 and is_session_fault(
+                fault_message(response.content)
+            ):
+                self.reconnect(connected_at)
+                response = self.call(operation, **kwargs)
+
+        response.raise_for_status()
+        return response
+
+    def reconnect(self, connected_at: float) -> None:
+        """Log in again, unless another thread already did.
+
+        Args:
+            connected_at (float): Time of the login the caller saw as expired.
+        """
+        with self.lock:
+            if self.connected_at == connected_at:
+                self.connect()
+
+    @staticmethod
+    def orders_to_dataframe(responce: list[dict]) -> pd.DataFrame:
+        """Flatten the orders into a single dataframe.
+
+        Args:
+            responce (list[dict]): Orders from Order_GetByDate.
+
+        Returns:
+            pd.DataFrame: Order table, see make_order_table.
+        """
+        with stage("reformat_soap_response") as record:
+            record["rows"] = len(responce)
+            return columns_to_dataframe(
+                [entry["DateDelivered"] for entry in responce],
+                [entry["Total"] for entry in responce],
+                [entry["Vat"] for entry in responce],
+                [entry["Payment"]["Title"] for entry in responce],
+            )
+
+    @staticmethod
+    def split_by_payment(response_df: pd.DataFrame) -> list[pd.DataFrame]:
+        """Split the orders by payment method.
+
+        Args:
+            response_df (pd.DataFrame): Flattened orders.
+
+        Returns:
+            list[pd.DataFrame]: Card terminal, credit card and cash orders.
+        """
+        groups = dict(
+            list(response_df.groupby("PaymentMethod", observed=True, sort=False))
+        )
+
+        return [groups.get(method, response_df.iloc[:0]) for method in PAYMENT_METHODS]
+
+    @staticmethod
+    def reformat_soap_response(responce: list[dict]) -> list[pd.DataFrame]:
+        return DanDomainSOAPHandler.split_by_payment(
+            DanDomainSOAPHandler.orders_to_dataframe(responce)
         )
 
-    def reformat_soap_response(self, responce: list[dict]) -> list[pd.DataFrame]:
-        flat_data = [
-            {
-                "Date": datetime.strptime(entry["DateDelivered"], "%Y-%m-%d %H:%M:%S"),
-                "Incl. vat": entry["Total"] * (1 + entry["Vat"]),
-                "PaymentMethod": entry["Payment"]["Title"],
-            }
-            for entry in responce
-        ]
-        response_df = pd.DataFrame(flat_data)
-
-        credit_card_df = response_df[
-            response_df["PaymentMethod"] == "Kreditkortbetaling"
-        ]
-        card_terminal_df = response_df[response_df["PaymentMethod"] == "Kortterminal"]
-        cash_df = response_df[response_df["PaymentMethod"] == "Kontant betaling"]
-
-        return [card_terminal_df, credit_card_df, cash_df]
-
-    def make_soap_request(self, start_date: str, end_date: str) -> list[pd.DataFrame]:
+    def fetch_orders(
+        self,
+        start_date: str,
+        end_date: str,
+        retries: int = 0,
+        backoff: float = 1.0,
+    ) -> list[dict]:
+        """Fetch the raw orders of a single window, retrying on failure.
+
+        Args:
+            start_date (str): Date of earliest orders.
+            end_date (str): Date of latest orders.
+            retries (int, optional): Number of retries after a failed call. Defaults to 0.
+            backoff (float, optional): Seconds to wait before the first retry,
+                doubled for every following retry. Defaults to 1.0.
+
+        Returns:
+            list[dict]: Orders.
+        """
+        for attempt in range(retries + 1):
+            try:
+                with stage("Order_GetByDate") as record:
+                    result = list(
+                        self.call(
+                            "Order_GetByDate",
+                            Start=start_date,
+                            End=end_date,
+                            Status="8",
+                        )
+                        or []
+                    )
+                    record["rows"] = len(result)
+                return result
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                print(
+                    f"Retrying orders from {start_date} to {end_date} "
+                    f"after error: {e}"
+                )
+                time.sleep(backoff * 2**attempt)
+
+    def get_orders(
+        self,
+        start_date: str,
+        end_date: str,
+        slice_size: str | None = None,
+        max_workers: int = 4,
+        retries: int = 3,
+        backoff: float = 1.0,
+    ) -> list[dict]:
+        """Fetch the raw orders of a range.
+
+        If slice_size is given the range is split into windows of that size,
+        which are fetched concurrently and merged.
+
+        Args:
+            start_date (str): Date of earliest orders.
+            end_date (str): Date of latest orders.
+            slice_size (str | None, optional): Either "day", "week" or "month".
+                Defaults to None, fetching the whole range in one call.
+            max_workers (int, optional): Number of concurrent calls. Defaults to 4.
+            retries (int, optional): Retries per call. Defaults to 3.
+            backoff (float, optional): Initial retry delay in seconds. Defaults to 1.0.
+
+        Returns:
+            list[dict]: Orders.
+        """
+        if slice_size is None:
+            return self.fetch_orders(
+                start_date, end_date, retries=retries, backoff=backoff
+            )
+
+        windows = split_date_range(start_date, end_date, slice_size)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda window: self.fetch_orders(
+                    *window, retries=retries, backoff=backoff
+                ),
+                windows,
+            )
+            return [order for orders in results for order in orders]
+
+    def fetch_page(
+        self,
+        start_date: str,
+        end_date: str,
+        retries: int = 0,
+        backoff: float = 1.0,
+    ) -> pd.DataFrame:
+        """Fetch the orders of a single window as columns.
+
+        Args:
+            start_date (str): Date of earliest orders.
+            end_date (str): Date of latest orders.
+            retries (int, optional): Number of retries after a failed call. Defaults to 0.
+            backoff (float, optional): Seconds to wait before the first retry,
+                doubled for every following retry. Defaults to 1.0.
+
+        Returns:
+            pd.DataFrame: Order table, see make_order_table.
+        """
+        for attempt in range(retries + 1):
+            try:
+                with stage("Order_GetByDate"):
+                    response = self.call_raw(
+                        "Order_GetByDate",
+                        Start=start_date,
+                        End=end_date,
+                        Status="8",
+                    )
+                with stage("parse_orders_xml") as record:
+                    orders = parse_orders_xml(response.content)
+                    record["rows"] = len(orders)
+                return orders
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                print(
+                    f"Retrying orders from {start_date} to {end_date} "
+                    f"after error: {e}"
+                )
+                time.sleep(backoff * 2**attempt)
+
+    def fetch_orders_paged(
+        self,
+        start_date: str,
+        end_date: str,
+        page_size: int = 5000,
+        retries: int = 3,
+        backoff: float = 1.0,
+    ) -> pd.DataFrame:
+        """Fetch the orders of a range one window at a time.
+
+        Windows start at a day. A window returning more than page_size orders
+        is halved and fetched again, down to a window of an hour, and windows
+        are doubled after small pages, so only one page of at most page_size
+        orders, or one hour, is ever held as raw XML.
+
+        Args:
+            start_date (str): Date of earliest orders.
+            end_date (str): Date of latest orders.
+            page_size (int, optional): Targeted orders per page. Defaults to 5000.
+            retries (int, optional): Retries per page. Defaults to 3.
+            backoff (float, optional): Initial retry delay in seconds. Defaults to 1.0.
+
+        Returns:
+            pd.DataFrame: Order table, see make_order_table.
+        """
+        start = parse_date(start_date)
+        end = parse_date(end_date)
+        if len(end_date) == len("YYYY-MM-DD"):
+            end = end + timedelta(days=1, seconds=-1)
+
+        window = timedelta(days=1)
+        pages = [columns_to_dataframe([], [], [], [])]
+        while start <= end:
+            window_end = min(start + window - timedelta(seconds=1), end)
+            page = self.fetch_page(
+                start.strftime(DATE_FORMAT),
+                window_end.strftime(DATE_FORMAT),
+                retries,
+                backoff,
+            )
+            if len(page) > page_size and window > timedelta(hours=1):
+                window = max(window / 2, timedelta(hours=1))
+                continue
+
+            pages.append(page)
+            if len(page) < page_size / 2 and window < timedelta(days=31):
+                window = window * 2
+            start = window_end + timedelta(seconds=1)
+
+        return pd.concat(pages, ignore_index=True)
+
+    def make_soap_request(
+        self,
+        start_date: str,
+        end_date: str,
+        slice_size: str | None = None,
+        max_workers: int = 4,
+        retries: int = 3,
+        backoff: float = 1.0,
+        page_size: int | None = None,
+    ) -> list[pd.DataFrame]:
         """Preform SOAP request.
 
         Args:
             start_date (str): Date of earliest orders.
             end_date (str): Date of latest orders.
+            slice_size (str | None, optional): Either "day", "week" or "month".
+                Defaults to None, fetching the whole range in one call.
+            max_workers (int, optional): Number of concurrent calls. Defaults to 4.
+            retries (int, optional): Retries per call. Defaults to 3.
+            backoff (float, optional): Initial retry delay in seconds. Defaults to 1.0.
+            page_size (int | None, optional): If given, fetch the range in pages
+                of at most this many orders with fetch_orders_paged, ignoring
+                slice_size. Defaults to None.
 
         Returns:
             pd.DataFrame: Orders.
         """
         try:
-            result = self.client.service.Order_GetByDate(
-                Start=start_date,
-                End=end_date,
-                Status="8",
+            if page_size is not None:
+                return self.split_by_payment(
+                    self.fetch_orders_paged(
+                        start_date, end_date, page_size, retries, backoff
+                    )
+                )
+            result = self.get_orders(
+                start_date, end_date, slice_size, max_workers, retries, backoff
             )
             result_dfs = self.reformat_soap_response(result)
             return result_dfs
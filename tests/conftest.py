@@ -0,0 +1,30 @@
+import pytest
+
+from benchmarks.stub_service import StubService
+from src import data_handler, soap
+from src.daily_sums import DailySums
+
+
+@pytest.fixture
+def stub(request):
+    """Stub service, with the StubService arguments given by indirect params."""
+    kwargs = {"orders_per_day": 24, **getattr(request, "param", {})}
+    with StubService(**kwargs) as service:
+        yield service
+
+
+@pytest.fixture
+def config(stub, tmp_path, monkeypatch):
+    """Config of a shop on the stub, with handlers and day sums not shared."""
+    soap._handlers.clear()
+    monkeypatch.setattr(data_handler, "_daily_sums", DailySums())
+    yield {
+        "Username": "user",
+        "Password": "password",
+        "Wsdl_url": stub.wsdl_url,
+        "Wsdl_cache_path": str(tmp_path / "wsdl_cache.sqlite"),
+        "Cache_path": str(tmp_path / "orders.sqlite"),
+        "Start_date": "2023-01-01 00:00:00",
+        "End_date": "2023-01-10 23:59:59",
+    }
+    soap._handlers.clear()
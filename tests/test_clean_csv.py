@@ -0,0 +1,129 @@
+import csv
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import write_csv_export
+from src.clean_csv import (
+    parse_order,
+    read_csv_orders,
+    repair_row,
+    segment_data,
+    stream_sum_up_csv,
+    sum_export_by_day,
+    sum_up_csv,
+)
+from src.constants import PAYMENT_METHODS
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / "export.csv"
+    write_csv_export(path, 2000, n_days=30, skew=0.2)
+    return path
+
+
+# Columns of an order row following the item name.
+ORDER = ["01-01-2023", "10:00", "1001", "1", "8.00", "2.00", "10.00", "DKK", "Kasse 1"]
+
+
+def test_repair_row_merges_split_name():
+    assert repair_row(["Lang", " vare", *ORDER]) == ["Lang vare", *ORDER]
+
+
+def test_repair_row_keeps_whole_row():
+    assert repair_row(["Vare", *ORDER]) == ["Vare", *ORDER]
+
+
+def test_stream_sum_up_csv_matches_sum_up_csv(export):
+    data = pd.read_csv(export, sep=";", encoding="iso 8859-10", dtype=object)
+
+    expected = sum_up_csv(data)
+    sums = stream_sum_up_csv(export)
+
+    assert len(sums) == len(expected)
+    for day_sums, expected_sums in zip(sums, expected):
+        pd.testing.assert_series_equal(
+            day_sums, expected_sums, check_names=False, check_index_type=False
+        )
+
+
+def test_read_csv_orders_labels_payment_methods(export):
+    orders = read_csv_orders(export)
+
+    assert len(orders) == 2000
+    assert list(orders["PaymentMethod"].cat.categories) == PAYMENT_METHODS
+
+    sums = stream_sum_up_csv(export)
+    totals = orders.groupby("PaymentMethod", observed=False)["Incl. vat øre"].sum()
+    np.testing.assert_allclose(
+        totals.to_numpy() / 100, [day_sums.sum() for day_sums in sums]
+    )
+
+
+def test_sum_export_by_day_names_payment_methods(export):
+    sums, n_orders = sum_export_by_day(export)
+
+    orders = read_csv_orders(export)
+    totals = orders.groupby("PaymentMethod", observed=False)["Incl. vat øre"].sum()
+    assert n_orders == len(orders)
+    assert sums["Card terminal"].sum() == pytest.approx(totals["Kortterminal"] / 100)
+    assert sums["Credit card payment"].sum() == pytest.approx(
+        totals["Kreditkortbetaling"] / 100
+    )
+    assert sums["Cash payment"].sum() == pytest.approx(
+        totals["Kontant betaling"] / 100
+    )
+
+
+def test_parse_order_skips_rows_without_date():
+    assert parse_order(["Subtotal", "", "", "", "", "", "", "12.00", "DKK", ""]) is None
+
+
+def test_malformed_amount_raises(export, tmp_path):
+    with open(export, encoding="iso 8859-10", newline="") as file:
+        rows = list(csv.reader(file, delimiter=";"))
+    repaired = [repair_row(row) for row in rows]
+    position = next(i for i, row in enumerate(repaired) if row[1] and row[8] == "DKK")
+    rows[position] = [*repaired[position][:7], "12,5x", *repaired[position][8:]]
+    malformed = tmp_path / "malformed.csv"
+    with open(malformed, "w", encoding="iso 8859-10", newline="") as file:
+        csv.writer(file, delimiter=";").writerows(rows)
+
+    with pytest.raises(ValueError):
+        stream_sum_up_csv(malformed)
+    with pytest.raises(ValueError):
+        read_csv_orders(malformed)
+
+
+def make_sections(categories):
+    rows = []
+    for section, category in enumerate([*categories, None]):
+        rows += [[f"Vare {section}", str(section + 1)]] * 2
+        if category is None:
+            rows.append(["Total", ""])
+        else:
+            rows += [["Subtotal", ""], ["", ""], [category, ""]]
+    return pd.DataFrame(rows, columns=["Item", "Incl. vat"])
+
+
+def test_segment_data_labels_sections():
+    segmented = segment_data(make_sections(["A", "B"]), ["A", "B"])
+
+    assert segmented["PaymentMethod"].tolist() == ["A", "A", "B", "B", "final", "final"]
+    assert segmented["Incl. vat"].tolist() == [1, 1, 2, 2, 3, 3]
+
+
+def test_segment_data_keeps_orders_after_header_in_first_row():
+    dataframe = make_sections(["A", "B"])[4:].reset_index(drop=True)
+
+    segmented = segment_data(dataframe, ["A", "B"])
+
+    assert segmented["PaymentMethod"].tolist() == ["B", "B", "final", "final"]
+    assert segmented["Incl. vat"].tolist() == [2, 2, 3, 3]
+
+
+def test_segment_data_raises_on_missing_header():
+    with pytest.raises(IndexError):
+        segment_data(make_sections(["A"]), ["A", "B"])
@@ -0,0 +1,118 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import data_handler
+from src.constants import PAYMENT_METHODS
+from src.daily_sums import DailySums, sum_orders_by_day
+from src.data_handler import get_and_clean_data, get_daily_report
+from src.order_table import make_order_table
+from src.rollup import Rollup
+
+
+@pytest.fixture
+def loaded_ranges(monkeypatch):
+    load_data = data_handler.load_data
+    ranges = []
+
+    def record_range(config):
+        ranges.append((config["Start_date"], config["End_date"]))
+        return load_data(config)
+
+    monkeypatch.setattr(data_handler, "load_data", record_range)
+    return ranges
+
+
+def sums(value: int, n_days: int = 1) -> np.ndarray:
+    return np.full((n_days, 3), value, dtype=np.int64)
+
+
+def test_sum_orders_by_day():
+    orders = make_order_table(
+        ["2023-01-01 10:00:00", "2023-01-01 11:00:00", "2023-01-03 23:59:59"],
+        [1.0, 2.5, 4.0],
+        ["Kortterminal", "Kontant betaling", "Kortterminal"],
+    )
+
+    summed = sum_orders_by_day(
+        [orders[orders["PaymentMethod"] == method] for method in PAYMENT_METHODS],
+        date(2023, 1, 1),
+        4,
+    )
+
+    np.testing.assert_array_equal(
+        summed, [[100, 0, 250], [0, 0, 0], [400, 0, 0], [0, 0, 0]]
+    )
+
+
+def test_lookup_finds_stored_days_of_the_shop():
+    daily_sums = DailySums()
+    daily_sums.store("a", date(2023, 1, 1), sums(1, 3))
+    daily_sums.store("b", date(2023, 1, 2), sums(2))
+
+    found = daily_sums.lookup("a", [date(2023, 1, day) for day in range(1, 6)])
+
+    assert sorted(found) == [date(2023, 1, day) for day in range(1, 4)]
+    assert daily_sums.lookup("b", [date(2023, 1, 1)]) == {}
+
+
+def test_old_entries_expire():
+    daily_sums = DailySums(max_age=-1)
+    daily_sums.store("a", date(2023, 1, 1), sums(1))
+
+    assert daily_sums.lookup("a", [date(2023, 1, 1)]) == {}
+    assert not daily_sums.days
+
+
+def test_least_recently_used_days_are_evicted():
+    daily_sums = DailySums(max_days=3)
+    daily_sums.store("a", date(2023, 1, 1), sums(1, 3))
+    daily_sums.lookup("a", [date(2023, 1, 1)])
+
+    daily_sums.store("a", date(2023, 1, 4), sums(4))
+
+    found = daily_sums.lookup("a", [date(2023, 1, day) for day in range(1, 5)])
+    assert sorted(found) == [date(2023, 1, 1), date(2023, 1, 3), date(2023, 1, 4)]
+
+
+def test_overlapping_ranges_only_load_new_days(config, loaded_ranges):
+    get_daily_report(dict(config, Start_date="2023-01-03", End_date="2023-01-05"))
+
+    report = get_daily_report(config)
+
+    assert loaded_ranges == [
+        ("2023-01-03 00:00:00", "2023-01-05 23:59:59"),
+        ("2023-01-01 00:00:00", "2023-01-02 23:59:59"),
+        ("2023-01-06 00:00:00", "2023-01-10 23:59:59"),
+    ]
+    expected = Rollup(get_and_clean_data(config)).day
+    pd.testing.assert_frame_equal(
+        report, expected, check_freq=False, check_index_type=False
+    )
+
+
+def test_expired_days_are_loaded_again(config, loaded_ranges, monkeypatch):
+    monkeypatch.setattr(data_handler, "_daily_sums", DailySums(max_age=-1))
+
+    first = get_daily_report(config)
+    again = get_daily_report(config)
+
+    assert len(loaded_ranges) == 2
+    pd.testing.assert_frame_equal(first, again)
+
+
+def test_days_without_orders_are_left_out(config, monkeypatch):
+    day = date(2023, 1, 5)
+    monkeypatch.setattr(
+        data_handler._daily_sums,
+        "lookup",
+        lambda shop, days: {day: sums(0)[0]} if day in days else {},
+    )
+
+    report = get_daily_report(config)
+
+    assert pd.Timestamp(day) not in report.index
+    assert len(report) == 9
+    assert report.index[0] == pd.Timestamp(day - timedelta(days=4))
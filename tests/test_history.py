@@ -0,0 +1,74 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_report
+from src.data_handler import REPORT_COLUMNS
+from src.history import HISTORY_EPOCH, DailyHistory, rebuild_from_exports
+
+
+@pytest.fixture
+def history(tmp_path):
+    return DailyHistory(str(tmp_path / "history.bin"))
+
+
+def test_written_days_are_read_back(history):
+    sales = np.arange(30, dtype=np.int64).reshape(10, 3) * 100
+    history.write(date(2023, 1, 1), sales)
+
+    report = history.report(date(2023, 1, 1), date(2023, 1, 10))
+
+    assert list(report.columns) == [*REPORT_COLUMNS, "Total"]
+    assert report.index[0] == pd.Timestamp("2023-01-01")
+    np.testing.assert_array_equal(report[REPORT_COLUMNS].to_numpy(), sales / 100)
+    np.testing.assert_array_equal(report["Total"], sales.sum(axis=1) / 100)
+
+
+def test_unrecorded_days_are_left_out(history):
+    history.write(date(2023, 1, 1), np.ones((2, 3), dtype=np.int64))
+    history.write(date(2023, 1, 5), np.ones((2, 3), dtype=np.int64))
+
+    report = history.report(date(2022, 12, 1), date(2023, 2, 1))
+
+    assert list(report.index.date) == [
+        date(2023, 1, 1),
+        date(2023, 1, 2),
+        date(2023, 1, 5),
+        date(2023, 1, 6),
+    ]
+    assert history.recorded_range() == (date(2023, 1, 1), date(2023, 1, 6))
+
+
+def test_days_are_overwritten_in_place(history):
+    history.write(date(2023, 1, 1), np.ones((5, 3), dtype=np.int64))
+    history.write(date(2023, 1, 2), np.full((1, 3), 7, dtype=np.int64))
+
+    assert len(history) == (date(2023, 1, 5) - HISTORY_EPOCH).days + 1
+    report = history.report(date(2023, 1, 1), date(2023, 1, 5))
+    assert report["Total"].tolist() == pytest.approx([0.03, 0.21, 0.03, 0.03, 0.03])
+
+
+def test_days_before_the_epoch_raise(history):
+    with pytest.raises(ValueError):
+        history.write(date(1999, 12, 31), np.ones((1, 3), dtype=np.int64))
+
+
+def test_empty_history(history):
+    assert history.recorded_range() is None
+    assert history.report(date(2023, 1, 1), date(2023, 1, 31)).empty
+
+
+def test_rebuild_from_exports(history):
+    report = make_report(60)
+    sums = report.drop(report.index[20:30])
+
+    rebuild_from_exports(sums, history)
+
+    pd.testing.assert_frame_equal(
+        history.report(date(2023, 1, 1), date(2023, 3, 1)),
+        sums,
+        check_freq=False,
+        check_index_type=False,
+    )
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_report
+from src.metrics import WINDOWS, YEAR_DAYS, RollingMetrics, rolling_metrics
+
+
+@pytest.fixture
+def daily():
+    return make_report(800)
+
+
+def test_rolling_metrics_match_pandas(daily):
+    metrics = rolling_metrics(daily)
+
+    for window in WINDOWS:
+        sums = daily["Total"].rolling(window).sum()
+        last_year = sums.shift(YEAR_DAYS)
+        np.testing.assert_allclose(metrics[f"{window} day sum"], sums, atol=0.01)
+        np.testing.assert_allclose(
+            metrics[f"{window} day mean"], sums / window, atol=0.01
+        )
+        np.testing.assert_allclose(
+            metrics[f"{window} day YoY"], sums - last_year, atol=0.01
+        )
+
+
+def test_state_is_saved_and_loaded(daily, tmp_path):
+    path = tmp_path / "metrics.json"
+    metrics = RollingMetrics(path)
+    rolling_metrics(daily[:500], metrics)
+    metrics.save()
+
+    continued = rolling_metrics(daily[500:], RollingMetrics(path))
+
+    pd.testing.assert_frame_equal(continued, rolling_metrics(daily)[500:])
+
+
+def test_skipped_days_are_unknown_until_added(daily):
+    metrics = RollingMetrics()
+    days = [day.date() for day in daily.index]
+    totals = daily["Total"].to_numpy()
+    for day, total in zip(days[:400], totals[:400]):
+        metrics.add_day(day, total)
+
+    row = metrics.add_day(days[402], totals[402])
+    assert np.isnan(row["7 day sum"])
+    assert np.isnan(row["28 day YoY"])
+
+    metrics.add_day(days[400], totals[400])
+    row = metrics.add_day(days[401], totals[401])
+
+    expected = rolling_metrics(daily[:403]).iloc[-1]
+    assert row == pytest.approx(expected.to_dict(), nan_ok=True)
+
+
+def test_adding_a_day_again_replaces_it(daily):
+    metrics = RollingMetrics()
+    rolling_metrics(daily[:400], metrics)
+
+    metrics.add_day(daily.index[395].date(), 0)
+
+    changed = daily[:400].copy()
+    changed.iloc[395, changed.columns.get_loc("Total")] = 0
+    expected = rolling_metrics(changed).iloc[-1]
+    assert metrics.metrics() == pytest.approx(expected.to_dict(), nan_ok=True)
+
+
+def test_days_older_than_the_ring_are_skipped(daily):
+    metrics = RollingMetrics()
+    rolling_metrics(daily[:400], metrics)
+    before = metrics.metrics()
+
+    too_old = daily.index[399].date() - timedelta(days=metrics.size)
+    assert metrics.add_day(too_old, 1000) is None
+    assert metrics.metrics() == pytest.approx(before, nan_ok=True)
+    assert metrics.last_day == daily.index[399].date()
@@ -0,0 +1,113 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from src.data_handler import load_data
+from src.order_cache import OrderCache, days_in_range, group_consecutive_days
+from src.order_table import make_order_table
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return OrderCache(str(tmp_path / "orders.sqlite"), refetch_days=7, shop="a")
+
+
+def make_orders(days: list[date]) -> pd.DataFrame:
+    return make_order_table(
+        [f"{day.isoformat()} {hour:02d}:00:00" for day in days for hour in (9, 15)],
+        [10.0 * (i + 1) for i in range(2 * len(days))],
+        ["Kortterminal", "Kontant betaling"] * len(days),
+    )
+
+
+def test_group_consecutive_days():
+    days = [date(2023, 1, 1), date(2023, 1, 2), date(2023, 1, 5)]
+
+    assert group_consecutive_days(days) == [
+        ("2023-01-01 00:00:00", "2023-01-02 23:59:59"),
+        ("2023-01-05 00:00:00", "2023-01-05 23:59:59"),
+    ]
+
+
+def test_every_day_is_stale_before_fetching(cache):
+    assert cache.stale_days("2023-01-01", "2023-01-05") == days_in_range(
+        "2023-01-01", "2023-01-05"
+    )
+
+
+def test_settled_days_are_not_fetched_again(cache):
+    days = days_in_range("2023-01-01", "2023-01-05")
+    cache.store(make_orders(days), days)
+
+    assert cache.stale_days("2022-12-30", "2023-01-06") == [
+        date(2022, 12, 30),
+        date(2022, 12, 31),
+        date(2023, 1, 6),
+    ]
+
+
+def test_recent_days_are_fetched_again(cache):
+    today = date.today()
+    days = [today - timedelta(days=offset) for offset in (10, 3, 0)]
+    cache.store(make_orders(days), days)
+
+    stale = cache.stale_days(days[0].isoformat(), today.isoformat())
+
+    # Only the day fetched more than refetch_days after it ended is settled.
+    assert stale == days_in_range(days[0].isoformat(), today.isoformat())[1:]
+
+
+def test_shops_are_kept_apart(cache):
+    days = days_in_range("2023-01-01", "2023-01-02")
+    cache.store(make_orders(days), days)
+
+    other = OrderCache(cache.path, shop="b")
+
+    assert other.stale_days("2023-01-01", "2023-01-02") == days
+    assert other.load("2023-01-01", "2023-01-02").empty
+
+
+def test_stored_orders_are_loaded(cache):
+    days = days_in_range("2023-01-01", "2023-01-03")
+    orders = make_orders(days)
+    cache.store(orders, days)
+
+    pd.testing.assert_frame_equal(cache.load("2023-01-01", "2023-01-03"), orders)
+    pd.testing.assert_frame_equal(
+        cache.load("2023-01-02", "2023-01-02"), orders[2:4].reset_index(drop=True)
+    )
+
+
+def test_storing_a_day_again_replaces_it(cache):
+    days = days_in_range("2023-01-01", "2023-01-02")
+    cache.store(make_orders(days), days)
+
+    replacement = make_orders([date(2023, 1, 2)])[:1]
+    cache.store(replacement, [date(2023, 1, 2)])
+
+    loaded = cache.load("2023-01-02", "2023-01-02")
+    pd.testing.assert_frame_equal(loaded, replacement)
+
+
+def test_load_data_only_fetches_stale_days(config, stub):
+    first = load_data(config)
+    calls = stub.calls["Order_GetByDate"]
+
+    again = load_data(config)
+    wider = load_data(dict(config, End_date="2023-01-12 23:59:59"))
+
+    assert stub.calls["Order_GetByDate"] == calls + 1
+    for orders, cached in zip(first, again):
+        pd.testing.assert_frame_equal(orders, cached)
+    assert sum(len(orders) for orders in wider) == 12 * 24
+
+
+def test_load_data_without_cache_fetches_every_time(config, stub):
+    config = dict(config, Use_cache=False)
+    load_data(config)
+    calls = stub.calls["Order_GetByDate"]
+
+    load_data(config)
+
+    assert stub.calls["Order_GetByDate"] > calls
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from src.constants import PAYMENT_METHODS
+from src.order_table import AMOUNT_COLUMN, make_order_table, sum_kroner
+
+
+def test_amounts_are_stored_in_ore():
+    orders = make_order_table(
+        ["2023-01-01 10:00:00", "2023-01-01 12:00:00", "2023-01-02 09:30:00"],
+        [10.0, 0.1, 21474836.47],
+        PAYMENT_METHODS,
+    )
+
+    assert orders[AMOUNT_COLUMN].dtype == np.int32
+    assert orders[AMOUNT_COLUMN].tolist() == [1000, 10, 2147483647]
+    assert sum_kroner(orders.assign(Date=orders["Date"].dt.floor("D"))).tolist() == [
+        10.1,
+        21474836.47,
+    ]
+
+
+def test_unknown_payment_method_is_missing():
+    orders = make_order_table(["2023-01-01"], [1.0], ["Faktura"])
+
+    assert orders["PaymentMethod"].isna().all()
+
+
+@pytest.mark.parametrize("amount", [np.nan, np.inf, 21474836.48, -21474836.49])
+def test_amounts_outside_int32_raise(amount):
+    with pytest.raises(ValueError):
+        make_order_table(
+            ["2023-01-01", "2023-01-02"], [1.0, amount], ["Kontant betaling"] * 2
+        )
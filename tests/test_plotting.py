@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib.collections import PolyCollection
+
+from benchmarks.plot_weekend import span_per_weekend
+from benchmarks.synthetic import make_report
+from src.plotting import get_all_plots, new_figure, plot_weekend
+from src.render_cache import RenderCache
+
+
+def x_spans(polygons) -> np.ndarray:
+    """Start and end in x data coordinates of every shaded polygon, sorted."""
+    return np.array(
+        sorted((vertices[:, 0].min(), vertices[:, 0].max()) for vertices in polygons)
+    )
+
+
+@pytest.mark.parametrize("start", ["2023-01-01", "2023-01-02", "2023-01-07"])
+@pytest.mark.parametrize("n_days", [10, 31, 400])
+def test_weekend_shading_matches_span_per_weekend(start, n_days):
+    dataframe = pd.DataFrame(
+        index=pd.date_range(start, periods=n_days, freq="D", name="Date")
+    )
+
+    _, expected_ax = new_figure()
+    span_per_weekend(expected_ax, dataframe)
+    expected = x_spans(
+        patch.get_patch_transform().transform(patch.get_path().vertices)
+        for patch in expected_ax.patches
+    )
+
+    _, ax = new_figure()
+    plot_weekend(ax, dataframe)
+    (collection,) = ax.collections
+    assert isinstance(collection, PolyCollection)
+    # The collection is drawn in the x-data and y-axes blended transform.
+    shaded = x_spans(path.vertices for path in collection.get_paths())
+
+    np.testing.assert_allclose(shaded, expected)
+    np.testing.assert_allclose(ax.get_xlim(), expected_ax.get_xlim())
+    assert collection.get_alpha() == 0.4
+
+
+def test_no_weekend_no_shading():
+    dataframe = pd.DataFrame(
+        index=pd.date_range("2023-01-02", periods=5, freq="D", name="Date")
+    )
+    _, ax = new_figure()
+
+    plot_weekend(ax, dataframe)
+
+    assert not ax.collections
+
+
+def test_get_all_plots_links_cached_plots(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    report = make_report(400)
+    cache = RenderCache(str(tmp_path / "cache"))
+
+    get_all_plots(report, "first", max_workers=2, cache=cache)
+    get_all_plots(report, "second", max_workers=2, cache=cache)
+
+    names = sorted(path.name for path in (tmp_path / "Reports" / "first").iterdir())
+    assert names == [
+        "bar_chart.png",
+        "daily.png",
+        "monthly.png",
+        "rolling_means.png",
+        "weekly.png",
+        "year_over_year.png",
+    ]
+    for name in names:
+        assert (tmp_path / "Reports" / "second" / name).samefile(
+            tmp_path / "Reports" / "first" / name
+        )
@@ -0,0 +1,83 @@
+import os
+
+from benchmarks.synthetic import make_report
+from src import render_cache
+from src.plotting import plot_by_day
+from src.render_cache import RenderCache, fingerprint, get_render_cache
+
+
+def write(path, content):
+    with open(path, "w") as file:
+        file.write(content)
+
+
+def read(path):
+    with open(path) as file:
+        return file.read()
+
+
+def test_fingerprint_depends_on_data_and_parameters():
+    report = make_report(30)
+    key = fingerprint({"data": report}, plot_by_day, "daily")
+
+    assert fingerprint({"data": report.copy()}, plot_by_day, "daily") == key
+    assert fingerprint({"data": report}, plot_by_day, "weekly") != key
+    changed = report.copy()
+    changed.iloc[0, 0] += 1
+    assert fingerprint({"data": changed}, plot_by_day, "daily") != key
+    assert fingerprint({"data": report.rename_axis("Day")}, plot_by_day, "daily") != key
+
+
+def test_fingerprint_depends_on_constants(tmp_path, monkeypatch):
+    report = make_report(30)
+    key = fingerprint({"data": report}, plot_by_day, "daily")
+
+    constants = tmp_path / "constants.py"
+    constants.write_text('PLOTTING_COLORS = ["red"]\n')
+    monkeypatch.setattr(render_cache.constants, "__file__", str(constants))
+
+    assert fingerprint({"data": report}, plot_by_day, "daily") != key
+
+
+def test_stored_output_is_fetched(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    output = str(tmp_path / "out" / "daily.png")
+    assert not cache.fetch("key", output)
+
+    os.makedirs(os.path.dirname(output))
+    write(output, "plot")
+    cache.store("key", output)
+    os.remove(output)
+
+    assert cache.fetch("key", output)
+    assert read(output) == "plot"
+    assert cache.fetch("key", output)
+
+
+def test_missing_output_is_not_stored(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+
+    cache.store("key", str(tmp_path / "daily.png"))
+
+    assert not cache.fetch("key", str(tmp_path / "daily.png"))
+
+
+def test_least_recently_used_entries_are_pruned(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), max_bytes=10)
+    for key in ["a", "b", "c"]:
+        output = str(tmp_path / f"{key}.png")
+        write(output, "12345")
+        os.utime(output, (0, {"a": 1, "b": 3, "c": 2}[key]))
+        cache.store(key, output)
+
+    assert sorted(os.listdir(tmp_path / "cache")) == ["b.png", "c.png"]
+
+
+def test_get_render_cache(tmp_path):
+    assert get_render_cache({"Use_cache": False}) is None
+
+    cache = get_render_cache(
+        {"Render_cache_path": str(tmp_path / "cache"), "Render_cache_max_bytes": 5}
+    )
+    assert cache.folder == str(tmp_path / "cache")
+    assert cache.max_bytes == 5
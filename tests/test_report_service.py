@@ -0,0 +1,74 @@
+import io
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pandas as pd
+import pytest
+
+from src.data_handler import get_and_clean_data
+from src.report_service import ReportService
+
+
+@pytest.fixture
+def service(config, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = ReportService(config, address=("127.0.0.1", 0))
+    threading.Thread(target=service.serve_forever, daemon=True).start()
+    yield service
+    service.shutdown()
+    service.server_close()
+
+
+def get(service: ReportService, path: str) -> bytes:
+    with urlopen(f"{service.url}{path}") as response:
+        return response.read()
+
+
+def test_report_matches_get_and_clean_data(service, config):
+    body = get(service, "report?start=2023-01-01&end=2023-01-10&format=csv")
+
+    report = pd.read_csv(io.BytesIO(body), index_col="Date", parse_dates=True)
+    expected = get_and_clean_data(
+        dict(config, Start_date="2023-01-01", End_date="2023-01-10"),
+        sort_by_order=False,
+    )
+    pd.testing.assert_frame_equal(
+        report, expected, check_freq=False, check_index_type=False
+    )
+
+
+def test_reports_are_served_from_memory(service, stub):
+    first = get(service, "daily?start=2023-01-01&end=2023-01-10")
+    calls = dict(stub.calls)
+
+    again = get(service, "daily?start=2023-01-01&end=2023-01-10")
+
+    assert again == first
+    assert stub.calls == calls
+    assert stub.calls["Solution_Connect"] == 1
+    daily = json.loads(first)
+    assert len(daily["index"]) == 10
+
+
+def test_plot_is_rendered(service):
+    image = get(service, "plot/daily.png?start=2023-01-01&end=2023-01-10")
+
+    assert image.startswith(b"\x89PNG")
+
+
+@pytest.mark.parametrize(
+    "path, status",
+    [
+        ("daily?start=2023-01-01", 400),
+        ("daily?start=1-1-2023&end=2023-01-10", 400),
+        ("plot/unknown.png?start=2023-01-01&end=2023-01-10", 404),
+        ("weekly?start=2023-01-01&end=2023-01-10", 404),
+    ],
+)
+def test_bad_requests(service, path, status):
+    with pytest.raises(HTTPError) as error:
+        get(service, path)
+
+    assert error.value.code == status
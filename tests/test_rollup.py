@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_report
+from src.rollup import Rollup, sum_by_day
+
+
+def make_orders(timestamps: list[str], totals: list[float]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"Card terminal": totals, "Total": totals},
+        index=pd.DatetimeIndex(timestamps, name="Date"),
+    )
+
+
+def test_sum_by_day_fills_days_without_sales():
+    report = make_orders(
+        ["2023-01-01 09:00", "2023-01-01 17:00", "2023-01-03 12:00"], [1, 2, 4]
+    )
+
+    daily = sum_by_day(report)
+
+    assert daily.index.tolist() == list(
+        pd.date_range("2023-01-01", "2023-01-03", name="Date")
+    )
+    assert daily["Total"].tolist() == [3, 0, 4]
+
+
+def test_iso_weeks_crossing_a_year_are_not_merged():
+    # 2020-12-31 is in ISO week 2020-W53 and 2021-01-01 to 2021-01-03 too,
+    # while 2021-12-31 and 2022-01-01 are both in 2021-W52.
+    days = pd.date_range("2020-12-28", "2022-01-09", name="Date")
+    report = make_orders(days, np.ones(len(days)))
+
+    week = Rollup(report).week
+
+    assert week.loc["2020-W53", "Total"] == 7
+    assert week.loc["2021-W01", "Total"] == 7
+    assert week.loc["2021-W52", "Total"] == 7
+    assert week.loc["2022-W01", "Total"] == 7
+    assert week.index.is_unique
+    assert week["Total"].sum() == len(days)
+
+
+def test_aggregates_match_resampling():
+    report = make_report(800)
+    rollup = Rollup(report)
+
+    pd.testing.assert_frame_equal(
+        rollup.day, report, check_freq=False, check_index_type=False
+    )
+    for aggregate, freq, label in [
+        (rollup.month, "MS", "%Y-%m"),
+        (rollup.year, "YS", "%Y"),
+    ]:
+        expected = report.resample(freq).sum()
+        expected.index = expected.index.strftime(label).rename("Date")
+        pd.testing.assert_frame_equal(aggregate, expected)
+
+    iso = report.index.isocalendar()
+    expected = report.groupby([iso["year"], iso["week"]]).sum()
+    np.testing.assert_allclose(rollup.week.to_numpy(), expected.to_numpy())
+
+
+def test_as_dict_shares_aggregates():
+    rollup = Rollup(make_report(30))
+
+    aggregates = rollup.as_dict()
+
+    assert list(aggregates) == ["Daily", "Weekly", "Monthly", "Yearly", "Trends"]
+    assert aggregates["Weekly"] is rollup.week
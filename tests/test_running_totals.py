@@ -0,0 +1,130 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from daily_report import backfill_running_totals
+from src.data_handler import get_daily_report
+from src.running_totals import RunningTotals, period_start
+
+
+@pytest.fixture
+def running_totals(tmp_path):
+    return RunningTotals(str(tmp_path / "running_totals"))
+
+
+def totals(value):
+    return {"Card terminal": value, "Total": value}
+
+
+def test_to_date_sums(running_totals):
+    for day in range(1, 6):
+        running_totals.add_day(date(2024, 1, day), totals(day))
+
+    frame = running_totals.to_date_frame()
+
+    assert frame.index.tolist() == ["2024-W01", "2024-01", "2024"]
+    assert frame["Total"].tolist() == [15, 15, 15]
+
+
+def test_new_periods_start_from_zero(running_totals):
+    running_totals.add_day(date(2023, 12, 31), totals(1))
+
+    changed = running_totals.add_day(date(2024, 1, 1), totals(2))
+
+    assert changed == ["week", "month", "year"]
+    assert running_totals.to_date_frame()["Total"].tolist() == [2, 2, 2]
+
+
+def test_iso_week_crossing_a_year_is_kept_whole(running_totals):
+    running_totals.add_day(date(2024, 12, 30), totals(1))
+    running_totals.add_day(date(2024, 12, 31), totals(2))
+    running_totals.add_day(date(2025, 1, 1), totals(4))
+
+    frame = running_totals.to_date_frame()
+
+    assert frame.index.tolist() == ["2025-W01", "2025-01", "2025"]
+    assert frame["Total"].tolist() == [7, 4, 4]
+
+
+def test_adding_the_latest_day_again_replaces_it(running_totals):
+    running_totals.add_day(date(2024, 1, 1), totals(1))
+    running_totals.add_day(date(2024, 1, 2), totals(2))
+
+    assert running_totals.add_day(date(2024, 1, 2), totals(2)) == []
+    assert running_totals.add_day(date(2024, 1, 2), totals(5)) == [
+        "week",
+        "month",
+        "year",
+    ]
+    assert running_totals.to_date_frame()["Total"].tolist() == [6, 6, 6]
+
+
+def test_earlier_day_replaces_it_in_current_periods(running_totals):
+    running_totals.add_day(date(2024, 1, 31), totals(1))
+    running_totals.add_day(date(2024, 2, 1), totals(2))
+    running_totals.add_day(date(2024, 2, 2), totals(4))
+
+    changed = running_totals.add_day(date(2024, 1, 31), totals(10))
+
+    assert changed == ["week", "year"]
+    frame = running_totals.to_date_frame()
+    assert frame.index.tolist() == ["2024-W05", "2024-02", "2024"]
+    assert frame["Total"].tolist() == [16, 6, 16]
+    assert running_totals.to_date["last_day"] == "2024-02-02"
+    assert running_totals.load_days(date(2024, 1, 1))["Total"].tolist() == [10, 2, 4]
+
+
+def test_missed_day_is_added(running_totals):
+    running_totals.add_day(date(2024, 3, 1), totals(1))
+    running_totals.add_day(date(2024, 3, 3), totals(4))
+
+    running_totals.add_day(date(2024, 3, 2), totals(2))
+
+    assert running_totals.to_date_frame()["Total"].tolist() == [7, 7, 7]
+    assert running_totals.load_days(date(2024, 3, 1))["Total"].tolist() == [1, 2, 4]
+
+
+def test_state_is_saved(running_totals):
+    running_totals.add_day(date(2024, 3, 1), totals(1))
+
+    loaded = RunningTotals(running_totals.folder)
+
+    pd.testing.assert_frame_equal(
+        loaded.to_date_frame(), running_totals.to_date_frame()
+    )
+
+
+def test_missed_days_are_backfilled(running_totals, config):
+    day = date(2023, 1, 10)
+    report = get_daily_report(config)
+    running_totals.add_day(date(2023, 1, 3), report.loc["2023-01-03"].to_dict())
+
+    changed = backfill_running_totals(running_totals, day, config)
+    running_totals.add_day(day, report.loc["2023-01-10"].to_dict())
+
+    assert sorted(changed) == ["month", "week", "year"]
+    days = running_totals.load_days(date(2023, 1, 1))
+    pd.testing.assert_frame_equal(
+        days, report.loc["2023-01-03":], check_freq=False, check_index_type=False
+    )
+    week = report.loc[str(period_start(day, "week")) :].sum()
+    frame = running_totals.to_date_frame()
+    assert frame.loc["2023-W02"].to_dict() == pytest.approx(week.to_dict())
+    assert frame.loc["2023"].to_dict() == pytest.approx(
+        report.loc["2023-01-03":].sum().to_dict()
+    )
+
+
+def test_backfill_stays_in_the_year(running_totals, config):
+    running_totals.add_day(date(2022, 12, 20), totals(1))
+
+    backfill_running_totals(running_totals, date(2023, 1, 3), config)
+
+    days = running_totals.load_days(date(2022, 12, 1))
+    assert [day.date() for day in days.index] == [
+        date(2022, 12, 20),
+        date(2023, 1, 1),
+        date(2023, 1, 2),
+    ]
+    assert running_totals.to_date["last_day"] == "2023-01-02"
@@ -0,0 +1,153 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from zeep.exceptions import Fault
+
+from src.soap import (
+    DATE_FORMAT,
+    fault_message,
+    get_handler,
+    is_session_fault,
+    split_date_range,
+)
+
+
+@pytest.mark.parametrize("slice_size", ["day", "week", "month"])
+def test_split_date_range_covers_range(slice_size):
+    windows = split_date_range("2023-01-15", "2023-03-10", slice_size)
+
+    assert windows[0][0] == "2023-01-15 00:00:00"
+    assert windows[-1][1] == "2023-03-10 23:59:59"
+    for (_, end), (start, _) in zip(windows, windows[1:]):
+        gap = datetime.strptime(start, DATE_FORMAT) - datetime.strptime(
+            end, DATE_FORMAT
+        )
+        assert gap == timedelta(seconds=1)
+
+
+def test_split_date_range_by_month():
+    assert split_date_range("2023-01-15", "2023-03-10", "month") == [
+        ("2023-01-15 00:00:00", "2023-01-31 23:59:59"),
+        ("2023-02-01 00:00:00", "2023-02-28 23:59:59"),
+        ("2023-03-01 00:00:00", "2023-03-10 23:59:59"),
+    ]
+
+
+def test_split_date_range_keeps_time_of_day():
+    assert split_date_range("2023-01-01 12:00:00", "2023-01-02 06:00:00", "day") == [
+        ("2023-01-01 12:00:00", "2023-01-01 23:59:59"),
+        ("2023-01-02 00:00:00", "2023-01-02 06:00:00"),
+    ]
+
+
+@pytest.mark.parametrize("slice_size", [None, "day"])
+def test_get_orders_retries_failed_calls(config, slice_size, monkeypatch):
+    handler = get_handler(config)
+    call = handler.call
+    failures = []
+
+    def fail_once(operation, *args, **kwargs):
+        if not failures:
+            failures.append(operation)
+            raise ConnectionError("Connection reset")
+        return call(operation, *args, **kwargs)
+
+    monkeypatch.setattr(handler, "call", fail_once)
+
+    orders = handler.get_orders(
+        "2023-01-01 00:00:00", "2023-01-03 23:59:59", slice_size, retries=1, backoff=0
+    )
+
+    assert failures == ["Order_GetByDate"]
+    assert len(orders) == 3 * 24
+
+
+def test_sliced_orders_match_one_call(config):
+    handler = get_handler(config)
+
+    whole = handler.get_orders("2023-01-01 00:00:00", "2023-02-10 23:59:59")
+    sliced = handler.get_orders("2023-01-01 00:00:00", "2023-02-10 23:59:59", "week")
+
+    assert [order["Id"] for order in sliced] == [order["Id"] for order in whole]
+
+
+def test_handler_is_reused(config, stub):
+    handlers = []
+    threads = [
+        threading.Thread(target=lambda: handlers.append(get_handler(config)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(handler is handlers[0] for handler in handlers)
+    assert get_handler(dict(config, Username="other")) is not handlers[0]
+    assert stub.calls["Solution_Connect"] == 2
+
+
+@pytest.mark.parametrize("stub", [{"session_calls": 2}], indirect=True)
+def test_expired_session_logs_in_again(config, stub):
+    handler = get_handler(config)
+
+    for day in range(1, 6):
+        start, end = f"2023-01-0{day} 00:00:00", f"2023-01-0{day} 23:59:59"
+        assert len(handler.fetch_orders(start, end)) == 24
+        assert len(handler.fetch_page(start, end)) == 24
+
+    assert stub.calls["Solution_Connect"] > 1
+
+
+def test_other_faults_are_raised(config, stub, monkeypatch):
+    handler = get_handler(config)
+
+    def busy(*args, **kwargs):
+        raise Fault("Server busy")
+
+    monkeypatch.setattr(handler.client.service, "Order_GetByDate", busy)
+
+    with pytest.raises(Fault):
+        handler.call("Order_GetByDate", Start="", End="", Status="8")
+    assert stub.calls["Solution_Connect"] == 1
+
+
+def test_session_faults():
+    assert is_session_fault("Not connected")
+    assert is_session_fault("Session expired, please login")
+    assert not is_session_fault("Server busy")
+    assert not is_session_fault(None)
+    assert fault_message(
+        b"<Envelope><Body><Fault><faultstring>Not connected</faultstring>"
+        b"</Fault></Body></Envelope>"
+    ) == "Not connected"
+    assert fault_message(b"<html>") is None
+
+
+@pytest.mark.parametrize("page_size", [5, 30, 5000])
+def test_paged_fetch_keeps_pages_small(config, page_size, monkeypatch):
+    handler = get_handler(config)
+    fetch_page = handler.fetch_page
+    page_lengths = []
+
+    def record_page(*args):
+        page = fetch_page(*args)
+        page_lengths.append(len(page))
+        return page
+
+    monkeypatch.setattr(handler, "fetch_page", record_page)
+
+    orders = handler.fetch_orders_paged(
+        "2023-01-01", "2023-01-20", page_size=page_size
+    )
+
+    whole = handler.orders_to_dataframe(
+        handler.get_orders("2023-01-01 00:00:00", "2023-01-20 23:59:59")
+    )
+    assert orders.equals(whole)
+    # Pages larger than page_size must be dropped and fetched again in
+    # smaller windows, so the other pages hold every order.
+    assert sum(length for length in page_lengths if length <= page_size) == len(
+        whole
+    )